@@ -0,0 +1,436 @@
+"""
+Teste de carga da API de pedidos.
+
+Por padrão sobe a aplicação (main:app) no próprio processo contra um banco
+SQLite temporário, popula usuários, pedidos e itens na escala escolhida e
+dispara uma mistura realista de operações (login, criar pedido, adicionar
+itens, listar, ver pedido e finalizar) com um cliente HTTP assíncrono.
+
+Para cada endpoint são reportados latência p50/p95/p99, requisições por
+segundo, erros e a média de queries SQL por requisição. O resultado é
+impresso em JSON (ou gravado com --saida) junto com o commit atual, para
+comparação entre versões com --comparar.
+
+Uso:
+    python -m Benchmarks.carga --usuarios 20 --pedidos 50 --requisicoes 2000 --concorrencia 20
+    python -m Benchmarks.carga --saida antes.json
+    python -m Benchmarks.carga --comparar antes.json
+    python -m Benchmarks.carga --url http://localhost:8000   # servidor já em execução
+
+Com --url, o catálogo do servidor precisa ter o produto "calabresa" (G).
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+SENHA = "senha-benchmark"
+
+# operação -> peso na mistura de requisições
+MISTURA_PADRAO = {
+    "login": 1,
+    "criar_pedido": 2,
+    "adicionar_itens": 3,
+    "listar_pedidos_usuario": 3,
+    "ver_pedido": 3,
+    "finalizar_pedido": 1,
+}
+
+
+def percentil(valores, p):
+    """
+    Calcula o percentil p (0-100) pelo método nearest-rank.
+
+    Args:
+        valores (list[float]): Valores medidos.
+        p (float): Percentil desejado.
+
+    Returns:
+        float: Valor do percentil, ou 0 se não houver medições.
+    """
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class UsuarioVirtual:
+    """
+    Estado de um cliente simulado durante o teste de carga.
+
+    Attributes:
+        email (str): Email do usuário.
+        headers (dict): Header de autorização com o access token.
+        pedidos_pendentes (list[int]): Pedidos que ainda aceitam itens.
+        pedidos (list[int]): Todos os pedidos do usuário.
+    """
+
+    def __init__(self, email, pedidos):
+        self.email = email
+        self.headers = {}
+        self.pedidos = list(pedidos)
+        self.pedidos_pendentes = list(pedidos)
+
+
+class Coletor:
+    """
+    Acumula latências, erros e queries por operação.
+    """
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.queries = defaultdict(list)
+
+    def registrar(self, operacao, segundos, sucesso, queries=None):
+        self.latencias[operacao].append(segundos * 1000)
+        if not sucesso:
+            self.erros[operacao] += 1
+        if queries is not None:
+            self.queries[operacao].append(queries)
+
+    def relatorio(self, duracao):
+        endpoints = {}
+        for operacao, latencias in sorted(self.latencias.items()):
+            queries = self.queries.get(operacao)
+            endpoints[operacao] = {
+                "requisicoes": len(latencias),
+                "erros": self.erros.get(operacao, 0),
+                "rps": round(len(latencias) / duracao, 2),
+                "p50_ms": round(percentil(latencias, 50), 3),
+                "p95_ms": round(percentil(latencias, 95), 3),
+                "p99_ms": round(percentil(latencias, 99), 3),
+                "queries_media": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        total = sum(len(latencias) for latencias in self.latencias.values())
+        return {
+            "duracao_s": round(duracao, 3),
+            "requisicoes": total,
+            "erros": sum(self.erros.values()),
+            "rps": round(total / duracao, 2),
+            "endpoints": endpoints,
+        }
+
+
+QUERIES_SERVER_TIMING = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def queries_da_resposta(resposta):
+    """
+    Lê a quantidade de queries SQL da requisição no header Server-Timing.
+
+    Args:
+        resposta (httpx.Response): Resposta da API.
+
+    Returns:
+        int | None: Queries executadas, ou None sem o header (SERVER_TIMING=false).
+    """
+    encontrado = QUERIES_SERVER_TIMING.search(resposta.headers.get("server-timing", ""))
+    return int(encontrado.group(1)) if encontrado else None
+
+
+class Cenario:
+    """
+    Executa as operações da mistura para um usuário virtual.
+    """
+
+    def __init__(self, cliente, coletor):
+        self.cliente = cliente
+        self.coletor = coletor
+
+    async def _requisitar(self, operacao, metodo, caminho, **kwargs):
+        inicio = time.perf_counter()
+        resposta = await self.cliente.request(metodo, caminho, **kwargs)
+        duracao = time.perf_counter() - inicio
+        self.coletor.registrar(operacao, duracao, resposta.is_success, queries_da_resposta(resposta))
+        return resposta
+
+    async def login(self, usuario):
+        resposta = await self._requisitar(
+            "login", "POST", "/auth/login", json={"email": usuario.email, "senha": SENHA}
+        )
+        if resposta.is_success:
+            usuario.headers = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+    async def criar_pedido(self, usuario, id_usuario):
+        resposta = await self._requisitar(
+            "criar_pedido", "POST", "/order/pedidos",
+            json={"usuario": id_usuario}, headers=usuario.headers
+        )
+        if resposta.is_success:
+            id_pedido = int(resposta.json()["message"].rsplit(":", 1)[1])
+            usuario.pedidos.append(id_pedido)
+            usuario.pedidos_pendentes.append(id_pedido)
+
+    async def adicionar_itens(self, usuario, rng):
+        if not usuario.pedidos_pendentes:
+            return
+        id_pedido = rng.choice(usuario.pedidos_pendentes)
+        itens = [
+            {"quantidade": rng.randint(1, 3), "sabor": "calabresa", "tamanho": "G"}
+            for _ in range(rng.randint(1, 5))
+        ]
+        await self._requisitar(
+            "adicionar_itens", "POST", f"/order/pedido/adcionar-lote/{id_pedido}",
+            json={"itens": itens}, headers=usuario.headers
+        )
+
+    async def listar_pedidos_usuario(self, usuario):
+        await self._requisitar(
+            "listar_pedidos_usuario", "GET", "/order/listar/pedidos-usuario", headers=usuario.headers
+        )
+
+    async def ver_pedido(self, usuario, rng):
+        if not usuario.pedidos:
+            return
+        await self._requisitar(
+            "ver_pedido", "GET", f"/order/pedido/{rng.choice(usuario.pedidos)}", headers=usuario.headers
+        )
+
+    async def finalizar_pedido(self, usuario, rng):
+        if not usuario.pedidos_pendentes:
+            return
+        id_pedido = usuario.pedidos_pendentes.pop(rng.randrange(len(usuario.pedidos_pendentes)))
+        await self._requisitar(
+            "finalizar_pedido", "POST", f"/order/pedidos/finalizar/{id_pedido}", headers=usuario.headers
+        )
+
+
+async def popular_banco(usuarios, pedidos_por_usuario, itens_por_pedido):
+    """
+    Cria as tabelas e insere os dados de carga diretamente no banco.
+
+    Args:
+        usuarios (int): Quantidade de usuários.
+        pedidos_por_usuario (int): Pedidos por usuário.
+        itens_por_pedido (int): Itens por pedido.
+
+    Returns:
+        list[tuple]: (id, email, ids dos pedidos) de cada usuário.
+    """
+    from sqlalchemy import insert, select
+    from DataBase.database import db_async
+    from DataBase.models import Base, User, Pedido, ItemPedido, ProdutoCatalogo
+    from Services.senhas import bcrypt_context
+
+    hash_senha = bcrypt_context.hash(SENHA)
+    async with db_async.begin() as conexao:
+        await conexao.run_sync(Base.metadata.create_all)
+        await conexao.execute(insert(ProdutoCatalogo.__table__), [
+            {"sabor": "calabresa", "tamanho": "g", "preco": 39.9, "ativo": True, "versao": 1}
+        ])
+        await conexao.execute(insert(User.__table__), [
+            {"name": f"usuario{i}", "email": f"usuario{i}@benchmark.com",
+             "email_normalizado": f"usuario{i}@benchmark.com", "senha": hash_senha,
+             "ativo": True, "admin": False}
+            for i in range(usuarios)
+        ])
+        linhas_usuarios = (await conexao.execute(select(User.id, User.email).order_by(User.id))).all()
+        await conexao.execute(insert(Pedido.__table__), [
+            {"usuario": id_usuario, "status": "PENDENTE", "preco": 39.9 * itens_por_pedido}
+            for id_usuario, _ in linhas_usuarios
+            for _ in range(pedidos_por_usuario)
+        ])
+        linhas_pedidos = (await conexao.execute(select(Pedido.id, Pedido.usuario).order_by(Pedido.id))).all()
+        if itens_por_pedido:
+            await conexao.execute(insert(ItemPedido.__table__), [
+                {"pedido": id_pedido, "sabor": "calabresa", "tamanho": "g",
+                 "quantidade": 1, "preco_unitario": 39.9}
+                for id_pedido, _ in linhas_pedidos
+                for _ in range(itens_por_pedido)
+            ])
+
+    pedidos = defaultdict(list)
+    for id_pedido, id_usuario in linhas_pedidos:
+        pedidos[id_usuario].append(id_pedido)
+    return [(id_usuario, email, pedidos[id_usuario]) for id_usuario, email in linhas_usuarios]
+
+
+async def popular_via_api(cliente, usuarios, pedidos_por_usuario, itens_por_pedido):
+    """
+    Popula um servidor externo utilizando os próprios endpoints da API.
+
+    Returns:
+        list[tuple]: (id, email, ids dos pedidos) de cada usuário.
+    """
+    sufixo = int(time.time())
+    dados = []
+    for i in range(usuarios):
+        email = f"usuario{i}.{sufixo}@benchmark.com"
+        await cliente.post("/auth/signup", json={"nome": f"usuario{i}", "email": email, "senha": SENHA, "ativo": True})
+        resposta = await cliente.post("/auth/login", json={"email": email, "senha": SENHA})
+        resposta.raise_for_status()
+        headers = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        carga_token = resposta.json()["access_token"].split(".")[1]
+        id_usuario = int(json.loads(base64.urlsafe_b64decode(carga_token + "=="))["sub"])
+        pedidos = []
+        for _ in range(pedidos_por_usuario):
+            resposta = await cliente.post("/order/pedidos", json={"usuario": id_usuario}, headers=headers)
+            id_pedido = int(resposta.json()["message"].rsplit(":", 1)[1])
+            if itens_por_pedido:
+                await cliente.post(f"/order/pedido/adcionar-lote/{id_pedido}", headers=headers, json={"itens": [
+                    {"quantidade": 1, "sabor": "calabresa", "tamanho": "G"}
+                ] * itens_por_pedido})
+            pedidos.append(id_pedido)
+        dados.append((id_usuario, email, pedidos))
+    return dados
+
+
+async def executar(args):
+    import httpx
+
+    mistura = dict(MISTURA_PADRAO)
+    for item in filter(None, (args.mistura or "").split(",")):
+        operacao, peso = item.split("=")
+        mistura[operacao.strip()] = float(peso)
+    operacoes = [operacao for operacao, peso in mistura.items() if peso > 0]
+    pesos = [mistura[operacao] for operacao in operacoes]
+
+    if args.url:
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+        from DataBase.database import db_async
+        cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+
+    async with cliente:
+        if args.url:
+            dados = await popular_via_api(cliente, args.usuarios, args.pedidos, args.itens)
+        else:
+            dados = await popular_banco(args.usuarios, args.pedidos, args.itens)
+
+        coletor = Coletor()
+        cenario = Cenario(cliente, coletor)
+        usuarios = [(id_usuario, UsuarioVirtual(email, pedidos)) for id_usuario, email, pedidos in dados]
+        for _, usuario in usuarios:
+            await cenario.login(usuario)
+        coletor = Coletor()
+        cenario.coletor = coletor
+
+        rng = random.Random(args.semente)
+        fila = asyncio.Queue()
+        for _ in range(args.requisicoes):
+            fila.put_nowait((rng.choices(operacoes, pesos)[0], rng.randrange(len(usuarios)), rng.random()))
+
+        async def trabalhador():
+            while True:
+                try:
+                    operacao, indice, semente = fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                id_usuario, usuario = usuarios[indice]
+                rng_local = random.Random(semente)
+                if operacao == "login":
+                    await cenario.login(usuario)
+                elif operacao == "criar_pedido":
+                    await cenario.criar_pedido(usuario, id_usuario)
+                elif operacao == "adicionar_itens":
+                    await cenario.adicionar_itens(usuario, rng_local)
+                elif operacao == "listar_pedidos_usuario":
+                    await cenario.listar_pedidos_usuario(usuario)
+                elif operacao == "ver_pedido":
+                    await cenario.ver_pedido(usuario, rng_local)
+                elif operacao == "finalizar_pedido":
+                    await cenario.finalizar_pedido(usuario, rng_local)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabalhador() for _ in range(args.concorrencia)))
+        duracao = time.perf_counter() - inicio
+
+    if not args.url:
+        await db_async.dispose()
+
+    resultado = coletor.relatorio(duracao)
+    resultado["commit"] = commit_atual()
+    resultado["parametros"] = {
+        "url": args.url,
+        "usuarios": args.usuarios,
+        "pedidos_por_usuario": args.pedidos,
+        "itens_por_pedido": args.itens,
+        "requisicoes": args.requisicoes,
+        "concorrencia": args.concorrencia,
+        "mistura": mistura,
+        "semente": args.semente,
+    }
+    return resultado
+
+
+def comparar(base, atual):
+    """
+    Imprime a variação de latência e throughput entre duas execuções.
+
+    Args:
+        base (dict): Resultado de referência (ex: commit anterior).
+        atual (dict): Resultado da execução atual.
+    """
+    print(f"comparando {base.get('commit')} -> {atual.get('commit')}", file=sys.stderr)
+    for operacao, metricas in atual["endpoints"].items():
+        anterior = base["endpoints"].get(operacao)
+        if not anterior:
+            continue
+        variacoes = []
+        for chave in ("p50_ms", "p95_ms", "p99_ms", "rps", "queries_media"):
+            if anterior.get(chave) and metricas.get(chave) is not None:
+                variacao = (metricas[chave] - anterior[chave]) / anterior[chave] * 100
+                variacoes.append(f"{chave} {variacao:+.1f}%")
+        print(f"  {operacao:<24} " + ", ".join(variacoes), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL de um servidor em execução (padrão: app no próprio processo)")
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--pedidos", type=int, default=20, help="pedidos iniciais por usuário")
+    parser.add_argument("--itens", type=int, default=3, help="itens iniciais por pedido")
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=10)
+    parser.add_argument("--mistura", help="pesos das operações, ex: login=0,ver_pedido=5")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="grava o resultado em JSON neste arquivo")
+    parser.add_argument("--comparar", help="resultado JSON anterior para comparação")
+    args = parser.parse_args()
+
+    if not args.url:
+        banco = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{banco}"
+        os.environ.pop("DATABASE_URL_ASYNC", None)
+        os.environ.setdefault("SECRET_KEY", "benchmark")
+        os.environ.setdefault("ALGORITHM", "HS256")
+        os.environ.setdefault("ACCES_TOKEN_EXPIRES_MINUTES", "30")
+        # todos os usuários simulados vêm do mesmo IP
+        os.environ.setdefault("LIMITE_LOGIN_BACKEND", "desligado")
+
+    resultado = asyncio.run(executar(args))
+    saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(saida)
+    else:
+        print(saida)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(json.load(arquivo), resultado)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Compara o custo de serialização de listas grandes de pedidos.
+
+Cenários medidos para a mesma lista de objetos Pedido (com itens):
+
+* antes: dict com objetos do ORM -> jsonable_encoder -> JSONResponse,
+  caminho usado quando a rota não declara response_model;
+* response_model + JSONResponse: validação pelo schema Pydantic e
+  serialização com o json da biblioteca padrão;
+* depois: response_model + ORJSONResponse, configuração atual da API.
+
+Uso:
+    python -m Benchmarks.serializacao --pedidos 1000 --itens 5 --repeticoes 5
+    python -m Benchmarks.serializacao --json   # saída legível por máquina
+"""
+import argparse
+import json
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from DataBase.models import Pedido, ItemPedido
+from schemas import ResponseListaPedidosSchema
+
+ADAPTADOR_LISTA = TypeAdapter(ResponseListaPedidosSchema)
+
+
+def gerar_pedidos(quantidade, itens_por_pedido):
+    """
+    Cria objetos Pedido transientes (sem banco) com seus itens.
+
+    Args:
+        quantidade (int): Quantidade de pedidos.
+        itens_por_pedido (int): Itens em cada pedido.
+
+    Returns:
+        list[Pedido]: Pedidos gerados.
+    """
+    pedidos = []
+    id_item = 1
+    for id_pedido in range(1, quantidade + 1):
+        pedido = Pedido(usuario=id_pedido % 50 + 1)
+        pedido.id = id_pedido
+        itens = []
+        for _ in range(itens_por_pedido):
+            item = ItemPedido("calabresa", id_pedido, "G", 2, 12.5)
+            item.id = id_item
+            id_item += 1
+            itens.append(item)
+        pedido.itens = itens
+        pedido.calcular_preco()
+        pedidos.append(pedido)
+    return pedidos
+
+
+def _antes(pedidos):
+    conteudo = jsonable_encoder({'pedidos': pedidos, 'proximo_cursor': None})
+    return JSONResponse(conteudo).body
+
+
+def _schema_json(pedidos):
+    modelo = ADAPTADOR_LISTA.validate_python(
+        {'pedidos': pedidos, 'proximo_cursor': None}, from_attributes=True
+    )
+    return JSONResponse(ADAPTADOR_LISTA.dump_python(modelo, mode="json")).body
+
+
+def _depois(pedidos):
+    modelo = ADAPTADOR_LISTA.validate_python(
+        {'pedidos': pedidos, 'proximo_cursor': None}, from_attributes=True
+    )
+    return ORJSONResponse(ADAPTADOR_LISTA.dump_python(modelo, mode="json")).body
+
+
+CENARIOS = {
+    "antes (jsonable_encoder + json)": _antes,
+    "response_model + json": _schema_json,
+    "depois (response_model + orjson)": _depois,
+}
+
+
+def medir(funcao, pedidos, repeticoes):
+    """
+    Executa a serialização várias vezes e retorna os tempos em milissegundos.
+
+    Args:
+        funcao (callable): Cenário de serialização.
+        pedidos (list[Pedido]): Pedidos a serem serializados.
+        repeticoes (int): Quantidade de execuções.
+
+    Returns:
+        dict: Mediana, mínimo e tamanho do corpo gerado.
+    """
+    tempos = []
+    corpo = b""
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        corpo = funcao(pedidos)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "minimo_ms": round(min(tempos), 3),
+        "bytes": len(corpo),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=1000)
+    parser.add_argument("--itens", type=int, default=5)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    pedidos = gerar_pedidos(args.pedidos, args.itens)
+    resultados = {nome: medir(funcao, pedidos, args.repeticoes) for nome, funcao in CENARIOS.items()}
+
+    if args.json:
+        print(json.dumps({
+            "pedidos": args.pedidos,
+            "itens_por_pedido": args.itens,
+            "repeticoes": args.repeticoes,
+            "resultados": resultados,
+        }, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{args.pedidos} pedidos x {args.itens} itens, {args.repeticoes} repetições")
+    base = resultados["antes (jsonable_encoder + json)"]["mediana_ms"]
+    for nome, resultado in resultados.items():
+        print(
+            f"  {nome:<36} {resultado['mediana_ms']:>10.2f} ms "
+            f"(x{base / resultado['mediana_ms']:.1f})  {resultado['bytes']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
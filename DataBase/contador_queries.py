@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+class ContadorQueries:
+    """
+    Registra os comandos SQL executados em uma engine.
+
+    Attributes:
+        comandos (list): Comandos SQL executados, na ordem de execução.
+    """
+
+    def __init__(self):
+        self.comandos = []
+
+    @property
+    def total(self):
+        """
+        Returns:
+            int: Quantidade de comandos executados.
+        """
+        return len(self.comandos)
+
+    def _registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.comandos.append(statement)
+
+    def limpar(self):
+        """
+        Descarta os comandos registrados até o momento.
+        """
+        self.comandos.clear()
+
+
+@contextmanager
+def contar_queries(engine):
+    """
+    Conta os comandos SQL executados em uma engine dentro do bloco.
+
+    Exemplo:
+        with contar_queries(db_async) as contador:
+            await cliente.get("/order/listar")
+        assert_max_queries(contador, 2)
+
+    Args:
+        engine (Engine | AsyncEngine): Engine monitorada.
+
+    Yields:
+        ContadorQueries: Contador preenchido durante o bloco.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    contador = ContadorQueries()
+    event.listen(engine, "before_cursor_execute", contador._registrar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, "before_cursor_execute", contador._registrar)
+
+
+def assert_max_queries(contador, maximo, descricao=""):
+    """
+    Falha caso o bloco monitorado tenha executado mais comandos que o esperado.
+
+    Args:
+        contador (ContadorQueries): Contador de um bloco contar_queries.
+        maximo (int): Quantidade máxima de comandos permitida.
+        descricao (str, optional): Identificação do cenário na mensagem de erro.
+
+    Raises:
+        AssertionError: Se o total de comandos for maior que o máximo.
+    """
+    if contador.total > maximo:
+        comandos = "\n".join(f"  {i}. {comando}" for i, comando in enumerate(contador.comandos, 1))
+        raise AssertionError(
+            f"{descricao or 'Bloco'} executou {contador.total} queries (máximo {maximo}):\n{comandos}"
+        )
@@ -0,0 +1,362 @@
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from Services.cache import CacheTTL
+import asyncio
+import os
+import random
+
+DRIVERS_ASYNC = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def url_async(url):
+    """
+    Converte uma URL de banco síncrona para o driver assíncrono equivalente.
+
+    Args:
+        url (str): URL síncrona (ex: mysql+pymysql://...).
+
+    Returns:
+        str: URL com driver assíncrono (ex: mysql+aiomysql://...).
+    """
+    url = make_url(url)
+    driver = DRIVERS_ASYNC.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def env_bool(nome, padrao):
+    """
+    Lê uma variável de ambiente booleana ("1", "true", "sim", "yes" ou "on").
+
+    Args:
+        nome (str): Nome da variável.
+        padrao (bool): Valor usado quando a variável não está definida.
+
+    Returns:
+        bool: Valor da variável.
+    """
+    valor = os.getenv(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ("1", "true", "sim", "yes", "on")
+
+
+@dataclass(frozen=True)
+class ConfiguracaoBanco:
+    """
+    Configurações de conexão e do pool de conexões do banco de dados.
+
+    Attributes:
+        url (str): URL síncrona do banco (usada por scripts e migrações).
+        url_async (str): URL assíncrona usada pelas rotas (vazia: derivada de url).
+        pool_size (int): Conexões mantidas abertas no pool por worker.
+        max_overflow (int): Conexões extras permitidas acima do pool_size.
+        pool_recycle (int): Segundos até uma conexão ser reciclada.
+        pool_pre_ping (bool): Testa a conexão antes de entregá-la ao request.
+        pool_timeout (float): Segundos aguardando uma conexão livre no pool.
+        echo (bool): Loga os comandos SQL emitidos.
+        urls_replicas (tuple[str]): URLs síncronas das réplicas de leitura.
+        janela_primario (float): Segundos em que as leituras de quem acabou
+            de escrever continuam indo para o primário.
+    """
+    url: str = "mysql+pymysql://root:@localhost:3306/meubanco"
+    url_async: str = ""
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    pool_timeout: float = 30
+    echo: bool = False
+    urls_replicas: tuple = ()
+    janela_primario: float = 5.0
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Monta a configuração a partir das variáveis de ambiente.
+
+        Variáveis: DATABASE_URL, DATABASE_URL_ASYNC, DB_POOL_SIZE,
+        DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+        DB_POOL_TIMEOUT, DB_ECHO, DATABASE_REPLICA_URLS (separadas
+        por vírgula) e DB_REPLICA_JANELA_PRIMARIO.
+
+        Returns:
+            ConfiguracaoBanco: Configuração carregada.
+        """
+        url = os.getenv("DATABASE_URL", cls.url)
+        return cls(
+            url=url,
+            url_async=os.getenv("DATABASE_URL_ASYNC") or url_async(url),
+            pool_size=int(os.getenv("DB_POOL_SIZE", cls.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", cls.max_overflow)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", cls.pool_recycle)),
+            pool_pre_ping=env_bool("DB_POOL_PRE_PING", cls.pool_pre_ping),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", cls.pool_timeout)),
+            echo=env_bool("DB_ECHO", cls.echo),
+            urls_replicas=tuple(
+                url_replica.strip()
+                for url_replica in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+                if url_replica.strip()
+            ),
+            janela_primario=float(os.getenv("DB_REPLICA_JANELA_PRIMARIO", cls.janela_primario)),
+        )
+
+    def argumentos_engine(self, url):
+        """
+        Retorna os argumentos de pool aceitos pelo dialeto da URL.
+
+        O SQLite não utiliza QueuePool em todos os modos, então os
+        parâmetros de dimensionamento são aplicados apenas aos demais bancos.
+
+        Args:
+            url (str): URL do banco.
+
+        Returns:
+            dict: Argumentos para create_engine/create_async_engine.
+        """
+        argumentos = {
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "echo": self.echo,
+        }
+        if make_url(url).get_backend_name() != "sqlite":
+            argumentos.update(
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_timeout=self.pool_timeout,
+            )
+        return argumentos
+
+
+def criar_engines(configuracao):
+    """
+    Cria as engines síncrona e assíncrona a partir da configuração.
+
+    Args:
+        configuracao (ConfiguracaoBanco): Configuração do banco.
+
+    Returns:
+        tuple: (Engine, AsyncEngine).
+    """
+    engine = create_engine(configuracao.url, **configuracao.argumentos_engine(configuracao.url))
+    # sem url_async explícita, deriva da URL síncrona
+    url_assincrona = configuracao.url_async or url_async(configuracao.url)
+    engine_async = create_async_engine(url_assincrona, **configuracao.argumentos_engine(url_assincrona))
+    return engine, engine_async
+
+
+def criar_engines_replicas(configuracao):
+    """
+    Cria as engines assíncronas das réplicas de leitura.
+
+    Args:
+        configuracao (ConfiguracaoBanco): Configuração do banco.
+
+    Returns:
+        list[AsyncEngine]: Uma engine por réplica (vazia se não houver réplicas).
+    """
+    engines = []
+    for url_replica in configuracao.urls_replicas:
+        url_replica = url_async(url_replica)
+        engines.append(create_async_engine(url_replica, **configuracao.argumentos_engine(url_replica)))
+    return engines
+
+
+class SessaoRoteada(Session):
+    """
+    Sessão que envia leituras para as réplicas e escritas para o primário.
+
+    Um SELECT vai para uma réplica sorteada, exceto quando a sessão já
+    escreveu (flush ou UPDATE/DELETE/INSERT), quando o SELECT bloqueia
+    linhas (FOR UPDATE) ou quando session.info["usar_primario"] estiver
+    ativo; a partir daí todas as operações usam o primário, garantindo
+    leitura das próprias escritas. As réplicas são informadas em
+    session.info["replicas"].
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["usar_primario"] = True
+
+        replicas = self.info.get("replicas")
+        if (
+            replicas
+            and not self.info.get("usar_primario")
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+_chave_consistencia = ContextVar("chave_consistencia", default=None)
+
+
+def definir_chave_consistencia(chave):
+    """
+    Identifica quem faz as operações do request atual (ex: o id do usuário).
+
+    Escritas confirmadas neste contexto fazem as próximas leituras da mesma
+    chave irem ao primário durante janela_primario segundos, evitando que o
+    cliente deixe de ver o que acabou de gravar por atraso de replicação.
+
+    Args:
+        chave: Identificador do cliente.
+    """
+    _chave_consistencia.set(chave)
+
+
+def escreveu_recentemente(chave):
+    """
+    Args:
+        chave: Identificador do cliente.
+
+    Returns:
+        bool: True se a chave confirmou uma escrita dentro da janela.
+    """
+    return chave is not None and chave in _escritas_recentes
+
+
+@event.listens_for(Session, "after_flush")
+def _marcar_escrita_flush(session, contexto_flush):
+    session.info["escreveu"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _marcar_escrita_dml(estado):
+    if estado.is_update or estado.is_delete or estado.is_insert:
+        estado.session.info["escreveu"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _registrar_escrita(session):
+    if session.info.pop("escreveu", False):
+        chave = _chave_consistencia.get()
+        if chave is not None and configuracao is not None and configuracao.urls_replicas:
+            _escritas_recentes.definir(chave, True)
+
+
+configuracao = None
+_escritas_recentes = CacheTTL(max_itens=100000, ttl=ConfiguracaoBanco.janela_primario)
+
+# as fábricas de sessão existem desde o import; as engines são associadas
+# a elas por configurar_banco
+SessionLocal = sessionmaker()
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False)
+# sessões somente leitura: usam as réplicas, quando configuradas
+AsyncSessionLeitura = async_sessionmaker(expire_on_commit=False, sync_session_class=SessaoRoteada)
+
+
+def configurar_banco(nova_configuracao=None):
+    """
+    Cria as engines do banco e as associa às fábricas de sessão.
+
+    Chamado por create_app com a configuração da aplicação. Sem
+    argumento, usa as variáveis de ambiente, e apenas se o banco ainda não
+    foi configurado: é o que acontece quando um script acessa db, db_async
+    ou db_replicas sem criar a aplicação. As engines não abrem conexões
+    ao serem criadas.
+
+    Args:
+        nova_configuracao (ConfiguracaoBanco, optional): Configuração do banco.
+    """
+    global configuracao, db, db_async, db_replicas, _escritas_recentes
+    if nova_configuracao is None:
+        if configuracao is not None:
+            return
+        nova_configuracao = ConfiguracaoBanco.do_ambiente()
+    if nova_configuracao == configuracao:
+        return
+
+    configuracao = nova_configuracao
+    db, db_async = criar_engines(configuracao)
+    db_replicas = criar_engines_replicas(configuracao)
+    _escritas_recentes = CacheTTL(max_itens=100000, ttl=configuracao.janela_primario)
+
+    SessionLocal.configure(bind=db)
+    AsyncSessionLocal.configure(bind=db_async)
+    AsyncSessionLeitura.configure(
+        bind=db_async,
+        info={"replicas": [replica.sync_engine for replica in db_replicas]},
+    )
+
+
+def __getattr__(nome):
+    # db, db_async e db_replicas só são criadas no primeiro acesso (ou por
+    # create_app), então importar este módulo não cria engines
+    if nome in ("db", "db_async", "db_replicas"):
+        configurar_banco()
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+async def aquecer_pool(engine, conexoes):
+    """
+    Abre conexões no pool antes do primeiro request.
+
+    As conexões são abertas ao mesmo tempo (cada uma executa um SELECT 1)
+    e devolvidas juntas ao pool, que passa a mantê-las abertas. Se alguma
+    falhar, as demais terminam de abrir e são devolvidas antes de o erro
+    ser propagado.
+
+    Args:
+        engine (AsyncEngine): Engine a ser aquecida.
+        conexoes (int): Quantidade de conexões.
+    """
+    async with AsyncExitStack() as pilha:
+        async def abrir():
+            conexao = await pilha.enter_async_context(engine.connect())
+            await conexao.execute(text("SELECT 1"))
+
+        resultados = await asyncio.gather(*(abrir() for _ in range(conexoes)), return_exceptions=True)
+        for resultado in resultados:
+            if isinstance(resultado, BaseException):
+                raise resultado
+
+
+async def fechar_banco():
+    """
+    Fecha as conexões de todas as engines configuradas.
+    """
+    if configuracao is None:
+        return
+    await db_async.dispose()
+    for replica in db_replicas:
+        await replica.dispose()
+    db.dispose()
+
+
+def estatisticas_pool(engine=None):
+    """
+    Retorna as estatísticas do pool de conexões de uma engine.
+
+    Args:
+        engine (Engine | AsyncEngine, optional): Engine a ser inspecionada.
+            Por padrão, a engine assíncrona usada pelas rotas.
+
+    Returns:
+        dict: Tamanho, conexões livres, em uso e overflow do pool.
+    """
+    if engine is None:
+        configurar_banco()
+        engine = db_async
+    pool = engine.pool
+    estatisticas = {"pool": type(pool).__name__}
+    for nome, metodo in (
+        ("tamanho", "size"),
+        ("livres", "checkedin"),
+        ("em_uso", "checkedout"),
+        ("overflow", "overflow"),
+    ):
+        if hasattr(pool, metodo):
+            estatisticas[nome] = getattr(pool, metodo)()
+    return estatisticas
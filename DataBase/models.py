@@ -1,13 +1,37 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean, Float
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Index, Column, Integer, String, Date, DateTime, ForeignKey, Boolean, Numeric
+from sqlalchemy.orm import declarative_base, relationship, validates
 from sqlalchemy_utils.types import ChoiceType
 import bcrypt
 
-db = create_engine("mysql+pymysql://root:@localhost:3306/meubanco")
-
 Base = declarative_base()
 
 
+def normalizar_email(email):
+    """
+    Normaliza um email para comparação (sem espaços nas pontas e em minúsculas).
+
+    Args:
+        email (str): Email informado.
+
+    Returns:
+        str: Email normalizado.
+    """
+    return email.strip().lower()
+
+
+def normalizar_produto(valor):
+    """
+    Normaliza o sabor ou o tamanho de um produto do catálogo.
+
+    Args:
+        valor (str): Sabor ou tamanho informado.
+
+    Returns:
+        str: Valor sem espaços nas pontas e em minúsculas.
+    """
+    return valor.strip().lower()
+
+
 class User(Base):
     """
     Model que representa um usuário do sistema.
@@ -15,17 +39,22 @@ class User(Base):
     Attributes:
         id (int): Identificador único do usuário.
         name (str): Nome do usuário.
-        email (str): Email do usuário (único).
+        email (str): Email do usuário (único), como informado no cadastro.
+        email_normalizado (str): Email normalizado (único), usado nas buscas por email.
         senha (str): Senha do usuário (hash).
         ativo (bool): Indica se o usuário está ativo.
         admin (bool): Indica se o usuário possui permissões administrativas.
     """
 
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_email_normalizado", "email_normalizado", unique=True),
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True, nullable=False)
     name = Column("name", String(50), nullable=False)
     email = Column("email", String(50), unique=True, nullable=False)
+    email_normalizado = Column("email_normalizado", String(50), nullable=False)
     senha = Column("senha", String(500), nullable=False)
     ativo = Column("ativo", Boolean, nullable=False)
     admin = Column("admin", Boolean, default=False)
@@ -47,6 +76,12 @@ class User(Base):
         self.ativo = ativo
         self.admin = admin
 
+    @validates("email")
+    def _validar_email(self, chave, email):
+        # mantém email_normalizado sincronizado sempre que o email mudar
+        self.email_normalizado = normalizar_email(email)
+        return email
+
 
 class Pedido(Base):
     """
@@ -56,11 +91,19 @@ class Pedido(Base):
         id (int): Identificador do pedido.
         status (str): Status do pedido (PENDENTE, CANCELADO, FINALIZADO).
         usuario (int): ID do usuário dono do pedido.
-        preco (float): Valor total do pedido.
+        preco (Decimal): Valor total do pedido.
+        versao (int): Versão da linha. Começa em 1 (default do banco) e é incrementada
+            pelos UPDATEs de preço (Services/pedidos.py) e de status (Services/estados_pedido.py).
+        finalizado_em (datetime | None): Momento (UTC) da finalização do pedido.
         itens (list): Lista de itens associados ao pedido.
     """
 
     __tablename__ = "pedidos"
+    __table_args__ = (
+        Index("ix_pedidos_usuario_id", "usuario", "id"),
+        Index("ix_pedidos_status_id", "status", "id"),
+        Index("ix_pedidos_usuario_status_id", "usuario", "status", "id"),
+    )
 
     STATUS_PEDIDOS = (
         ("PENDENTE", "PENDENTE"),
@@ -71,7 +114,9 @@ class Pedido(Base):
     id = Column("id", Integer, primary_key=True, autoincrement=True, nullable=False)
     status = Column("status", String(50), nullable=False)
     usuario = Column("usuario", ForeignKey('users.id'), nullable=False)
-    preco = Column("preco", Float, nullable=False)
+    preco = Column("preco", Numeric(10, 2), nullable=False)
+    versao = Column("versao", Integer, nullable=False, server_default="1")
+    finalizado_em = Column("finalizado_em", DateTime, nullable=True)
     itens = relationship("ItemPedido", cascade="all, delete")
 
     def __init__(self, usuario, status="PENDENTE", preco=0):
@@ -92,7 +137,7 @@ class Pedido(Base):
         Calcula e atualiza o preço total do pedido
         com base nos itens associados.
         """
-        self.preco = sum(item.preco_unitario * item.quantidade for item in self.itens)
+        self.preco = sum(item.subtotal() for item in self.itens)
 
 
 class ItemPedido(Base):
@@ -104,17 +149,20 @@ class ItemPedido(Base):
         quantidade (int): Quantidade do item.
         sabor (str): Sabor do item.
         tamanho (str): Tamanho do item.
-        preco_unitario (float): Preço unitário.
+        preco_unitario (Decimal): Preço unitário.
         pedido (int): ID do pedido associado.
     """
 
     __tablename__ = "itens_pedidos"
+    __table_args__ = (
+        Index("ix_itens_pedidos_pedido_id", "pedido", "id"),
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     quantidade = Column("quantidade", Integer, nullable=False)
     sabor = Column("sabor", String(50), nullable=False)
     tamanho = Column("tamanho", String(50), nullable=False)
-    preco_unitario = Column("preco_unitario", Float, nullable=False)
+    preco_unitario = Column("preco_unitario", Numeric(10, 2), nullable=False)
     pedido = Column("pedido", ForeignKey('pedidos.id'), nullable=False)
 
     def __init__(self, sabor, pedido, tamanho, quantidade, preco_unitario):
@@ -133,3 +181,184 @@ class ItemPedido(Base):
         self.tamanho = tamanho
         self.quantidade = quantidade
         self.preco_unitario = preco_unitario
+
+    def subtotal(self):
+        """
+        Calcula o valor total do item (preço unitário x quantidade).
+
+        Returns:
+            Decimal | float: Subtotal do item.
+        """
+        return self.preco_unitario * self.quantidade
+
+
+class ProdutoCatalogo(Base):
+    """
+    Model que representa um produto do catálogo (sabor x tamanho -> preço).
+
+    Sabor e tamanho são gravados normalizados (ver normalizar_produto). O
+    índice em memória (Services/catalogo.py) detecta alterações pela maior
+    versão da tabela, por isso produtos são desativados em vez de removidos.
+
+    Attributes:
+        id (int): Identificador do produto.
+        sabor (str): Sabor normalizado.
+        tamanho (str): Tamanho normalizado.
+        preco (Decimal): Preço unitário.
+        ativo (bool): Indica se o produto pode ser pedido.
+        versao (int): Versão do catálogo em que o produto foi alterado pela última vez.
+    """
+
+    __tablename__ = "catalogo"
+    __table_args__ = (
+        Index("ix_catalogo_sabor_tamanho", "sabor", "tamanho", unique=True),
+        Index("ix_catalogo_versao", "versao"),
+    )
+
+    id = Column("id", Integer, primary_key=True, autoincrement=True)
+    sabor = Column("sabor", String(50), nullable=False)
+    tamanho = Column("tamanho", String(50), nullable=False)
+    preco = Column("preco", Numeric(10, 2), nullable=False)
+    ativo = Column("ativo", Boolean, nullable=False, default=True)
+    versao = Column("versao", Integer, nullable=False)
+
+    def __init__(self, sabor, tamanho, preco, versao, ativo=True):
+        """
+        Inicializa um novo produto do catálogo.
+
+        Args:
+            sabor (str): Sabor do produto.
+            tamanho (str): Tamanho do produto.
+            preco (Decimal): Preço unitário.
+            versao (int): Versão do catálogo.
+            ativo (bool, optional): Define se o produto pode ser pedido.
+        """
+        self.sabor = normalizar_produto(sabor)
+        self.tamanho = normalizar_produto(tamanho)
+        self.preco = preco
+        self.versao = versao
+        self.ativo = ativo
+
+
+class VersaoCatalogo(Base):
+    """
+    Model do contador de versões do catálogo (uma única linha, id 1).
+
+    Cada alteração do catálogo incrementa o contador com um UPDATE, que
+    bloqueia a linha até o commit: alterações simultâneas recebem versões
+    diferentes e são confirmadas na ordem das versões.
+
+    Attributes:
+        id (int): Sempre 1.
+        versao (int): Última versão atribuída.
+    """
+
+    __tablename__ = "catalogo_versao"
+
+    id = Column("id", Integer, primary_key=True, autoincrement=False)
+    versao = Column("versao", Integer, nullable=False)
+
+
+class ResumoVendasDia(Base):
+    """
+    Resumo das vendas (pedidos finalizados) por dia de finalização.
+
+    Attributes:
+        dia (date): Dia da finalização (UTC).
+        pedidos (int): Pedidos finalizados no dia.
+        receita (Decimal): Soma do preço dos pedidos finalizados no dia.
+    """
+
+    __tablename__ = "resumo_vendas_dia"
+
+    dia = Column("dia", Date, primary_key=True)
+    pedidos = Column("pedidos", Integer, nullable=False, default=0)
+    receita = Column("receita", Numeric(12, 2), nullable=False, default=0)
+
+
+class ResumoVendasProduto(Base):
+    """
+    Resumo das vendas (itens de pedidos finalizados) por sabor e tamanho.
+
+    Attributes:
+        sabor (str): Sabor do item.
+        tamanho (str): Tamanho do item.
+        quantidade (int): Unidades vendidas.
+        receita (Decimal): Soma de preço unitário x quantidade.
+    """
+
+    __tablename__ = "resumo_vendas_produto"
+    __table_args__ = (
+        Index("ix_resumo_vendas_produto_quantidade", "quantidade"),
+    )
+
+    sabor = Column("sabor", String(50), primary_key=True)
+    tamanho = Column("tamanho", String(50), primary_key=True)
+    quantidade = Column("quantidade", Integer, nullable=False, default=0)
+    receita = Column("receita", Numeric(12, 2), nullable=False, default=0)
+
+
+class ResumoPedidosStatus(Base):
+    """
+    Quantidade de pedidos em cada status.
+
+    Attributes:
+        status (str): Status do pedido.
+        pedidos (int): Pedidos atualmente no status.
+    """
+
+    __tablename__ = "resumo_pedidos_status"
+
+    status = Column("status", String(50), primary_key=True)
+    pedidos = Column("pedidos", Integer, nullable=False, default=0)
+
+
+class ResumoGastosUsuario(Base):
+    """
+    Resumo dos gastos (pedidos finalizados) de cada usuário.
+
+    Attributes:
+        usuario (int): ID do usuário.
+        pedidos (int): Pedidos finalizados do usuário.
+        total (Decimal): Soma do preço dos pedidos finalizados do usuário.
+    """
+
+    __tablename__ = "resumo_gastos_usuario"
+    __table_args__ = (
+        Index("ix_resumo_gastos_usuario_total", "total"),
+    )
+
+    usuario = Column("usuario", ForeignKey('users.id'), primary_key=True)
+    pedidos = Column("pedidos", Integer, nullable=False, default=0)
+    total = Column("total", Numeric(12, 2), nullable=False, default=0)
+
+
+class TokenRevogado(Base):
+    """
+    Model que representa um token JWT (refresh rotacionado) ou uma família
+    de tokens (logout ou reutilização de refresh token) revogados.
+
+    A chave primária é o jti do token ou o identificador da família: revogar
+    o mesmo refresh token duas vezes viola a chave, o que identifica a
+    reutilização de um token já rotacionado. As linhas podem ser apagadas
+    depois de expira_em, quando o token deixa de ser aceito de qualquer forma.
+
+    Attributes:
+        jti (str): Identificador do token (claim "jti") ou da família (claim "familia").
+        usuario (int): ID do usuário dono do token.
+        tipo (str): "access", "refresh" ou "familia".
+        expira_em (datetime): Expiração (UTC) do token.
+        revogado_em (datetime): Momento (UTC) da revogação.
+    """
+
+    __tablename__ = "tokens_revogados"
+    __table_args__ = (
+        Index("ix_tokens_revogados_revogado_em", "revogado_em"),
+        Index("ix_tokens_revogados_expira_em", "expira_em"),
+    )
+
+    jti = Column("jti", String(32), primary_key=True)
+    usuario = Column("usuario", ForeignKey('users.id'), nullable=False)
+    tipo = Column("tipo", String(10), nullable=False)
+    expira_em = Column("expira_em", DateTime, nullable=False)
+    revogado_em = Column("revogado_em", DateTime, nullable=False)
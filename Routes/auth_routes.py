@@ -1,57 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException
-from DataBase.models import User
-from Routes.dependencies import pegar_session, verificar_token
-from main import SECRET_KEY, ALGORITHM, ACCES_TOKEN_EXPIRES_MINUTES
-from schemas import UsuarioSchemas, LoginSchema
-from sqlalchemy.orm import Session
-import bcrypt
-from jose import jwt, JWTError
+from fastapi import APIRouter, Depends, HTTPException, Request
+from DataBase.models import User, normalizar_email
+from Routes.dependencies import pegar_session_async, verificar_token, decodificar_token, oauth2_schema
+from config import obter_configuracoes
+from schemas import (
+    UsuarioSchemas, LoginSchema, LogoutSchema, ResponseMessageSchema, ResponseMensagemSchema,
+    ResponseAccessTokenSchema, ResponseTokensSchema
+)
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from Services.senhas import servico_senhas
+from Services.autenticacao import UsuarioAutenticado, cache_usuarios, claims_usuario
+from Services.revogacao import revogar, revogar_familia, familia_revogada, TokenReutilizado
+from Services.limite_login import limitador_login, LimiteExcedido
+from jose import jwt
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+import uuid
 from fastapi.security import OAuth2PasswordRequestForm
 
 auth_router = APIRouter(prefix="/auth", tags=['Auth'])
 
 
-def criar_token(id_usuario, duracao_token=timedelta(minutes=ACCES_TOKEN_EXPIRES_MINUTES)):
+def criar_token(id_usuario, duracao_token=None, claims=None, tipo="access", familia=None):
     """
     Cria um token JWT para autenticação do usuário.
 
+    Todo token recebe um identificador único (claim "jti"), usado na
+    revogação, o seu tipo (claim "tipo"): rotas protegidas aceitam apenas
+    "access" e /auth/refresh apenas "refresh"; e a família (claim
+    "familia"), compartilhada pelos tokens de um mesmo login.
+
     Args:
         id_usuario (int): ID do usuário que será armazenado no token.
         duracao_token (timedelta, optional): Tempo de validade do token.
+            Padrão: minutos_token das configurações.
+        claims (dict, optional): Claims extras (ex: "admin" e "ativo").
+        tipo (str, optional): "access" ou "refresh".
+        familia (str, optional): Família do token. Padrão: uma nova família.
 
     Returns:
         str: Token JWT codificado.
     """
+    configuracoes = obter_configuracoes()
+    duracao_token = duracao_token or timedelta(minutes=configuracoes.minutos_token)
     data_expiracao = datetime.now(timezone.utc) + duracao_token
-    dic_info = {'sub': str(id_usuario), 'exp': data_expiracao}
-    jwt_codificado = jwt.encode(dic_info, SECRET_KEY, ALGORITHM)
+    dic_info = {
+        'sub': str(id_usuario), 'exp': data_expiracao, 'jti': uuid.uuid4().hex, 'tipo': tipo,
+        'familia': familia or uuid.uuid4().hex, **(claims or {})
+    }
+    jwt_codificado = jwt.encode(dic_info, configuracoes.secret_key, configuracoes.algoritmo)
     return jwt_codificado
 
 
-def autenticar_usuario(email, senha, session):
+def criar_tokens(usuario, familia=None):
+    """
+    Cria o par access token e refresh token de um usuário.
+
+    Args:
+        usuario (User | UsuarioAutenticado): Usuário autenticado.
+        familia (str, optional): Família dos tokens (a do refresh token
+            trocado, na rotação). Padrão: uma nova família (novo login).
+
+    Returns:
+        dict: Access token, refresh token e tipo do token.
+    """
+    familia = familia or uuid.uuid4().hex
+    return {
+        'access_token': criar_token(usuario.id, claims=claims_usuario(usuario), familia=familia),
+        'refresh_token': criar_token(
+            usuario.id,
+            duracao_token=timedelta(days=obter_configuracoes().dias_refresh),
+            tipo="refresh",
+            familia=familia
+        ),
+        'token_type': 'bearer'
+    }
+
+
+async def verificar_limite_login(request, email):
+    """
+    Aplica o limite de tentativas de login por IP e por email.
+
+    Chamado antes de autenticar_usuario, para que tentativas em excesso
+    sejam recusadas sem consultar o banco nem calcular o hash da senha.
+
+    Args:
+        request (Request): Requisição HTTP, de onde vem o IP do cliente.
+        email (str): Email informado no login.
+
+    Raises:
+        HTTPException: 429 com o header Retry-After se o limite foi excedido.
+    """
+    ip = request.client.host if request.client else None
+    try:
+        await limitador_login.verificar(ip, email)
+    except LimiteExcedido as erro:
+        raise HTTPException(status_code=429, detail=str(erro), headers={"Retry-After": str(erro.espera)})
+
+
+async def autenticar_usuario(email, senha, session):
     """
     Autentica um usuário a partir do email e senha.
 
+    A busca usa o email normalizado (índice único em email_normalizado).
+    Se o usuário não existir, a senha é verificada contra um hash fictício,
+    para que o custo seja o mesmo de uma senha errada e o tempo de resposta
+    não revele se o email está cadastrado.
+
+    Caso o hash armazenado use parâmetros obsoletos do bcrypt_context,
+    a senha é rehasheada e atualizada no banco.
+
     Args:
         email (str): Email do usuário.
         senha (str): Senha em texto plano informada pelo usuário.
-        session (Session): Sessão do SQLAlchemy.
+        session (AsyncSession): Sessão do SQLAlchemy.
 
     Returns:
         User | bool: Retorna o usuário autenticado ou False se falhar.
     """
-    usuario = session.query(User).filter(User.email == email).first()
-    senha_bytes = senha.encode('utf-8')
+    usuario = await session.scalar(select(User).where(User.email_normalizado == normalizar_email(email)))
 
     if not usuario:
+        return await servico_senhas.verificar_ficticio(senha)
+    senha_valida, novo_hash = await servico_senhas.verificar(senha, usuario.senha)
+    if not senha_valida:
         return False
-    if not bcrypt.checkpw(senha_bytes, usuario.senha.encode('utf-8')):
-        return False
+    if novo_hash:
+        usuario.senha = novo_hash
+        await session.commit()
     return usuario
 
 
-@auth_router.get('/')
+@auth_router.get('/', response_model=ResponseMessageSchema)
 async def home():
     """
     Endpoint base do módulo de autenticação.
@@ -62,14 +143,19 @@ async def home():
     return {'message': 'Path Auth'}
 
 
-@auth_router.post('/signup')
-async def signup(usuario_schema: UsuarioSchemas, session: Session = Depends(pegar_session)):
+@auth_router.post('/signup', response_model=ResponseMensagemSchema)
+async def signup(usuario_schema: UsuarioSchemas, session: AsyncSession = Depends(pegar_session_async)):
     """
     Realiza o cadastro de um novo usuário.
 
+    A existência do email é verificada pelo índice de email_normalizado
+    antes do hash da senha, então cadastros duplicados não gastam um bcrypt.
+    Dois cadastros simultâneos do mesmo email são resolvidos pela
+    restrição única: o segundo INSERT falha e recebe o mesmo erro 400.
+
     Args:
         usuario_schema (UsuarioSchemas): Dados do usuário para cadastro.
-        session (Session): Sessão do banco de dados.
+        session (AsyncSession): Sessão do banco de dados.
 
     Raises:
         HTTPException: Caso o email já esteja cadastrado.
@@ -77,74 +163,81 @@ async def signup(usuario_schema: UsuarioSchemas, session: Session = Depends(pega
     Returns:
         dict: Mensagem de sucesso após criação do usuário.
     """
-    senha_bytes = usuario_schema.senha.encode('utf-8')
-    hash = bcrypt.hashpw(senha_bytes, bcrypt.gensalt())
-    hash_senha = hash.decode('utf-8')
-
-    usuario = session.query(User).filter(User.email == usuario_schema.email).first()
+    email_existente = await session.scalar(
+        select(User.id).where(User.email_normalizado == normalizar_email(usuario_schema.email))
+    )
+    if email_existente:
+        raise HTTPException(status_code=400, detail="Email do usuário já cadastrada")
 
-    if usuario:
+    hash_senha = await servico_senhas.gerar_hash(usuario_schema.senha)
+    novo_usuario = User(
+        usuario_schema.nome,
+        usuario_schema.email,
+        hash_senha,
+        usuario_schema.ativo,
+        usuario_schema.admin
+    )
+    session.add(novo_usuario)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Email do usuário já cadastrada")
-    else:
-        novo_usuario = User(
-            usuario_schema.nome,
-            usuario_schema.email,
-            hash_senha,
-            usuario_schema.ativo,
-            usuario_schema.admin
-        )
-        session.add(novo_usuario)
-        session.commit()
-        return {'mensagem': f'Usuário criado com sucesso! Email: {usuario_schema.email}'}
+    return {'mensagem': f'Usuário criado com sucesso! Email: {usuario_schema.email}'}
 
 
-@auth_router.post('/login')
-async def login(login_schema: LoginSchema, session: Session = Depends(pegar_session)):
+@auth_router.post('/login', response_model=ResponseTokensSchema)
+async def login(
+    login_schema: LoginSchema,
+    request: Request,
+    session: AsyncSession = Depends(pegar_session_async)
+):
     """
     Realiza o login do usuário utilizando email e senha.
 
     Args:
         login_schema (LoginSchema): Credenciais de login.
-        session (Session): Sessão do banco de dados.
+        request (Request): Requisição HTTP, usada no limite de tentativas.
+        session (AsyncSession): Sessão do banco de dados.
 
     Raises:
-        HTTPException: Caso email ou senha estejam incorretos.
+        HTTPException: Caso email ou senha estejam incorretos, ou 429 se
+            o limite de tentativas foi excedido.
 
     Returns:
         dict: Access token, refresh token e tipo do token.
     """
-    usuario = autenticar_usuario(login_schema.email, login_schema.senha, session)
+    await verificar_limite_login(request, login_schema.email)
+    usuario = await autenticar_usuario(login_schema.email, login_schema.senha, session)
     if not usuario:
         raise HTTPException(status_code=400, detail="Email ou senha incorreto")
     else:
-        access_token = criar_token(usuario.id)
-        refresh_token = criar_token(usuario.id, duracao_token=timedelta(days=7))
-        return {
-            'access_token': access_token,
-            'refresh_token': refresh_token,
-            'token_type': 'bearer'
-        }
+        return criar_tokens(usuario)
 
 
-@auth_router.post('/login-form')
+@auth_router.post('/login-form', response_model=ResponseAccessTokenSchema)
 async def login_form(
+    request: Request,
     dados_formulario: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(pegar_session)
+    session: AsyncSession = Depends(pegar_session_async)
 ):
     """
     Realiza login utilizando formulário OAuth2 (username/password).
 
     Args:
+        request (Request): Requisição HTTP, usada no limite de tentativas.
         dados_formulario (OAuth2PasswordRequestForm): Dados do formulário.
-        session (Session): Sessão do banco de dados.
+        session (AsyncSession): Sessão do banco de dados.
 
     Raises:
-        HTTPException: Caso as credenciais estejam incorretas.
+        HTTPException: Caso as credenciais estejam incorretas, ou 429 se
+            o limite de tentativas foi excedido.
 
     Returns:
         dict: Access token e tipo do token.
     """
-    usuario = autenticar_usuario(
+    await verificar_limite_login(request, dados_formulario.username)
+    usuario = await autenticar_usuario(
         dados_formulario.username,
         dados_formulario.password,
         session
@@ -152,26 +245,97 @@ async def login_form(
     if not usuario:
         raise HTTPException(status_code=400, detail="Email ou senha incorreto")
     else:
-        access_token = criar_token(usuario.id)
+        access_token = criar_token(usuario.id, claims=claims_usuario(usuario))
         return {
             'access_token': access_token,
             'token_type': 'bearer'
         }
 
 
-@auth_router.get('/refresh')
-async def use_refresh_token(usuario: User = Depends(verificar_token)):
+@auth_router.api_route('/refresh', methods=['POST', 'GET'], response_model=ResponseTokensSchema)
+async def use_refresh_token(
+    token: str = Depends(oauth2_schema),
+    session: AsyncSession = Depends(pegar_session_async)
+):
+    """
+    Troca um refresh token por um novo par de tokens (rotação).
+
+    O refresh token recebido é revogado no banco e não pode ser usado de
+    novo. Uma segunda tentativa com o mesmo token (ex: token vazado e usado
+    pelo atacante e pelo usuário) é detectada pela chave única de
+    tokens_revogados, inclusive entre workers, e revoga a família inteira:
+    os tokens emitidos a partir daquele login deixam de valer. O método GET
+    é mantido por compatibilidade.
+
+    Args:
+        token (str): Refresh token (header Authorization).
+        session (AsyncSession): Sessão do banco de dados.
+
+    Raises:
+        HTTPException: 401 se o token não for um refresh token válido, se
+            já tiver sido usado, se a família estiver revogada ou se o
+            usuário não existir ou estiver inativo.
+
+    Returns:
+        dict: Novo access token, novo refresh token e tipo do token.
     """
-    Gera um novo access token a partir de um token válido.
+    dic_info = decodificar_token(token, "refresh")
+    id_usuario = int(dic_info["sub"])
+    usuario = cache_usuarios.obter(id_usuario)
+    if not usuario:
+        usuario_db = await session.scalar(select(User).where(User.id == id_usuario))
+        if not usuario_db:
+            raise HTTPException(status_code=401, detail='Acesso Inválido')
+        usuario = UsuarioAutenticado.do_usuario(usuario_db)
+        cache_usuarios.definir(id_usuario, usuario)
+    if not usuario.ativo:
+        raise HTTPException(status_code=401, detail='Usuário inativo')
+
+    if await familia_revogada(session, dic_info["familia"]):
+        raise HTTPException(status_code=401, detail='Token revogado')
+    try:
+        await revogar(session, dic_info)
+    except TokenReutilizado:
+        await revogar_familia(session, dic_info["familia"], id_usuario)
+        raise HTTPException(status_code=401, detail='Refresh token já utilizado')
+    return criar_tokens(usuario, familia=dic_info["familia"])
+
+
+@auth_router.post('/logout', response_model=ResponseMensagemSchema)
+async def logout(
+    logout_schema: Optional[LogoutSchema] = None,
+    token: str = Depends(oauth2_schema),
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async)
+):
+    """
+    Encerra a sessão: revoga a família do access token da requisição (o
+    access token e o refresh token do mesmo login) e, se enviado, a do
+    refresh token informado.
+
+    A revogação vale na hora neste worker e em /auth/refresh e, nas rotas
+    protegidas dos demais workers, após a próxima sincronização da lista
+    de tokens revogados (REVOGACAO_SINCRONIA).
 
     Args:
-        usuario (User): Usuário autenticado via dependency.
+        logout_schema (LogoutSchema, optional): Refresh token a ser revogado.
+        token (str): Access token (header Authorization).
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+
+    Raises:
+        HTTPException: 401 se o refresh token for inválido ou de outro usuário.
 
     Returns:
-        dict: Novo access token e tipo do token.
+        dict: Confirmação do logout.
     """
-    access_token = criar_token(usuario.id)
-    return {
-        'access_token': access_token,
-        'token_type': 'Bearer'
-    }
+    familias = {decodificar_token(token, "access")["familia"]}
+    if logout_schema and logout_schema.refresh_token:
+        dic_refresh = decodificar_token(logout_schema.refresh_token, "refresh")
+        if int(dic_refresh["sub"]) != usuario.id:
+            raise HTTPException(status_code=401, detail='Acesso Negado')
+        familias.add(dic_refresh["familia"])
+
+    for familia in sorted(familias):
+        await revogar_familia(session, familia, usuario.id)
+    return {'mensagem': 'Logout realizado com sucesso!'}
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException
+from Routes.dependencies import pegar_session_async, verificar_token
+from schemas import ProdutoCatalogoSchema, ResponseCatalogoSchema, ResponseMensagemSchema
+from sqlalchemy.ext.asyncio import AsyncSession
+from Services.autenticacao import UsuarioAutenticado
+from Services.catalogo import indice_catalogo, salvar_produto
+from decimal import Decimal
+
+catalogo_router = APIRouter(
+    prefix="/catalogo",
+    tags=['Catalogo'],
+    dependencies=[Depends(verificar_token)]
+)
+
+
+def exigir_admin(usuario):
+    """
+    Garante que o usuário é administrador.
+
+    Args:
+        usuario (UsuarioAutenticado): Usuário autenticado.
+
+    Raises:
+        HTTPException: 403 se o usuário não for administrador.
+    """
+    if not usuario.admin:
+        raise HTTPException(
+            status_code=403,
+            detail='Você não tem autorização para fazer essa operação'
+        )
+
+
+@catalogo_router.get('/', response_model=ResponseCatalogoSchema)
+async def listar_catalogo(session: AsyncSession = Depends(pegar_session_async)):
+    """
+    Lista os produtos ativos do catálogo.
+
+    A resposta vem do índice em memória; o banco só é consultado na
+    primeira carga do processo.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        dict: Versão do catálogo e produtos ativos.
+    """
+    await indice_catalogo.garantir_carregado(session)
+    return {'versao': indice_catalogo.versao, 'produtos': indice_catalogo.produtos()}
+
+
+@catalogo_router.post('/produto', response_model=ResponseCatalogoSchema)
+async def salvar_produto_catalogo(
+    produto_schema: ProdutoCatalogoSchema,
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async)
+):
+    """
+    Cria um produto no catálogo ou atualiza o preço de um existente.
+
+    Apenas usuários administradores podem acessar. Os itens já adicionados
+    a pedidos mantêm o preço da época.
+
+    Args:
+        produto_schema (ProdutoCatalogoSchema): Sabor, tamanho e preço.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        dict: Catálogo atualizado.
+    """
+    exigir_admin(usuario)
+    await salvar_produto(
+        session, produto_schema.sabor, produto_schema.tamanho, Decimal(str(produto_schema.preco))
+    )
+    return {'versao': indice_catalogo.versao, 'produtos': indice_catalogo.produtos()}
+
+
+@catalogo_router.post('/produto/desativar', response_model=ResponseMensagemSchema)
+async def desativar_produto_catalogo(
+    sabor: str,
+    tamanho: str,
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async)
+):
+    """
+    Desativa um produto do catálogo, impedindo novos pedidos dele.
+
+    Apenas usuários administradores podem acessar.
+
+    Args:
+        sabor (str): Sabor do produto.
+        tamanho (str): Tamanho do produto.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        dict: Confirmação da desativação.
+    """
+    exigir_admin(usuario)
+    produto = await salvar_produto(session, sabor, tamanho, None, ativo=False)
+    if produto is None:
+        raise HTTPException(status_code=400, detail='Produto não existe')
+    return {'mensagem': f'Produto {produto.sabor} ({produto.tamanho}) desativado com sucesso!'}
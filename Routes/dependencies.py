@@ -1,8 +1,22 @@
-from fastapi import Depends, HTTPException
-from DataBase.models import db, User
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi import Depends, HTTPException, Header, Request, Response
+from fastapi.security import OAuth2PasswordBearer
+from DataBase.models import User
+from DataBase.database import (
+    SessionLocal, AsyncSessionLocal, AsyncSessionLeitura,
+    definir_chave_consistencia, escreveu_recentemente
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
-from main import SECRET_KEY, ALGORITHM, oauth2_schema
+from config import obter_configuracoes
+from Services.autenticacao import UsuarioAutenticado, cache_usuarios
+from Services.metricas import medir_etapa
+from Services.revogacao import lista_revogacao
+from Services import idempotencia
+from Services.idempotencia import RequisicaoIdempotente, impressao_requisicao, EM_ANDAMENTO
+from typing import Optional
+
+oauth2_schema = OAuth2PasswordBearer(tokenUrl="auth/login-form")
 
 
 def pegar_session():
@@ -12,36 +26,177 @@ def pegar_session():
     Yields:
         Session: Sessão ativa do SQLAlchemy.
     """
+    session = SessionLocal()
     try:
-        SessionLocal = sessionmaker(bind=db)
-        session = SessionLocal()
         yield session
     finally:
         session.close()
 
 
-def verificar_token(token: str = Depends(oauth2_schema), session: Session = Depends(pegar_session)):
+async def pegar_session_async():
     """
-    Valida o token JWT e retorna o usuário autenticado.
+    Cria e fornece uma sessão assíncrona do banco de dados.
+
+    Os objetos não são expirados no commit, pois em modo assíncrono
+    não é possível recarregar atributos de forma implícita (lazy).
+
+    Yields:
+        AsyncSession: Sessão assíncrona ativa do SQLAlchemy.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def decodificar_token(token, tipo):
+    """
+    Decodifica um token JWT e confere o tipo e a revogação.
+
+    A revogação do token e da sua família é conferida na lista em memória
+    (Services/revogacao.py), sem acesso ao banco. Refresh tokens trocados
+    não ficam nessa lista: a reutilização é detectada em /auth/refresh.
 
     Args:
         token (str): Token JWT.
-        session (Session): Sessão do banco de dados.
+        tipo (str): Tipo esperado ("access" ou "refresh").
 
     Returns:
-        User: Usuário autenticado.
+        dict: Claims do token.
 
     Raises:
-        HTTPException: Se o token for inválido ou usuário não existir.
+        HTTPException: 401 se o token for inválido, de outro tipo ou revogado.
     """
     try:
-        dic_info = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id_usuario = int(dic_info.get("sub"))
-    except JWTError:
+        configuracoes = obter_configuracoes()
+        dic_info = jwt.decode(token, configuracoes.secret_key, algorithms=[configuracoes.algoritmo])
+        int(dic_info.get("sub"))
+    except (JWTError, TypeError, ValueError):
         raise HTTPException(status_code=401, detail='Acesso Negado')
+    # tokens sem "tipo" ou "familia" (emitidos antes da rotação de refresh tokens) são recusados
+    if dic_info.get("tipo") != tipo or not dic_info.get("jti") or not dic_info.get("familia"):
+        raise HTTPException(status_code=401, detail='Acesso Negado')
+    if lista_revogacao.contem(dic_info["jti"]) or lista_revogacao.contem(dic_info["familia"]):
+        raise HTTPException(status_code=401, detail='Token revogado')
+    return dic_info
+
 
-    usuario = session.query(User).filter(User.id == id_usuario).first()
-    if not usuario:
-        raise HTTPException(status_code=401, detail='Acesso Inválido')
+async def verificar_token(
+    token: str = Depends(oauth2_schema),
+    session: AsyncSession = Depends(pegar_session_async)
+):
+    """
+    Valida o access token JWT e retorna o usuário autenticado.
 
+    Refresh tokens, tokens revogados e usuários inativos são recusados.
+    Tokens emitidos com as claims "admin" e "ativo" são autorizados sem
+    acesso ao banco. Nos demais, o usuário é buscado no cache de
+    autenticação e, somente em caso de falha, no banco de dados.
+
+    Args:
+        token (str): Token JWT.
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        UsuarioAutenticado: Usuário autenticado.
+
+    Raises:
+        HTTPException: Se o token for inválido, o usuário não existir ou
+            estiver inativo.
+    """
+    with medir_etapa("auth"):
+        dic_info = decodificar_token(token, "access")
+        id_usuario = int(dic_info["sub"])
+
+        usuario = UsuarioAutenticado.das_claims(dic_info) or cache_usuarios.obter(id_usuario)
+        if not usuario:
+            usuario_db = await session.scalar(select(User).where(User.id == id_usuario))
+            if not usuario_db:
+                raise HTTPException(status_code=401, detail='Acesso Inválido')
+
+            usuario = UsuarioAutenticado.do_usuario(usuario_db)
+            cache_usuarios.definir(id_usuario, usuario)
+        if not usuario.ativo:
+            raise HTTPException(status_code=401, detail='Usuário inativo')
+
+    definir_chave_consistencia(usuario.id)
     return usuario
+
+
+async def pegar_session_leitura(usuario: UsuarioAutenticado = Depends(verificar_token)):
+    """
+    Cria e fornece uma sessão assíncrona para rotas de leitura.
+
+    Os SELECTs são enviados às réplicas configuradas em
+    DATABASE_REPLICA_URLS; escritas e leituras feitas após uma escrita
+    na mesma sessão usam o primário. Se o usuário confirmou uma escrita
+    há menos de DB_REPLICA_JANELA_PRIMARIO segundos, todas as leituras
+    vão para o primário. Sem réplicas, equivale a pegar_session_async.
+
+    Args:
+        usuario (UsuarioAutenticado): Usuário autenticado.
+
+    Yields:
+        AsyncSession: Sessão assíncrona com roteamento de leitura.
+    """
+    async with AsyncSessionLeitura() as session:
+        if escreveu_recentemente(usuario.id):
+            session.sync_session.info["usar_primario"] = True
+        yield session
+
+
+async def verificar_idempotencia(
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    usuario: UsuarioAutenticado = Depends(verificar_token)
+):
+    """
+    Controla requisições repetidas com o header Idempotency-Key.
+
+    Na primeira requisição com a chave, ela é reservada e a rota deve salvar
+    a resposta com RequisicaoIdempotente.concluir. Repetições com o mesmo
+    corpo recebem a resposta salva (header Idempotent-Replayed) sem que a
+    rota acesse o banco. Se a rota falhar, a reserva é liberada. Sem o
+    header, a requisição é processada normalmente.
+
+    Args:
+        request (Request): Requisição atual.
+        response (Response): Resposta da rota, para o header de replay.
+        idempotency_key (str, optional): Valor do header Idempotency-Key.
+        usuario (UsuarioAutenticado): Usuário autenticado (as chaves são isoladas por usuário).
+
+    Yields:
+        RequisicaoIdempotente: Controle da requisição.
+
+    Raises:
+        HTTPException: 409 se a chave ainda estiver em processamento ou
+            422 se for reutilizada com outro corpo.
+    """
+    armazenamento = idempotencia.armazenamento_idempotencia
+    if idempotency_key is None:
+        yield RequisicaoIdempotente(armazenamento)
+        return
+
+    chave = f"{usuario.id}:{request.method}:{request.url.path}:{idempotency_key}"
+    impressao = impressao_requisicao(await request.body())
+    reservada = await armazenamento.reservar(
+        chave, {"estado": EM_ANDAMENTO, "impressao": impressao},
+        idempotencia.configuracao_idempotencia.ttl_reserva
+    )
+    if not reservada:
+        registro = await armazenamento.obter(chave)
+        if registro is None or registro["estado"] == EM_ANDAMENTO:
+            raise HTTPException(status_code=409, detail='Requisição com esta Idempotency-Key em andamento')
+        if registro["impressao"] != impressao:
+            raise HTTPException(
+                status_code=422,
+                detail='Idempotency-Key já utilizada com outra requisição'
+            )
+        response.headers["Idempotent-Replayed"] = "true"
+        yield RequisicaoIdempotente(armazenamento, resposta_salva=registro["resposta"])
+        return
+
+    controle = RequisicaoIdempotente(armazenamento, chave, impressao)
+    try:
+        yield controle
+    finally:
+        await controle.liberar()
@@ -0,0 +1,58 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from DataBase.database import estatisticas_pool
+from Services.metricas import registro_metricas, formatar_metrica, tempos_inicializacao
+from Services.senhas import servico_senhas
+from Services.eventos_pedido import broker_eventos
+from Services.revogacao import lista_revogacao
+
+metricas_router = APIRouter(tags=['Metricas'])
+
+
+@metricas_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metricas():
+    """
+    Expõe as métricas da aplicação no formato de texto do Prometheus.
+
+    Inclui as medições por rota (requisições, latência e queries SQL),
+    o estado do pool de conexões, do pool de hash de senhas, as
+    conexões abertas em /order/eventos, os tokens revogados em memória e
+    o tempo de inicialização do worker.
+
+    Returns:
+        PlainTextResponse: Métricas no formato de exposição do Prometheus.
+    """
+    pool = estatisticas_pool()
+    hash_senhas = servico_senhas.metricas()
+    linhas = registro_metricas.exportar()
+    for nome in ("tamanho", "livres", "em_uso", "overflow"):
+        if nome in pool:
+            linhas += formatar_metrica(
+                f"db_pool_{nome}", "gauge", f"Conexoes do pool ({nome}).",
+                [("", {"pool": pool["pool"]}, pool[nome])],
+            )
+    linhas += formatar_metrica(
+        "hash_senhas_aguardando", "gauge", "Operacoes de hash aguardando vaga.",
+        [("", {}, hash_senhas["aguardando"])],
+    )
+    linhas += formatar_metrica(
+        "hash_senhas_em_execucao", "gauge", "Operacoes de hash em execucao.",
+        [("", {}, hash_senhas["em_execucao"])],
+    )
+    linhas += formatar_metrica(
+        "hash_senhas_operacoes_total", "counter", "Operacoes de hash concluidas.",
+        [("", {}, hash_senhas["total_operacoes"])],
+    )
+    linhas += formatar_metrica(
+        "eventos_assinaturas", "gauge", "Conexoes abertas em /order/eventos neste worker.",
+        [("", {}, broker_eventos.assinaturas())],
+    )
+    linhas += formatar_metrica(
+        "tokens_revogados_memoria", "gauge", "Tokens revogados nao expirados na memoria deste worker.",
+        [("", {}, len(lista_revogacao))],
+    )
+    linhas += formatar_metrica(
+        "app_inicializacao_segundos", "gauge", "Duracao das etapas de inicializacao deste worker.",
+        [("", {"etapa": etapa}, round(duracao, 6)) for etapa, duracao in tempos_inicializacao.items()],
+    )
+    return PlainTextResponse("\n".join(linhas) + "\n", media_type="text/plain; version=0.0.4")
@@ -1,9 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from Routes.dependencies import pegar_session, verificar_token
-from schemas import PedidoSchemas, ItemPedidoSchema, ResponsePedidoSchema
-from sqlalchemy.orm import Session
-from DataBase.models import Pedido, User, ItemPedido
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from Routes.dependencies import pegar_session_async, pegar_session_leitura, verificar_token, verificar_idempotencia
+from schemas import (
+    PedidoSchemas, ItemPedidoSchema, LoteItensPedidoSchema, ResponsePedidoSchema,
+    ResponseListaPedidosSchema, ResponseDetalhePedidoSchema, ResponsePedidoAlteradoSchema,
+    ResponseItemCriadoSchema, ResponseItensCriadosSchema, ResponseItemRemovidoSchema,
+    ResponseReconciliacaoSchema, ResponseMessageSchema
+)
+from pydantic import TypeAdapter
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from DataBase.models import Pedido, ItemPedido
+from DataBase.database import AsyncSessionLeitura
+from config import obter_configuracoes
+from Services.autenticacao import UsuarioAutenticado
+from Services.idempotencia import RequisicaoIdempotente
+from Services.cache_respostas import cache_respostas, escopo_pedido, escopo_usuario
+from Services.eventos_pedido import broker_eventos, canal_usuario, evento_pedido, EVENTOS_HEARTBEAT
+from Services.pedidos import atualizar_preco, inserir_itens, reconciliar_precos
+from Services.catalogo import indice_catalogo, ItemForaDoCatalogo, PrecoDivergente
+from Services.relatorios import registrar_criacao, registrar_transicao
+from Services.estados_pedido import (
+    CANCELADO, FINALIZADO, STATUS_EDITAVEIS, ErroPedido, PedidoNaoEncontrado,
+    OperacaoNaoPermitida, TransicaoInvalida, transicionar_pedido
+)
+from functools import lru_cache
+from typing import List, Optional
+import asyncio
+import csv
+import io
+import orjson
 
 order_router = APIRouter(
     prefix="/order",
@@ -11,8 +38,290 @@ order_router = APIRouter(
     dependencies=[Depends(verificar_token)]
 )
 
+ESTRATEGIAS_CARREGAMENTO = {
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+
+
+def ler_carregamento_itens(padrao, valor):
+    """
+    Aplica a configuração de CARREGAMENTO_ITENS sobre as estratégias padrão.
+
+    Args:
+        padrao (dict): Estratégia padrão de cada endpoint.
+        valor (str): Pares "endpoint=estrategia" separados por vírgula
+            (ex: "ver_pedido=joined,listar_pedidos=selectin").
+
+    Returns:
+        dict: Estratégia de cada endpoint.
+
+    Raises:
+        ValueError: Se um par não tiver "=" ou citar endpoint ou estratégia desconhecidos.
+    """
+    carregamento = dict(padrao)
+    for config in filter(None, (parte.strip() for parte in valor.split(","))):
+        endpoint, separador, estrategia = (parte.strip() for parte in config.partition("="))
+        if not separador:
+            raise ValueError(f"CARREGAMENTO_ITENS: '{config}' deve estar no formato endpoint=estrategia")
+        if endpoint not in padrao:
+            raise ValueError(
+                f"CARREGAMENTO_ITENS: endpoint '{endpoint}' desconhecido (válidos: {', '.join(padrao)})"
+            )
+        if estrategia not in ESTRATEGIAS_CARREGAMENTO:
+            raise ValueError(
+                f"CARREGAMENTO_ITENS: estratégia '{estrategia}' desconhecida "
+                f"(válidas: {', '.join(ESTRATEGIAS_CARREGAMENTO)})"
+            )
+        carregamento[endpoint] = estrategia
+    return carregamento
+
+
+# estratégia padrão de carregamento de Pedido.itens por endpoint, sobrescrita
+# pelo carregamento_itens das configurações (ex: "ver_pedido=joined,listar_pedidos=selectin")
+CARREGAMENTO_ITENS_PADRAO = {
+    "listar_pedidos": "selectin",
+    "ver_pedido": "selectin",
+    "listar_pedidos_usuario": "selectin",
+}
+
+
+@lru_cache(maxsize=8)
+def carregamento_itens(valor):
+    """
+    Retorna a estratégia de cada endpoint para um valor de CARREGAMENTO_ITENS.
+
+    O resultado é guardado por valor, então a configuração é interpretada
+    uma única vez (create_app a interpreta na inicialização).
+
+    Args:
+        valor (str): Pares "endpoint=estrategia" separados por vírgula.
+
+    Returns:
+        dict: Estratégia de cada endpoint.
+
+    Raises:
+        ValueError: Se o valor for inválido (ver ler_carregamento_itens).
+    """
+    return ler_carregamento_itens(CARREGAMENTO_ITENS_PADRAO, valor)
+
+
+def carregar_itens(endpoint):
+    """
+    Retorna a opção de carregamento antecipado de Pedido.itens
+    configurada para o endpoint.
+
+    Carregar os itens na mesma consulta (joined) ou em uma única consulta
+    extra para todos os pedidos (selectin) evita uma query por pedido.
+
+    Args:
+        endpoint (str): Nome do endpoint.
+
+    Returns:
+        ORMOption: Opção de carregamento para o select.
+    """
+    estrategia = carregamento_itens(obter_configuracoes().carregamento_itens).get(endpoint, "selectin")
+    return ESTRATEGIAS_CARREGAMENTO[estrategia](Pedido.itens)
+
+
+def limite_pagina(limite: Optional[int] = Query(None, ge=1)):
+    """
+    Dependency com a quantidade de pedidos por página.
+
+    O padrão e o máximo vêm das configurações (limite_pagina_padrao e
+    limite_pagina_maximo).
+
+    Args:
+        limite (int, optional): Quantidade pedida pelo cliente.
+
+    Returns:
+        int: Quantidade de pedidos por página.
+
+    Raises:
+        HTTPException: 422 se o limite for maior que o máximo configurado.
+    """
+    configuracoes = obter_configuracoes()
+    if limite is None:
+        return configuracoes.limite_pagina_padrao
+    if limite > configuracoes.limite_pagina_maximo:
+        raise HTTPException(
+            status_code=422,
+            detail=f'limite deve ser no máximo {configuracoes.limite_pagina_maximo}'
+        )
+    return limite
+
+
+async def paginar_pedidos(session, filtros, cursor, limite, endpoint):
+    """
+    Busca uma página de pedidos usando paginação por cursor (keyset) em Pedido.id.
+
+    Em vez de OFFSET, filtra por id > cursor, o que usa os índices
+    compostos (usuario, id) e (status, id) e mantém o custo constante
+    independente da página.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        filtros (list): Condições aplicadas ao select.
+        cursor (int | None): Último id da página anterior.
+        limite (int): Quantidade máxima de pedidos na página.
+        endpoint (str): Endpoint usado para escolher o carregamento dos itens.
+
+    Returns:
+        tuple: (lista de pedidos, próximo cursor ou None na última página).
+    """
+    consulta = select(Pedido).where(*filtros)
+    if cursor is not None:
+        consulta = consulta.where(Pedido.id > cursor)
+    consulta = (
+        consulta
+        .order_by(Pedido.id)
+        .limit(limite + 1)
+        .options(carregar_itens(endpoint))
+    )
+    pedidos = (await session.execute(consulta)).unique().scalars().all()
+
+    proximo_cursor = None
+    if len(pedidos) > limite:
+        pedidos = pedidos[:limite]
+        proximo_cursor = pedidos[-1].id
+    return pedidos, proximo_cursor
+
+
+def validar_status(status):
+    """
+    Valida um filtro de status de pedido.
+
+    Args:
+        status (str | None): Status informado.
+
+    Raises:
+        HTTPException: Caso o status não exista.
+    """
+    if status is not None and status not in dict(Pedido.STATUS_PEDIDOS):
+        raise HTTPException(status_code=400, detail='Status de pedido inválido')
+
 
-@order_router.get("/")
+def erro_http(
+    erro,
+    mensagem_inexistente='Pedido não existe',
+    mensagem_permissao='Você não tem autorização para fazer essa operação'
+):
+    """
+    Converte um erro de regra de negócio do pedido na HTTPException correspondente.
+
+    Args:
+        erro (ErroPedido): Erro lançado pela camada de serviço.
+        mensagem_inexistente (str, optional): Mensagem para pedido inexistente (400).
+        mensagem_permissao (str, optional): Mensagem para falta de permissão (403).
+
+    Returns:
+        HTTPException: 400, 403 ou 409 (status do pedido não permite a operação).
+    """
+    if isinstance(erro, PedidoNaoEncontrado):
+        return HTTPException(status_code=400, detail=mensagem_inexistente)
+    if isinstance(erro, OperacaoNaoPermitida):
+        return HTTPException(status_code=403, detail=mensagem_permissao)
+    return HTTPException(status_code=409, detail=str(erro))
+
+
+async def notificar_alteracao(pedido):
+    """
+    Propaga uma alteração já confirmada de um pedido.
+
+    Invalida as respostas em cache que incluem o pedido e publica o novo
+    estado aos assinantes de /order/eventos do dono.
+
+    Args:
+        pedido (Pedido | Row): Pedido com id, usuario, status, preco e versao.
+    """
+    await cache_respostas.invalidar(escopo_pedido(pedido.id), escopo_usuario(pedido.usuario))
+    await broker_eventos.publicar(canal_usuario(pedido.usuario), evento_pedido(pedido))
+
+
+def precificar_item(item_schema):
+    """
+    Valida um item no índice do catálogo e retorna seus dados com o preço atual.
+
+    Args:
+        item_schema (ItemPedidoSchema): Item enviado pelo cliente.
+
+    Returns:
+        tuple: (sabor, tamanho, preço unitário) conforme o catálogo.
+
+    Raises:
+        HTTPException: 400 se o produto não estiver no catálogo ou 409 se o
+            preço enviado estiver desatualizado.
+    """
+    try:
+        return indice_catalogo.preco(item_schema.sabor, item_schema.tamanho, item_schema.preco_unitario)
+    except ItemForaDoCatalogo as erro:
+        raise HTTPException(status_code=400, detail=str(erro))
+    except PrecoDivergente as erro:
+        raise HTTPException(status_code=409, detail=str(erro))
+
+
+ADAPTADOR_DETALHE = TypeAdapter(ResponseDetalhePedidoSchema)
+ADAPTADOR_LISTA = TypeAdapter(List[ResponsePedidoSchema])
+
+
+def etag_corresponde(if_none_match, etag):
+    """
+    Verifica se o header If-None-Match contém o ETag da resposta.
+
+    Args:
+        if_none_match (str | None): Valor do header If-None-Match.
+        etag (str): ETag da resposta atual.
+
+    Returns:
+        bool: True se o cliente já possui a versão atual.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # comparação fraca (RFC 9110): W/"x" corresponde a "x"
+    return any(
+        valor.strip().removeprefix("W/") == etag
+        for valor in if_none_match.split(",")
+    )
+
+
+def ler_do_primario_para_cache(session, chave):
+    """
+    Envia ao primário as leituras que vão preencher o cache de respostas.
+
+    Uma réplica atrasada gravaria no cache uma versão anterior à última
+    escrita, servida até a próxima invalidação. Com o cache desligado
+    (chave None) a sessão continua lendo das réplicas.
+
+    Args:
+        session (AsyncSession): Sessão de leitura.
+        chave (str | None): Chave retornada por CacheRespostas.chave.
+    """
+    if chave is not None:
+        session.sync_session.info["usar_primario"] = True
+
+
+def responder_com_etag(request, registro):
+    """
+    Monta a resposta de um registro do cache de respostas.
+
+    Retorna 304 sem corpo quando o cliente envia If-None-Match com o ETag atual.
+
+    Args:
+        request (Request): Requisição HTTP.
+        registro (dict): Resposta registrada em cache_respostas.
+
+    Returns:
+        Response: Resposta 200 com o corpo JSON, ou 304.
+    """
+    headers = {"ETag": registro["etag"], "Cache-Control": "private, no-cache", **registro["headers"]}
+    if etag_corresponde(request.headers.get("if-none-match"), registro["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=registro["corpo"], media_type="application/json", headers=headers)
+
+
+@order_router.get("/", response_model=ResponseMessageSchema)
 async def pedidos():
     """
     Endpoint base do módulo de pedidos.
@@ -23,61 +332,74 @@ async def pedidos():
     return {"message": "Path order"}
 
 
-@order_router.post('/pedidos')
+@order_router.post('/pedidos', response_model=ResponseMessageSchema)
 async def criar_pedidos(
     pedido_schema: PedidoSchemas,
-    session: Session = Depends(pegar_session)
+    session: AsyncSession = Depends(pegar_session_async),
+    idempotencia: RequisicaoIdempotente = Depends(verificar_idempotencia)
 ):
     """
     Cria um novo pedido para um usuário.
 
+    Com o header Idempotency-Key, novas tentativas da mesma requisição
+    recebem a resposta original em vez de criar outro pedido.
+
     Args:
         pedido_schema (PedidoSchemas): Dados do pedido.
-        session (Session): Sessão do banco de dados.
+        session (AsyncSession): Sessão do banco de dados.
+        idempotencia (RequisicaoIdempotente): Controle de requisições repetidas.
 
     Returns:
         dict: Mensagem de sucesso com o ID do pedido criado.
     """
+    if idempotencia.resposta_salva is not None:
+        return idempotencia.resposta_salva
+
     novo_pedido = Pedido(pedido_schema.usuario)
     session.add(novo_pedido)
-    session.commit()
+    await registrar_criacao(session)
+    await session.commit()
+    await cache_respostas.invalidar(escopo_usuario(novo_pedido.usuario))
 
-    return {
+    return await idempotencia.concluir({
         "message": f"Pedido criado com sucesso! ID do pedido: {novo_pedido.id}"
-    }
+    })
 
 
-@order_router.post('/pedidos/cancelar/{id_pedido}')
+@order_router.post('/pedidos/cancelar/{id_pedido}', response_model=ResponsePedidoAlteradoSchema)
 async def cancelar_pedido(
     id_pedido: int,
-    session: Session = Depends(pegar_session),
-    usuario: User = Depends(verificar_token)
+    session: AsyncSession = Depends(pegar_session_async),
+    usuario: UsuarioAutenticado = Depends(verificar_token)
 ):
     """
     Cancela um pedido existente.
 
-    Apenas o dono do pedido ou um administrador pode cancelar.
+    Apenas o dono do pedido ou um administrador pode cancelar, e somente
+    pedidos pendentes. A validação e a mudança de status são feitas por um
+    único UPDATE condicional; se o status não permitir a operação
+    (inclusive por uma mudança concorrente), retorna 409. Os resumos de
+    vendas (Services/relatorios.py) são atualizados na mesma transação.
 
     Args:
         id_pedido (int): ID do pedido.
-        session (Session): Sessão do banco de dados.
-        usuario (User): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+        usuario (UsuarioAutenticado): Usuário autenticado.
 
     Returns:
         dict: Confirmação do cancelamento do pedido.
     """
-    pedido = session.query(Pedido).filter(Pedido.id == id_pedido).first()
-    if not pedido:
-        raise HTTPException(status_code=400, detail='Pedido não encontrado')
-
-    if not usuario.admin and usuario.id != pedido.usuario:
-        raise HTTPException(
-            status_code=403,
-            detail='Você não tem autorização para cancelar este pedido'
+    try:
+        pedido = await transicionar_pedido(session, id_pedido, CANCELADO, usuario)
+    except ErroPedido as erro:
+        raise erro_http(
+            erro,
+            mensagem_inexistente='Pedido não encontrado',
+            mensagem_permissao='Você não tem autorização para cancelar este pedido'
         )
-
-    pedido.status = 'CANCELADO'
-    session.commit()
+    await registrar_transicao(session, pedido, CANCELADO)
+    await session.commit()
+    await notificar_alteracao(pedido)
 
     return {
         'mensagem': f'Pedido {pedido.id} cancelado com sucesso!',
@@ -85,55 +407,273 @@ async def cancelar_pedido(
     }
 
 
-@order_router.get('/listar')
+@order_router.get('/listar', response_model=ResponseListaPedidosSchema)
 async def listar_pedidos(
-    usuario: User = Depends(verificar_token),
-    session: Session = Depends(pegar_session)
+    cursor: Optional[int] = None,
+    limite: int = Depends(limite_pagina),
+    status: Optional[str] = None,
+    id_usuario: Optional[int] = None,
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_leitura)
+):
+    """
+    Lista os pedidos do sistema de forma paginada.
+
+    Apenas usuários administradores podem acessar.
+
+    Args:
+        cursor (int, optional): ID do último pedido da página anterior.
+        limite (int, optional): Quantidade de pedidos por página.
+        status (str, optional): Filtra pelo status do pedido.
+        id_usuario (int, optional): Filtra pelo dono do pedido.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
+
+    Returns:
+        dict: Página de pedidos e o cursor da próxima página.
+    """
+    if not usuario.admin:
+        raise HTTPException(
+            status_code=403,
+            detail='Você não tem autorização para fazer essa operação'
+        )
+
+    validar_status(status)
+    filtros = []
+    if status is not None:
+        filtros.append(Pedido.status == status)
+    if id_usuario is not None:
+        filtros.append(Pedido.usuario == id_usuario)
+
+    pedidos, proximo_cursor = await paginar_pedidos(
+        session, filtros, cursor, limite, "listar_pedidos"
+    )
+    return {'pedidos': pedidos, 'proximo_cursor': proximo_cursor}
+
+
+COLUNAS_EXPORTACAO = [
+    "pedido_id", "usuario", "status", "preco",
+    "item_id", "sabor", "tamanho", "quantidade", "preco_unitario"
+]
+
+
+async def _linhas_exportacao(status):
+    """
+    Percorre pedidos e itens com um cursor do lado do servidor.
+
+    As linhas são lidas em lotes de exportacao_lote (configurações), sem carregar a
+    tabela inteira em memória. A sessão (de leitura, nas réplicas quando
+    configuradas) é aberta aqui, e não via dependency, pois precisa viver
+    enquanto a resposta é transmitida.
+
+    Args:
+        status (str | None): Filtra pelo status do pedido.
+
+    Yields:
+        Row: Linha com as colunas de COLUNAS_EXPORTACAO.
+    """
+    consulta = (
+        select(
+            Pedido.id, Pedido.usuario, Pedido.status, Pedido.preco,
+            ItemPedido.id, ItemPedido.sabor, ItemPedido.tamanho,
+            ItemPedido.quantidade, ItemPedido.preco_unitario
+        )
+        .outerjoin(ItemPedido, ItemPedido.pedido == Pedido.id)
+        .order_by(Pedido.id, ItemPedido.id)
+        .execution_options(yield_per=obter_configuracoes().exportacao_lote)
+    )
+    if status is not None:
+        consulta = consulta.where(Pedido.status == status)
+
+    async with AsyncSessionLeitura() as session:
+        resultado = await session.stream(consulta)
+        async for linha in resultado:
+            yield linha
+
+
+async def _exportar_ndjson(status):
+    lote = obter_configuracoes().exportacao_lote
+    pedido = None
+    buffer = []
+    async for linha in _linhas_exportacao(status):
+        pedido_id, usuario, status_pedido, preco, item_id, sabor, tamanho, quantidade, preco_unitario = linha
+        if pedido is None or pedido["id"] != pedido_id:
+            if pedido is not None:
+                buffer.append(orjson.dumps(pedido, default=float) + b"\n")
+                if len(buffer) >= lote:
+                    yield b"".join(buffer)
+                    buffer.clear()
+            pedido = {
+                "id": pedido_id,
+                "usuario": usuario,
+                "status": status_pedido,
+                "preco": preco,
+                "itens": []
+            }
+        if item_id is not None:
+            pedido["itens"].append({
+                "id": item_id,
+                "sabor": sabor,
+                "tamanho": tamanho,
+                "quantidade": quantidade,
+                "preco_unitario": preco_unitario
+            })
+    if pedido is not None:
+        buffer.append(orjson.dumps(pedido, default=float) + b"\n")
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def _exportar_csv(status):
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(COLUNAS_EXPORTACAO)
+    lote = obter_configuracoes().exportacao_lote
+    linhas = 0
+    async for linha in _linhas_exportacao(status):
+        escritor.writerow(linha)
+        linhas += 1
+        if linhas % lote == 0:
+            yield saida.getvalue()
+            saida.seek(0)
+            saida.truncate()
+    yield saida.getvalue()
+
+
+FORMATOS_EXPORTACAO = {
+    "ndjson": (_exportar_ndjson, "application/x-ndjson"),
+    "csv": (_exportar_csv, "text/csv"),
+}
+
+
+@order_router.get('/exportar', response_class=StreamingResponse)
+async def exportar_pedidos(
+    formato: str = "ndjson",
+    status: Optional[str] = None,
+    usuario: UsuarioAutenticado = Depends(verificar_token)
 ):
     """
-    Lista todos os pedidos do sistema.
+    Exporta todos os pedidos com seus itens em NDJSON ou CSV.
 
+    A resposta é transmitida conforme as linhas são lidas do banco,
+    mantendo o uso de memória constante independente do tamanho das tabelas.
     Apenas usuários administradores podem acessar.
 
     Args:
-        usuario (User): Usuário autenticado.
-        session (Session): Sessão do banco de dados.
+        formato (str, optional): "ndjson" (um pedido por linha) ou
+            "csv" (um item por linha).
+        status (str, optional): Filtra pelo status do pedido.
+        usuario (UsuarioAutenticado): Usuário autenticado.
 
     Returns:
-        dict: Lista de pedidos.
+        StreamingResponse: Arquivo de exportação.
     """
     if not usuario.admin:
         raise HTTPException(
             status_code=403,
             detail='Você não tem autorização para fazer essa operação'
         )
+    if formato not in FORMATOS_EXPORTACAO:
+        raise HTTPException(status_code=400, detail='Formato de exportação inválido')
+    validar_status(status)
+
+    gerador, media_type = FORMATOS_EXPORTACAO[formato]
+    return StreamingResponse(
+        gerador(status),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="pedidos.{formato}"'}
+    )
+
 
-    pedidos = session.query(Pedido).all()
-    return {'pedidos': pedidos}
+async def _fluxo_eventos(canal, id_pedido):
+    """
+    Gera o stream Server-Sent Events das alterações de pedidos de um canal.
+
+    A cada EVENTOS_HEARTBEAT segundos sem eventos envia um comentário,
+    mantendo a conexão viva em proxies. A assinatura é encerrada quando o
+    cliente desconecta.
+
+    Args:
+        canal (str): Canal do usuário no broker.
+        id_pedido (int | None): Envia apenas os eventos deste pedido.
+
+    Yields:
+        str: Mensagens no formato text/event-stream.
+    """
+    async with broker_eventos.assinar(canal) as fila:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                evento = await asyncio.wait_for(fila.get(), EVENTOS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if id_pedido is not None and evento["id"] != id_pedido:
+                continue
+            yield (
+                f"id: {evento['id']}.{evento['versao']}\n"
+                f"event: pedido\n"
+                f"data: {orjson.dumps(evento).decode()}\n\n"
+            )
 
 
-@order_router.post('/pedido/adcionar/{id_pedido}')
+@order_router.get('/eventos', response_class=StreamingResponse)
+async def eventos_pedidos(
+    id_pedido: Optional[int] = None,
+    usuario: UsuarioAutenticado = Depends(verificar_token)
+):
+    """
+    Transmite as mudanças de status e preço dos pedidos do usuário (SSE).
+
+    Substitui a consulta periódica de /order/pedido/{id_pedido}: a conexão
+    fica aberta e cada cancelamento, finalização ou alteração de itens
+    confirmada gera um evento "pedido" com id, status, preço e versão.
+    Nenhuma consulta ao banco é feita enquanto a conexão está aberta.
+
+    Args:
+        id_pedido (int, optional): Recebe apenas os eventos deste pedido.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+
+    Returns:
+        StreamingResponse: Stream text/event-stream.
+    """
+    return StreamingResponse(
+        _fluxo_eventos(canal_usuario(usuario.id), id_pedido),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@order_router.post('/pedido/adcionar/{id_pedido}', response_model=ResponseItemCriadoSchema)
 async def adcionar_item(
     id_pedido: int,
     item_pedido_schema: ItemPedidoSchema,
-    usuario: User = Depends(verificar_token),
-    session: Session = Depends(pegar_session)
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async),
+    idempotencia: RequisicaoIdempotente = Depends(verificar_idempotencia)
 ):
     """
     Adiciona um item a um pedido existente.
 
-    Apenas o dono do pedido ou um administrador pode adicionar itens.
+    Apenas o dono do pedido ou um administrador pode adicionar itens, e
+    somente em pedidos pendentes (409 caso contrário). O preço unitário é
+    o do catálogo, consultado no índice em memória.
+    Aceita o header Idempotency-Key para evitar itens duplicados em novas tentativas.
 
     Args:
         id_pedido (int): ID do pedido.
         item_pedido_schema (ItemPedidoSchema): Dados do item.
-        usuario (User): Usuário autenticado.
-        session (Session): Sessão do banco de dados.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+        idempotencia (RequisicaoIdempotente): Controle de requisições repetidas.
 
     Returns:
         dict: Dados do item criado e novo preço do pedido.
     """
-    pedido = session.query(Pedido).filter(Pedido.id == id_pedido).first()
+    if idempotencia.resposta_salva is not None:
+        return idempotencia.resposta_salva
+
+    pedido = await session.scalar(select(Pedido).where(Pedido.id == id_pedido))
 
     if not pedido:
         raise HTTPException(status_code=400, detail='Pedido não existe')
@@ -144,49 +684,135 @@ async def adcionar_item(
             detail='Você não tem autorização para fazer essa operação'
         )
 
+    if pedido.status not in STATUS_EDITAVEIS:
+        raise erro_http(TransicaoInvalida(pedido.status))
+
+    await indice_catalogo.garantir_carregado(session)
+    sabor, tamanho, preco_unitario = precificar_item(item_pedido_schema)
     item_pedido = ItemPedido(
-        sabor=item_pedido_schema.sabor,
+        sabor=sabor,
         pedido=id_pedido,
-        tamanho=item_pedido_schema.tamanho,
+        tamanho=tamanho,
         quantidade=item_pedido_schema.quantidade,
-        preco_unitario=item_pedido_schema.preco_unitario
+        preco_unitario=preco_unitario
     )
 
     session.add(item_pedido)
-    pedido.calcular_preco()
-    session.commit()
+    try:
+        await atualizar_preco(session, pedido, item_pedido.subtotal())
+    except TransicaoInvalida as erro:
+        raise erro_http(erro)
+    await session.commit()
+    await notificar_alteracao(pedido)
 
-    return {
+    return await idempotencia.concluir({
         'mensagem': 'Item criado com sucesso!',
         'item_id': item_pedido.id,
         'preco_pedido': pedido.preco
-    }
+    })
+
+
+@order_router.post('/pedido/adcionar-lote/{id_pedido}', response_model=ResponseItensCriadosSchema)
+async def adcionar_itens_lote(
+    id_pedido: int,
+    lote_schema: LoteItensPedidoSchema,
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async),
+    idempotencia: RequisicaoIdempotente = Depends(verificar_idempotencia)
+):
+    """
+    Adiciona vários itens a um pedido existente em uma única operação.
+
+    Os itens são precificados pelo índice do catálogo, gravados com um
+    único INSERT, o preço do pedido é atualizado uma vez e a transação é
+    confirmada com um único commit.
+    Apenas o dono do pedido ou um administrador pode adicionar itens, e
+    somente em pedidos pendentes (409 caso contrário).
+    Aceita o header Idempotency-Key para evitar itens duplicados em novas tentativas.
+
+    Args:
+        id_pedido (int): ID do pedido.
+        lote_schema (LoteItensPedidoSchema): Itens a serem adicionados.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+        idempotencia (RequisicaoIdempotente): Controle de requisições repetidas.
+
+    Returns:
+        dict: IDs dos itens criados e novo preço do pedido.
+    """
+    if idempotencia.resposta_salva is not None:
+        return idempotencia.resposta_salva
+
+    pedido = await session.scalar(select(Pedido).where(Pedido.id == id_pedido))
+
+    if not pedido:
+        raise HTTPException(status_code=400, detail='Pedido não existe')
+
+    if not usuario.admin and usuario.id != pedido.usuario:
+        raise HTTPException(
+            status_code=403,
+            detail='Você não tem autorização para fazer essa operação'
+        )
+
+    if pedido.status not in STATUS_EDITAVEIS:
+        raise erro_http(TransicaoInvalida(pedido.status))
+
+    await indice_catalogo.garantir_carregado(session)
+    itens = []
+    for item in lote_schema.itens:
+        sabor, tamanho, preco_unitario = precificar_item(item)
+        itens.append({
+            'sabor': sabor,
+            'pedido': id_pedido,
+            'tamanho': tamanho,
+            'quantidade': item.quantidade,
+            'preco_unitario': preco_unitario
+        })
+    ids_itens = await inserir_itens(session, itens)
+    delta = sum(item['preco_unitario'] * item['quantidade'] for item in itens)
+    try:
+        await atualizar_preco(session, pedido, delta)
+    except TransicaoInvalida as erro:
+        raise erro_http(erro)
+    await session.commit()
+    await notificar_alteracao(pedido)
+
+    return await idempotencia.concluir({
+        'mensagem': f'{len(ids_itens)} itens criados com sucesso!',
+        'itens_ids': ids_itens,
+        'preco_pedido': pedido.preco
+    })
 
 
-@order_router.post('/pedido/remover/{id_item_pedido}')
+@order_router.post('/pedido/remover/{id_item_pedido}', response_model=ResponseItemRemovidoSchema)
 async def remover_item(
     id_item_pedido: int,
-    usuario: User = Depends(verificar_token),
-    session: Session = Depends(pegar_session)
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async)
 ):
     """
     Remove um item de um pedido.
 
-    Apenas o dono do pedido ou um administrador pode remover itens.
+    Apenas o dono do pedido ou um administrador pode remover itens, e
+    somente de pedidos pendentes (409 caso contrário).
 
     Args:
         id_item_pedido (int): ID do item do pedido.
-        usuario (User): Usuário autenticado.
-        session (Session): Sessão do banco de dados.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
 
     Returns:
         dict: Confirmação da remoção e estado atualizado do pedido.
     """
-    item_pedido = session.query(ItemPedido).filter(ItemPedido.id == id_item_pedido).first()
-    if not item_pedido:
+    resultado = (await session.execute(
+        select(ItemPedido, Pedido)
+        .join(Pedido, ItemPedido.pedido == Pedido.id)
+        .where(ItemPedido.id == id_item_pedido)
+    )).first()
+    if not resultado:
         raise HTTPException(status_code=400, detail='Pedido não existe')
 
-    pedido = session.query(Pedido).filter(Pedido.id == item_pedido.pedido).first()
+    item_pedido, pedido = resultado
 
     if not usuario.admin and usuario.id != pedido.usuario:
         raise HTTPException(
@@ -194,48 +820,97 @@ async def remover_item(
             detail='Você não tem autorização para fazer essa operação'
         )
 
-    session.delete(item_pedido)
-    pedido.calcular_preco()
-    session.commit()
+    if pedido.status not in STATUS_EDITAVEIS:
+        raise erro_http(TransicaoInvalida(pedido.status))
+
+    await session.delete(item_pedido)
+    try:
+        await atualizar_preco(session, pedido, -item_pedido.subtotal())
+    except TransicaoInvalida as erro:
+        raise erro_http(erro)
+    quant_itens = await session.scalar(
+        select(func.count()).select_from(ItemPedido).where(ItemPedido.pedido == pedido.id)
+    )
+    await session.commit()
+    await notificar_alteracao(pedido)
 
     return {
         'mensagem': 'Item removido com sucesso!',
-        'quant_itens_pedido': len(pedido.itens),
+        'quant_itens_pedido': quant_itens,
         'pedido': pedido
     }
 
 
-@order_router.post('/pedidos/finalizar/{id_pedido}')
+@order_router.post('/reconciliar-precos', response_model=ResponseReconciliacaoSchema)
+async def reconciliar_precos_pedidos(
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_async)
+):
+    """
+    Recalcula em lote o preço dos pedidos que divergem da soma dos itens.
+
+    Apenas pedidos editáveis são corrigidos (ver reconciliar_precos). Os
+    donos dos pedidos corrigidos recebem o novo preço em /order/eventos.
+    Apenas usuários administradores podem acessar.
+
+    Args:
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        dict: Quantidade de pedidos corrigidos.
+    """
+    if not usuario.admin:
+        raise HTTPException(
+            status_code=403,
+            detail='Você não tem autorização para fazer essa operação'
+        )
+
+    corrigidos = await reconciliar_precos(session)
+    if corrigidos:
+        await cache_respostas.invalidar_tudo()
+    for pedido in corrigidos:
+        await broker_eventos.publicar(canal_usuario(pedido.usuario), evento_pedido(pedido))
+    return {
+        'mensagem': 'Preços reconciliados com sucesso!',
+        'pedidos_corrigidos': len(corrigidos)
+    }
+
+
+@order_router.post('/pedidos/finalizar/{id_pedido}', response_model=ResponsePedidoAlteradoSchema)
 async def finalizar_pedido(
     id_pedido: int,
-    session: Session = Depends(pegar_session),
-    usuario: User = Depends(verificar_token)
+    session: AsyncSession = Depends(pegar_session_async),
+    usuario: UsuarioAutenticado = Depends(verificar_token)
 ):
     """
     Finaliza um pedido existente.
 
-    Apenas o dono do pedido ou um administrador pode finalizar.
+    Apenas o dono do pedido ou um administrador pode finalizar, e somente
+    pedidos pendentes. A validação e a mudança de status são feitas por um
+    único UPDATE condicional; se o status não permitir a operação
+    (inclusive por uma mudança concorrente), retorna 409. Os resumos de
+    vendas (Services/relatorios.py) são atualizados na mesma transação.
 
     Args:
         id_pedido (int): ID do pedido.
-        session (Session): Sessão do banco de dados.
-        usuario (User): Usuário autenticado.
+        session (AsyncSession): Sessão do banco de dados.
+        usuario (UsuarioAutenticado): Usuário autenticado.
 
     Returns:
         dict: Confirmação da finalização do pedido.
     """
-    pedido = session.query(Pedido).filter(Pedido.id == id_pedido).first()
-    if not pedido:
-        raise HTTPException(status_code=400, detail='Pedido não encontrado')
-
-    if not usuario.admin and usuario.id != pedido.usuario:
-        raise HTTPException(
-            status_code=403,
-            detail='Você não tem autorização para cancelar este pedido'
+    try:
+        pedido = await transicionar_pedido(session, id_pedido, FINALIZADO, usuario)
+    except ErroPedido as erro:
+        raise erro_http(
+            erro,
+            mensagem_inexistente='Pedido não encontrado',
+            mensagem_permissao='Você não tem autorização para finalizar este pedido'
         )
-
-    pedido.status = 'FINALIZADO'
-    session.commit()
+    await registrar_transicao(session, pedido, FINALIZADO)
+    await session.commit()
+    await notificar_alteracao(pedido)
 
     return {
         'mensagem': f'Pedido {pedido.id} finalizado com sucesso!',
@@ -243,37 +918,55 @@ async def finalizar_pedido(
     }
 
 
-@order_router.get('/pedido/{id_pedido}')
+@order_router.get('/pedido/{id_pedido}', response_model=ResponseDetalhePedidoSchema)
 async def ver_pedido(
     id_pedido: int,
-    usuario: User = Depends(verificar_token),
-    session: Session = Depends(pegar_session)
+    request: Request,
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_leitura)
 ):
     """
     Retorna os detalhes de um pedido específico.
 
+    A resposta serializada fica em cache_respostas até a próxima alteração
+    do pedido e é enviada com ETag; com If-None-Match igual ao ETag atual
+    retorna 304 sem corpo. O cache é preenchido apenas com leituras do primário.
+
     Args:
         id_pedido (int): ID do pedido.
-        usuario (User): Usuário autenticado.
-        session (Session): Sessão do banco de dados.
+        request (Request): Requisição HTTP, usada para o If-None-Match.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
 
     Returns:
-        dict: Dados do pedido e quantidade de itens.
+        Response: Dados do pedido e quantidade de itens.
     """
-    pedido = session.query(Pedido).filter(Pedido.id == id_pedido).first()
-    if not pedido:
-        raise HTTPException(status_code=400, detail='Pedido não encontrado')
+    chave = await cache_respostas.chave(f"ver_pedido:{id_pedido}", escopo_pedido(id_pedido))
+    registro = await cache_respostas.obter(chave)
+    if registro is None:
+        ler_do_primario_para_cache(session, chave)
+        pedido = (await session.execute(
+            select(Pedido)
+            .where(Pedido.id == id_pedido)
+            .options(carregar_itens("ver_pedido"))
+        )).unique().scalar_one_or_none()
+        if not pedido:
+            raise HTTPException(status_code=400, detail='Pedido não encontrado')
 
-    if not usuario.admin and usuario.id != pedido.usuario:
+        corpo = ADAPTADOR_DETALHE.dump_json(ADAPTADOR_DETALHE.validate_python({
+            'quantidade_itens': len(pedido.itens),
+            'pedido': pedido
+        }, from_attributes=True))
+        registro = await cache_respostas.salvar(chave, corpo, dono=pedido.usuario)
+
+    # a resposta é compartilhada entre o dono e os administradores
+    if not usuario.admin and usuario.id != registro["dono"]:
         raise HTTPException(
             status_code=403,
-            detail='Você não tem autorização para cancelar este pedido'
+            detail='Você não tem autorização para visualizar este pedido'
         )
 
-    return {
-        'quantidade_itens': len(pedido.itens),
-        'pedido': pedido
-    }
+    return responder_com_etag(request, registro)
 
 
 @order_router.get(
@@ -281,18 +974,52 @@ async def ver_pedido(
     response_model=List[ResponsePedidoSchema]
 )
 async def listar_pedidos_usuario(
-    usuario: User = Depends(verificar_token),
-    session: Session = Depends(pegar_session)
+    request: Request,
+    cursor: Optional[int] = None,
+    limite: int = Depends(limite_pagina),
+    status: Optional[str] = None,
+    usuario: UsuarioAutenticado = Depends(verificar_token),
+    session: AsyncSession = Depends(pegar_session_leitura)
 ):
     """
-    Lista todos os pedidos do usuário autenticado.
+    Lista os pedidos do usuário autenticado de forma paginada.
+
+    O cursor da próxima página é retornado no header X-Proximo-Cursor,
+    ausente na última página. Cada página fica em cache_respostas até a
+    próxima alteração de um pedido do usuário e é enviada com ETag; com
+    If-None-Match igual ao ETag atual retorna 304 sem corpo. O cache é
+    preenchido apenas com leituras do primário.
 
     Args:
-        usuario (User): Usuário autenticado.
-        session (Session): Sessão do banco de dados.
+        request (Request): Requisição HTTP, usada para o If-None-Match.
+        cursor (int, optional): ID do último pedido da página anterior.
+        limite (int, optional): Quantidade de pedidos por página.
+        status (str, optional): Filtra pelo status do pedido.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
 
     Returns:
-        List[ResponsePedidoSchema]: Lista de pedidos do usuário.
+        Response: Página de pedidos do usuário.
     """
-    pedidos = session.query(Pedido).filter(Pedido.usuario == usuario.id).all()
-    return pedidos
+    validar_status(status)
+    chave = await cache_respostas.chave(
+        f"listar_pedidos_usuario:{usuario.id}:{cursor}:{limite}:{status}",
+        escopo_usuario(usuario.id)
+    )
+    registro = await cache_respostas.obter(chave)
+    if registro is None:
+        ler_do_primario_para_cache(session, chave)
+        filtros = [Pedido.usuario == usuario.id]
+        if status is not None:
+            filtros.append(Pedido.status == status)
+
+        pedidos, proximo_cursor = await paginar_pedidos(
+            session, filtros, cursor, limite, "listar_pedidos_usuario"
+        )
+        headers = {}
+        if proximo_cursor is not None:
+            headers['X-Proximo-Cursor'] = str(proximo_cursor)
+        corpo = ADAPTADOR_LISTA.dump_json(ADAPTADOR_LISTA.validate_python(pedidos, from_attributes=True))
+        registro = await cache_respostas.salvar(chave, corpo, headers=headers, dono=usuario.id)
+
+    return responder_com_etag(request, registro)
@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from Routes.dependencies import pegar_session_leitura, verificar_token
+from schemas import (
+    ResponseReceitaDiariaSchema, ResponseVendasProdutosSchema,
+    ResponsePedidosStatusSchema, ResponseGastosUsuariosSchema
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from Services.autenticacao import UsuarioAutenticado
+from Services.relatorios import receita_por_dia, vendas_por_produto, pedidos_por_status, gastos_por_usuario
+from datetime import date
+from typing import Optional
+
+LIMITE_RANKING_PADRAO = 20
+LIMITE_RANKING_MAXIMO = 100
+
+
+async def verificar_admin(usuario: UsuarioAutenticado = Depends(verificar_token)):
+    """
+    Garante que o usuário autenticado é administrador.
+
+    Args:
+        usuario (UsuarioAutenticado): Usuário autenticado.
+
+    Raises:
+        HTTPException: 403 se o usuário não for administrador.
+    """
+    if not usuario.admin:
+        raise HTTPException(
+            status_code=403,
+            detail='Você não tem autorização para fazer essa operação'
+        )
+
+
+relatorios_router = APIRouter(
+    prefix="/relatorios",
+    tags=['Relatorios'],
+    dependencies=[Depends(verificar_admin)]
+)
+
+
+@relatorios_router.get('/receita-diaria', response_model=ResponseReceitaDiariaSchema)
+async def receita_diaria(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    session: AsyncSession = Depends(pegar_session_leitura)
+):
+    """
+    Lista a receita dos pedidos finalizados por dia.
+
+    Lê apenas o resumo diário, sem percorrer pedidos. Dias sem vendas não
+    aparecem na resposta.
+
+    Args:
+        inicio (date, optional): Primeiro dia (padrão: 29 dias antes de fim).
+        fim (date, optional): Último dia (padrão: hoje, em UTC).
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
+
+    Returns:
+        dict: Pedidos finalizados e receita de cada dia.
+    """
+    if inicio and fim and inicio > fim:
+        raise HTTPException(status_code=400, detail='O início deve ser anterior ao fim')
+    return {'dias': await receita_por_dia(session, inicio, fim)}
+
+
+@relatorios_router.get('/produtos', response_model=ResponseVendasProdutosSchema)
+async def vendas_produtos(
+    limite: int = Query(LIMITE_RANKING_PADRAO, ge=1, le=LIMITE_RANKING_MAXIMO),
+    session: AsyncSession = Depends(pegar_session_leitura)
+):
+    """
+    Lista os sabores/tamanhos mais vendidos nos pedidos finalizados.
+
+    Args:
+        limite (int, optional): Quantidade de produtos.
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
+
+    Returns:
+        dict: Quantidade vendida e receita de cada produto.
+    """
+    return {'produtos': await vendas_por_produto(session, limite)}
+
+
+@relatorios_router.get('/status', response_model=ResponsePedidosStatusSchema)
+async def pedidos_status(session: AsyncSession = Depends(pegar_session_leitura)):
+    """
+    Conta os pedidos em cada status.
+
+    Args:
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
+
+    Returns:
+        dict: Quantidade de pedidos por status.
+    """
+    return {'status': await pedidos_por_status(session)}
+
+
+@relatorios_router.get('/usuarios', response_model=ResponseGastosUsuariosSchema)
+async def gastos_usuarios(
+    limite: int = Query(LIMITE_RANKING_PADRAO, ge=1, le=LIMITE_RANKING_MAXIMO),
+    session: AsyncSession = Depends(pegar_session_leitura)
+):
+    """
+    Lista os usuários que mais gastaram em pedidos finalizados.
+
+    Args:
+        limite (int, optional): Quantidade de usuários.
+        session (AsyncSession): Sessão de leitura (réplicas, quando configuradas).
+
+    Returns:
+        dict: Pedidos finalizados e total gasto de cada usuário.
+    """
+    return {'usuarios': await gastos_por_usuario(session, limite)}
@@ -0,0 +1,34 @@
+"""
+Recalcula o preço dos pedidos editáveis que divergem da soma dos seus itens.
+
+Indicado para execução periódica (ex: cron) quando MODO_PRECO=incremental.
+
+Uso:
+    python -m Scripts.reconciliar_precos
+"""
+import asyncio
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from DataBase.database import AsyncSessionLocal, db_async
+from Services.cache_respostas import cache_respostas
+from Services.eventos_pedido import broker_eventos, canal_usuario, evento_pedido
+from Services.pedidos import reconciliar_precos
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        corrigidos = await reconciliar_precos(session)
+    # com os backends redis, o cache e os assinantes dos workers da API são avisados
+    if corrigidos:
+        await cache_respostas.invalidar_tudo()
+    for pedido in corrigidos:
+        await broker_eventos.publicar(canal_usuario(pedido.usuario), evento_pedido(pedido))
+    await db_async.dispose()
+    print(f"Pedidos corrigidos: {len(corrigidos)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+"""
+Recalcula as tabelas de resumo de vendas a partir de pedidos e itens.
+
+Use após aplicar a migration dos resumos (para incluir os pedidos já
+existentes), após reconciliar preços de pedidos finalizados ou sempre que
+houver suspeita de divergência. Cada resumo é refeito com um único
+INSERT ... SELECT agregado no banco; prefira horários de pouco movimento,
+pois a transação percorre as tabelas de pedidos e itens.
+
+Uso:
+    python -m Scripts.reconstruir_resumos
+"""
+import asyncio
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from DataBase.database import AsyncSessionLocal, db_async
+from Services.relatorios import reconstruir_resumos
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        linhas = await reconstruir_resumos(session)
+    await db_async.dispose()
+    for tabela, quantidade in linhas.items():
+        print(f"{tabela}: {quantidade} linhas")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
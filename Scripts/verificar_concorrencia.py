@@ -0,0 +1,168 @@
+"""
+Teste de estresse de concorrência nas alterações de pedidos.
+
+Dispara requisições simultâneas sobre os mesmos pedidos (adição de itens,
+cancelamento e finalização) e confere que nenhuma alteração foi perdida:
+
+* o preço de cada pedido é igual à soma dos seus itens;
+* cada requisição respondida com sucesso incrementou a versão do pedido
+  exatamente uma vez (versao = 1 + alterações confirmadas);
+* os resumos de vendas mantidos incrementalmente são iguais aos
+  recalculados do zero;
+* conflitos são reportados com 409, nunca com erro 500.
+
+Uso:
+    python -m Scripts.verificar_concorrencia --pedidos 20 --concorrencia 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections import Counter
+
+_banco = os.path.join(tempfile.mkdtemp(), "verificar_concorrencia.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_banco}"
+os.environ.pop("DATABASE_URL_ASYNC", None)
+os.environ.setdefault("SECRET_KEY", "verificar-concorrencia")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCES_TOKEN_EXPIRES_MINUTES", "30")
+# a espera por locks do SQLite não deve poluir a saída com avisos de query lenta
+os.environ.setdefault("SQL_LENTA_MS", "60000")
+
+import httpx
+from sqlalchemy import select
+from main import app
+from DataBase.database import db_async, AsyncSessionLocal
+from DataBase.models import (
+    Base, User, Pedido, ProdutoCatalogo, ResumoVendasDia, ResumoVendasProduto, ResumoPedidosStatus, ResumoGastosUsuario
+)
+from Services.pedidos import subtotal_itens
+from Services.relatorios import registrar_criacao, reconstruir_resumos
+from Routes.auth_routes import criar_token
+
+ITEM = {"quantidade": 1, "sabor": "calabresa", "tamanho": "G", "preco_unitario": 10.0}
+
+
+async def popular(quantidade_pedidos):
+    """
+    Recria o banco com um administrador e quantidade_pedidos pedidos vazios.
+
+    Returns:
+        tuple: (id do usuário, ids dos pedidos).
+    """
+    async with db_async.begin() as conexao:
+        await conexao.run_sync(Base.metadata.drop_all)
+        await conexao.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        usuario = User("admin", "admin@exemplo.com", "-", admin=True)
+        session.add(usuario)
+        session.add(ProdutoCatalogo(ITEM["sabor"], ITEM["tamanho"], ITEM["preco_unitario"], versao=1))
+        await session.flush()
+        pedidos = [Pedido(usuario.id) for _ in range(quantidade_pedidos)]
+        session.add_all(pedidos)
+        await registrar_criacao(session, quantidade_pedidos)
+        await session.commit()
+        return usuario.id, [pedido.id for pedido in pedidos]
+
+
+async def ler_resumos(session):
+    """
+    Returns:
+        dict: Linhas de cada tabela de resumo, ordenadas.
+    """
+    resumos = {}
+    for modelo in (ResumoVendasDia, ResumoVendasProduto, ResumoPedidosStatus, ResumoGastosUsuario):
+        tabela = modelo.__table__
+        valores = [coluna.name for coluna in tabela.c if not coluna.primary_key]
+        linhas = (await session.execute(select(*tabela.c))).all()
+        # linhas zeradas (ex: status sem pedidos) equivalem a linhas ausentes
+        resumos[tabela.name] = sorted(
+            tuple(linha) for linha in linhas if any(getattr(linha, coluna) for coluna in valores)
+        )
+    return resumos
+
+
+async def disparar(cliente, requisicoes):
+    """
+    Executa as requisições simultaneamente.
+
+    Args:
+        requisicoes (list[tuple]): (id do pedido, caminho, corpo JSON) de cada requisição.
+
+    Returns:
+        list[tuple]: (id do pedido, status HTTP) de cada requisição.
+    """
+    async def enviar(id_pedido, caminho, corpo):
+        resposta = await cliente.post(caminho, json=corpo)
+        return id_pedido, resposta.status_code
+
+    return await asyncio.gather(*(enviar(*requisicao) for requisicao in requisicoes))
+
+
+async def main(args):
+    transporte = httpx.ASGITransport(app=app)
+    falhas = []
+    id_usuario, ids_pedidos = await popular(args.pedidos)
+    headers = {"Authorization": f"Bearer {criar_token(id_usuario)}"}
+    confirmadas = Counter()
+    status_http = Counter()
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://teste", headers=headers) as cliente:
+        # rodada 1: itens adicionados simultaneamente em cada pedido
+        requisicoes = [
+            (id_pedido, f"/order/pedido/adcionar/{id_pedido}", ITEM)
+            for _ in range(args.concorrencia)
+            for id_pedido in ids_pedidos
+        ]
+        # rodada 2: cancelamento, finalização e novos itens disputando o mesmo pedido
+        disputa = []
+        for id_pedido in ids_pedidos:
+            disputa += [
+                (id_pedido, f"/order/pedidos/cancelar/{id_pedido}", None),
+                (id_pedido, f"/order/pedidos/finalizar/{id_pedido}", None),
+                (id_pedido, f"/order/pedido/adcionar/{id_pedido}", ITEM),
+            ]
+        for rodada in (requisicoes, disputa):
+            for id_pedido, status in await disparar(cliente, rodada):
+                status_http[status] += 1
+                if status == 200:
+                    confirmadas[id_pedido] += 1
+                elif status != 409:
+                    falhas.append(f"pedido {id_pedido}: status HTTP inesperado {status}")
+
+    async with AsyncSessionLocal() as session:
+        linhas = (await session.execute(
+            select(Pedido.id, Pedido.preco, Pedido.versao, subtotal_itens().label("subtotal"))
+        )).all()
+        incrementais = await ler_resumos(session)
+        await reconstruir_resumos(session)
+        recalculados = await ler_resumos(session)
+    await db_async.dispose()
+
+    for tabela, linhas_tabela in incrementais.items():
+        if linhas_tabela != recalculados[tabela]:
+            falhas.append(f"{tabela}: resumo incremental {linhas_tabela} diferente do recalculado {recalculados[tabela]}")
+
+    for linha in linhas:
+        if abs(linha.preco - linha.subtotal) > 1e-6:
+            falhas.append(f"pedido {linha.id}: preço {linha.preco} diferente da soma dos itens {linha.subtotal}")
+        if linha.versao != 1 + confirmadas[linha.id]:
+            falhas.append(
+                f"pedido {linha.id}: versão {linha.versao}, esperado {1 + confirmadas[linha.id]} "
+                f"({confirmadas[linha.id]} alterações confirmadas)"
+            )
+
+    print("status HTTP: " + ", ".join(f"{status}={total}" for status, total in sorted(status_http.items())))
+    if falhas:
+        print("\n".join(falhas), file=sys.stderr)
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=20)
+    parser.add_argument("--concorrencia", type=int, default=10, help="itens adicionados simultaneamente por pedido")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+"""
+Verifica a quantidade de queries emitidas pelas rotas de leitura de pedidos
+e de relatórios.
+
+Popula um banco SQLite temporário com duas escalas de pedidos e confere que
+cada endpoint executa sempre a mesma quantidade de comandos, dentro do
+orçamento definido em ORCAMENTO_QUERIES. Um aumento indica regressão
+(ex: um N+1 ao acessar Pedido.itens).
+
+Uso:
+    python -m Scripts.verificar_queries
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+_banco = os.path.join(tempfile.mkdtemp(), "verificar_queries.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_banco}"
+os.environ.pop("DATABASE_URL_ASYNC", None)
+# mede as queries das rotas, e não as respostas do cache
+os.environ["CACHE_RESPOSTAS_BACKEND"] = "desligado"
+os.environ.setdefault("SECRET_KEY", "verificar-queries")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCES_TOKEN_EXPIRES_MINUTES", "30")
+
+import httpx
+from main import app
+from DataBase.database import db_async, AsyncSessionLocal
+from DataBase.models import Base, User, Pedido, ItemPedido
+from DataBase.contador_queries import contar_queries, assert_max_queries
+from Routes.auth_routes import criar_token
+
+# endpoint -> quantidade máxima de queries com o usuário já em cache
+ORCAMENTO_QUERIES = {
+    "/order/listar": 2,
+    "/order/listar/pedidos-usuario": 2,
+    "/order/pedido/{id_pedido}": 2,
+    "/relatorios/receita-diaria": 1,
+    "/relatorios/produtos": 1,
+    "/relatorios/status": 1,
+    "/relatorios/usuarios": 1,
+}
+
+ESCALAS = (5, 50)
+ITENS_POR_PEDIDO = 3
+
+
+async def popular(quantidade_pedidos):
+    """
+    Recria o banco com um administrador e quantidade_pedidos pedidos.
+
+    Args:
+        quantidade_pedidos (int): Pedidos a serem criados.
+
+    Returns:
+        tuple: (id do usuário, id de um pedido).
+    """
+    async with db_async.begin() as conexao:
+        await conexao.run_sync(Base.metadata.drop_all)
+        await conexao.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        usuario = User("admin", "admin@exemplo.com", "-", admin=True)
+        session.add(usuario)
+        await session.flush()
+        for _ in range(quantidade_pedidos):
+            pedido = Pedido(usuario.id)
+            pedido.itens = [
+                ItemPedido("calabresa", None, "G", 1, 10.0)
+                for _ in range(ITENS_POR_PEDIDO)
+            ]
+            pedido.calcular_preco()
+            session.add(pedido)
+        await session.commit()
+        return usuario.id, pedido.id
+
+
+async def medir(cliente, caminho, headers):
+    # o primeiro request aquece o cache de autenticação
+    await cliente.get(caminho, headers=headers)
+    with contar_queries(db_async) as contador:
+        resposta = await cliente.get(caminho, headers=headers)
+    resposta.raise_for_status()
+    return contador
+
+
+async def main():
+    transporte = httpx.ASGITransport(app=app)
+    resultados = {}
+    falhas = []
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+        for escala in ESCALAS:
+            id_usuario, id_pedido = await popular(escala)
+            headers = {"Authorization": f"Bearer {criar_token(id_usuario)}"}
+            for rota, maximo in ORCAMENTO_QUERIES.items():
+                contador = await medir(cliente, rota.format(id_pedido=id_pedido), headers)
+                resultados.setdefault(rota, []).append(contador.total)
+                try:
+                    assert_max_queries(contador, maximo, f"{rota} com {escala} pedidos")
+                except AssertionError as erro:
+                    falhas.append(str(erro))
+
+    await db_async.dispose()
+
+    for rota, totais in resultados.items():
+        print(f"{rota}: " + ", ".join(f"{e} pedidos={t}" for e, t in zip(ESCALAS, totais)))
+        if len(set(totais)) > 1:
+            falhas.append(f"{rota} varia com a quantidade de pedidos: {totais}")
+
+    if falhas:
+        print("\n".join(falhas), file=sys.stderr)
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Verifica o roteamento de leituras para réplicas com dois arquivos SQLite.
+
+Um arquivo faz o papel do primário e outro de réplica (sem replicação
+real, então a réplica só tem o schema). O script confere que:
+
+* as rotas de leitura consultam a réplica;
+* as escritas vão para o primário;
+* logo após uma escrita, as leituras do mesmo usuário vão para o primário
+  (janela DB_REPLICA_JANELA_PRIMARIO) e depois voltam para a réplica.
+
+Uso:
+    python -m Scripts.verificar_replicas
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+_pasta = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_pasta, 'primario.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{os.path.join(_pasta, 'replica.db')}"
+os.environ["DB_REPLICA_JANELA_PRIMARIO"] = "0.5"
+# o cache de respostas evitaria as leituras cujo roteamento é verificado
+os.environ["CACHE_RESPOSTAS_BACKEND"] = "desligado"
+os.environ.pop("DATABASE_URL_ASYNC", None)
+os.environ.setdefault("SECRET_KEY", "verificar-replicas")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCES_TOKEN_EXPIRES_MINUTES", "30")
+
+import httpx
+from main import app
+from DataBase.database import db_async, db_replicas, AsyncSessionLocal, configuracao
+from DataBase.models import Base, User
+from DataBase.contador_queries import contar_queries
+from Routes.auth_routes import criar_token
+
+
+async def medir(cliente, metodo, caminho, headers, **kwargs):
+    """
+    Executa uma requisição contando as queries no primário e na réplica.
+
+    Returns:
+        tuple: (resposta, queries no primário, queries na réplica).
+    """
+    with contar_queries(db_async) as primario, contar_queries(db_replicas[0]) as replica:
+        resposta = await cliente.request(metodo, caminho, headers=headers, **kwargs)
+    resposta.raise_for_status()
+    return resposta, primario.total, replica.total
+
+
+async def verificar(id_usuario):
+    """
+    Executa os cenários de roteamento.
+
+    Returns:
+        list[str]: Falhas encontradas.
+    """
+    headers = {"Authorization": f"Bearer {criar_token(id_usuario)}"}
+    falhas = []
+    leitura = "/order/listar/pedidos-usuario"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste") as cliente:
+        # aquece o cache de autenticação, que consulta o primário
+        await cliente.get(leitura, headers=headers)
+
+        _, primario, replica = await medir(cliente, "GET", leitura, headers)
+        print(f"leitura sem escrita recente: primário={primario} réplica={replica}")
+        if primario or not replica:
+            falhas.append("a leitura sem escrita recente deveria usar apenas a réplica")
+
+        _, primario, replica = await medir(cliente, "POST", "/order/pedidos", headers, json={"usuario": id_usuario})
+        print(f"escrita: primário={primario} réplica={replica}")
+        if replica or not primario:
+            falhas.append("a escrita deveria usar apenas o primário")
+
+        resposta, primario, replica = await medir(cliente, "GET", leitura, headers)
+        print(f"leitura logo após a escrita: primário={primario} réplica={replica}")
+        if replica or len(resposta.json()) != 1:
+            falhas.append("a leitura logo após a escrita deveria usar o primário e ver o novo pedido")
+
+        await asyncio.sleep(configuracao.janela_primario + 0.1)
+        _, primario, replica = await medir(cliente, "GET", leitura, headers)
+        print(f"leitura após a janela: primário={primario} réplica={replica}")
+        if primario or not replica:
+            falhas.append("após a janela a leitura deveria voltar para a réplica")
+
+    return falhas
+
+
+async def main():
+    for engine in (db_async, *db_replicas):
+        async with engine.begin() as conexao:
+            await conexao.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        usuario = User("admin", "admin@exemplo.com", "-", admin=True)
+        session.add(usuario)
+        await session.commit()
+
+    try:
+        falhas = await verificar(usuario.id)
+    finally:
+        for engine in (db_async, *db_replicas):
+            await engine.dispose()
+
+    if falhas:
+        print("\n".join(falhas), file=sys.stderr)
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from sqlalchemy import event
+from DataBase.models import User
+from Services.cache import CacheTTL
+from config import obter_configuracoes
+import os
+
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    """
+    Dados do usuário autenticado necessários para autorizar um request.
+
+    Diferente do model User, não depende de uma sessão do banco,
+    podendo ser mantido em cache entre requests.
+
+    Attributes:
+        id (int): Identificador do usuário.
+        admin (bool): Indica se o usuário é administrador.
+        ativo (bool): Indica se o usuário está ativo.
+    """
+    id: int
+    admin: bool
+    ativo: bool
+
+    @classmethod
+    def do_usuario(cls, usuario):
+        """
+        Cria o principal a partir de um model User.
+
+        Args:
+            usuario (User): Usuário carregado do banco.
+
+        Returns:
+            UsuarioAutenticado: Principal do usuário.
+        """
+        return cls(id=usuario.id, admin=bool(usuario.admin), ativo=bool(usuario.ativo))
+
+    @classmethod
+    def das_claims(cls, dic_info):
+        """
+        Cria o principal a partir das claims de um token JWT, caso
+        o token tenha sido emitido com as claims "admin" e "ativo".
+
+        Args:
+            dic_info (dict): Claims decodificadas do token.
+
+        Returns:
+            UsuarioAutenticado | None: Principal ou None se as claims não existirem.
+        """
+        if "admin" not in dic_info or "ativo" not in dic_info:
+            return None
+        return cls(
+            id=int(dic_info["sub"]),
+            admin=bool(dic_info["admin"]),
+            ativo=bool(dic_info["ativo"])
+        )
+
+    def claims(self):
+        """
+        Retorna as claims que representam o principal dentro do token.
+
+        Returns:
+            dict: Claims "admin" e "ativo".
+        """
+        return {"admin": self.admin, "ativo": self.ativo}
+
+
+cache_usuarios = CacheTTL(
+    max_itens=int(os.getenv("CACHE_USUARIOS_MAX", 10000)),
+    ttl=float(os.getenv("CACHE_USUARIOS_TTL", 60))
+)
+
+
+def claims_usuario(usuario):
+    """
+    Retorna as claims extras do usuário a serem embutidas no token,
+    quando token_claims_usuario estiver habilitado nas configurações.
+
+    Args:
+        usuario (User | UsuarioAutenticado): Usuário autenticado.
+
+    Returns:
+        dict: Claims "admin" e "ativo" ou um dicionário vazio.
+    """
+    if not obter_configuracoes().token_claims_usuario:
+        return {}
+    if not isinstance(usuario, UsuarioAutenticado):
+        usuario = UsuarioAutenticado.do_usuario(usuario)
+    return usuario.claims()
+
+
+def invalidar_usuario(id_usuario):
+    """
+    Remove um usuário do cache de autenticação.
+
+    Deve ser chamado quando permissões ou o status do usuário mudarem
+    por fora do ORM (ex: UPDATE direto no banco).
+
+    Args:
+        id_usuario (int): ID do usuário.
+    """
+    cache_usuarios.remover(id_usuario)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidar_usuario_alterado(mapper, connection, usuario):
+    invalidar_usuario(usuario.id)
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+import time
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    """
+    Cache em memória com expiração por tempo (TTL) e limite de itens (LRU).
+
+    Quando o limite é atingido, o item usado há mais tempo é descartado.
+
+    Attributes:
+        max_itens (int): Quantidade máxima de itens armazenados.
+        ttl (float): Tempo de vida de cada item, em segundos.
+    """
+
+    def __init__(self, max_itens=1024, ttl=60.0):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_itens (int, optional): Quantidade máxima de itens.
+            ttl (float, optional): Tempo de vida padrão em segundos.
+        """
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, padrao=None):
+        """
+        Retorna o valor armazenado para a chave, se ainda for válido.
+
+        Args:
+            chave: Chave do item.
+            padrao (optional): Valor retornado quando a chave não existe.
+
+        Returns:
+            Valor armazenado ou o padrão.
+        """
+        item = self._itens.get(chave)
+        if item is None:
+            self.falhas += 1
+            return padrao
+
+        valor, expira_em = item
+        if expira_em <= time.monotonic():
+            del self._itens[chave]
+            self.falhas += 1
+            return padrao
+
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def definir(self, chave, valor, ttl=None):
+        """
+        Armazena um valor no cache.
+
+        Args:
+            chave: Chave do item.
+            valor: Valor a ser armazenado.
+            ttl (float, optional): Tempo de vida específico deste item.
+        """
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._itens[chave] = (valor, expira_em)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def remover(self, chave):
+        """
+        Remove uma chave do cache, se existir.
+
+        Args:
+            chave: Chave do item.
+        """
+        self._itens.pop(chave, None)
+
+    def limpar(self):
+        """
+        Remove todos os itens do cache.
+        """
+        self._itens.clear()
+
+    def __contains__(self, chave):
+        return self.obter(chave, _AUSENTE) is not _AUSENTE
+
+    def __len__(self):
+        return len(self._itens)
+
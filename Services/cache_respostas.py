@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from Services.cache import CacheTTL
+import hashlib
+import orjson
+import os
+import uuid
+
+@dataclass(frozen=True)
+class ConfiguracaoCacheRespostas:
+    """
+    Configurações do cache de respostas.
+
+    Attributes:
+        backend (str): "memoria" (por processo), "redis" (compartilhado entre
+            workers) ou "desligado".
+        ttl (float): Tempo (s) em que uma resposta fica em cache.
+        max_itens (int): Limite de respostas no backend "memoria".
+    """
+    backend: str = "memoria"
+    ttl: float = 30.0
+    max_itens: int = 10000
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Monta a configuração a partir das variáveis de ambiente.
+
+        Variáveis: CACHE_RESPOSTAS_BACKEND, CACHE_RESPOSTAS_TTL e
+        CACHE_RESPOSTAS_MAX_ITENS.
+
+        Returns:
+            ConfiguracaoCacheRespostas: Configuração carregada.
+        """
+        return cls(
+            backend=os.getenv("CACHE_RESPOSTAS_BACKEND", cls.backend),
+            ttl=float(os.getenv("CACHE_RESPOSTAS_TTL", cls.ttl)),
+            max_itens=int(os.getenv("CACHE_RESPOSTAS_MAX_ITENS", cls.max_itens)),
+        )
+
+
+ESCOPO_GLOBAL = "todos"
+
+
+def escopo_pedido(id_pedido):
+    return f"pedido:{id_pedido}"
+
+
+def escopo_usuario(id_usuario):
+    return f"usuario:{id_usuario}"
+
+
+class CacheRespostasMemoria:
+    """
+    Backend em memória (LRU com TTL), local a cada processo.
+    """
+
+    def __init__(self, max_itens=ConfiguracaoCacheRespostas.max_itens, ttl=ConfiguracaoCacheRespostas.ttl):
+        self._cache = CacheTTL(max_itens=max_itens, ttl=ttl)
+
+    async def obter(self, chave):
+        return self._cache.obter(chave)
+
+    async def definir(self, chave, valor, ttl):
+        self._cache.definir(chave, valor, ttl=ttl)
+
+    async def remover(self, chave):
+        self._cache.remover(chave)
+
+
+class CacheRespostasRedis:
+    """
+    Backend em um servidor compatível com Redis (GET, SET com EX e DEL),
+    compartilhado entre workers. Aceita o RedisFalso de Services.idempotencia.
+
+    Attributes:
+        cliente: Cliente assíncrono compatível com redis.asyncio.Redis.
+        prefixo (str): Prefixo das chaves gravadas.
+    """
+
+    def __init__(self, cliente, prefixo="cache_respostas:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    async def obter(self, chave):
+        valor = await self.cliente.get(self.prefixo + chave)
+        return orjson.loads(valor) if valor is not None else None
+
+    async def definir(self, chave, valor, ttl):
+        await self.cliente.set(self.prefixo + chave, orjson.dumps(valor), ex=max(1, int(ttl)))
+
+    async def remover(self, chave):
+        await self.cliente.delete(self.prefixo + chave)
+
+
+class CacheRespostas:
+    """
+    Cache de respostas JSON já serializadas, com ETag.
+
+    As chaves incluem a geração de cada escopo (ex: "pedido:10",
+    "usuario:3") e do escopo global. Invalidar um escopo descarta sua
+    geração, tornando inacessíveis todas as respostas que dependiam dele,
+    inclusive as que estavam sendo calculadas durante a invalidação.
+
+    Attributes:
+        armazenamento: Backend (CacheRespostasMemoria, CacheRespostasRedis) ou
+            None para desligar o cache mantendo o cálculo de ETag.
+        ttl (float): Tempo de vida das respostas, em segundos.
+    """
+
+    def __init__(self, armazenamento, ttl=ConfiguracaoCacheRespostas.ttl):
+        self.armazenamento = armazenamento
+        self.ttl = ttl
+
+    async def _geracao(self, escopo):
+        chave = f"geracao:{escopo}"
+        geracao = await self.armazenamento.obter(chave)
+        if geracao is None:
+            geracao = uuid.uuid4().hex[:12]
+            # a geração deve sobreviver às respostas que dependem dela
+            await self.armazenamento.definir(chave, geracao, self.ttl * 10)
+        return geracao
+
+    async def chave(self, nome, *escopos):
+        """
+        Monta a chave de uma resposta a partir das gerações atuais.
+
+        Args:
+            nome (str): Identificação da resposta (rota e parâmetros).
+            *escopos (str): Escopos cuja invalidação descarta a resposta.
+
+        Returns:
+            str | None: Chave no cache, ou None com o cache desligado.
+        """
+        if self.armazenamento is None:
+            return None
+        geracoes = [await self._geracao(escopo) for escopo in (ESCOPO_GLOBAL, *escopos)]
+        return f"resposta:{nome}:{':'.join(geracoes)}"
+
+    async def obter(self, chave):
+        """
+        Args:
+            chave (str | None): Chave retornada por CacheRespostas.chave.
+
+        Returns:
+            dict | None: Resposta salva (corpo, etag, headers, dono) ou None.
+        """
+        if chave is None:
+            return None
+        return await self.armazenamento.obter(chave)
+
+    async def salvar(self, chave, corpo, headers=None, dono=None):
+        """
+        Registra uma resposta serializada e calcula seu ETag.
+
+        Args:
+            chave (str | None): Chave retornada por CacheRespostas.chave.
+            corpo (bytes): Corpo JSON da resposta.
+            headers (dict, optional): Headers a serem repetidos com a resposta.
+            dono (int, optional): ID do usuário dono do recurso, para checagem de acesso.
+
+        Returns:
+            dict: Resposta registrada.
+        """
+        registro = {
+            "corpo": corpo.decode(),
+            "etag": '"' + hashlib.sha1(corpo).hexdigest() + '"',
+            "headers": headers or {},
+            "dono": dono,
+        }
+        if chave is not None:
+            await self.armazenamento.definir(chave, registro, self.ttl)
+        return registro
+
+    async def invalidar(self, *escopos):
+        """
+        Descarta as respostas que dependem dos escopos informados.
+
+        Args:
+            *escopos (str): Escopos alterados (ex: escopo_pedido(10)).
+        """
+        if self.armazenamento is None:
+            return
+        for escopo in escopos:
+            await self.armazenamento.remover(f"geracao:{escopo}")
+
+    async def invalidar_tudo(self):
+        """
+        Descarta todas as respostas em cache.
+        """
+        await self.invalidar(ESCOPO_GLOBAL)
+
+
+def criar_armazenamento_respostas(configuracao):
+    """
+    Cria o backend do cache de respostas configurado.
+
+    Args:
+        configuracao (ConfiguracaoCacheRespostas): Configuração do cache.
+            O backend "redis" usa REDIS_URL.
+
+    Returns:
+        CacheRespostasMemoria | CacheRespostasRedis | None: Backend, ou None com o cache desligado.
+
+    Raises:
+        ValueError: Se o backend for desconhecido.
+        RuntimeError: Se o backend "redis" for escolhido sem o pacote redis instalado.
+    """
+    if configuracao.backend == "memoria":
+        return CacheRespostasMemoria(configuracao.max_itens, configuracao.ttl)
+    if configuracao.backend == "desligado":
+        return None
+    if configuracao.backend == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as erro:
+            raise RuntimeError("CACHE_RESPOSTAS_BACKEND=redis requer o pacote 'redis'") from erro
+        return CacheRespostasRedis(Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    raise ValueError(f"CACHE_RESPOSTAS_BACKEND inválido: {configuracao.backend}")
+
+
+def configurar_cache_respostas(configuracao):
+    """
+    Aplica a configuração ao cache_respostas usado pelas rotas (chamado por create_app).
+
+    O objeto é alterado no lugar, então os módulos que já o importaram
+    passam a usar o novo backend.
+
+    Args:
+        configuracao (ConfiguracaoCacheRespostas): Configuração do cache.
+    """
+    cache_respostas.armazenamento = criar_armazenamento_respostas(configuracao)
+    cache_respostas.ttl = configuracao.ttl
+
+
+# criado com o backend em memória; create_app aplica a configuração da aplicação
+cache_respostas = CacheRespostas(CacheRespostasMemoria())
@@ -0,0 +1,242 @@
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.exc import IntegrityError
+from DataBase.models import ProdutoCatalogo, VersaoCatalogo, normalizar_produto
+from decimal import Decimal
+import asyncio
+import logging
+import os
+
+# intervalo em segundos entre as verificações de alteração do catálogo
+CATALOGO_RECARGA = float(os.getenv("CATALOGO_RECARGA", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+class ItemForaDoCatalogo(Exception):
+    """
+    O sabor e tamanho informados não estão no catálogo (ou foram desativados).
+    """
+
+    def __init__(self, sabor, tamanho):
+        self.sabor = sabor
+        self.tamanho = tamanho
+        super().__init__(f"Produto fora do catálogo: {sabor} ({tamanho})")
+
+
+class PrecoDivergente(Exception):
+    """
+    O preço enviado pelo cliente difere do preço atual do catálogo.
+
+    Attributes:
+        preco (Decimal): Preço atual do catálogo.
+    """
+
+    def __init__(self, sabor, tamanho, preco):
+        self.preco = preco
+        super().__init__(f"Preço de {sabor} ({tamanho}) foi atualizado para {preco}")
+
+
+class IndiceCatalogo:
+    """
+    Índice em memória do catálogo: (sabor, tamanho) -> preço.
+
+    O índice é carregado uma vez por processo e substituído por inteiro a
+    cada recarga, então as consultas são buscas em dicionário, sem acesso
+    ao banco. Alterações feitas pelo próprio processo recarregam o índice
+    na hora; as feitas por outros workers são detectadas comparando a
+    versão carregada com a maior versão da tabela, a cada CATALOGO_RECARGA
+    segundos.
+
+    Attributes:
+        versao (int | None): Versão carregada (None antes da primeira carga).
+    """
+
+    def __init__(self):
+        self.versao = None
+        self._precos = {}
+        self._recarga = None
+
+    @property
+    def carregado(self):
+        return self.versao is not None
+
+    async def carregar(self, session):
+        """
+        Carrega os produtos ativos do catálogo.
+
+        Args:
+            session (AsyncSession): Sessão do banco de dados.
+        """
+        produtos = (await session.execute(select(
+            ProdutoCatalogo.sabor, ProdutoCatalogo.tamanho, ProdutoCatalogo.preco,
+            ProdutoCatalogo.ativo, ProdutoCatalogo.versao
+        ))).all()
+        # troca o dicionário inteiro: as buscas nunca veem uma carga pela metade
+        self._precos = {
+            (produto.sabor, produto.tamanho): Decimal(produto.preco)
+            for produto in produtos if produto.ativo
+        }
+        self.versao = max((produto.versao for produto in produtos), default=0)
+
+    async def garantir_carregado(self, session):
+        """
+        Carrega o índice se ainda não tiver sido carregado neste processo.
+
+        Args:
+            session (AsyncSession): Sessão do banco de dados.
+        """
+        if not self.carregado:
+            await self.carregar(session)
+
+    def preco(self, sabor, tamanho, preco_informado=None):
+        """
+        Busca o preço de um produto.
+
+        Args:
+            sabor (str): Sabor informado.
+            tamanho (str): Tamanho informado.
+            preco_informado (float, optional): Preço enviado pelo cliente, a ser validado.
+
+        Returns:
+            tuple: (sabor, tamanho, preço) com os valores do catálogo.
+
+        Raises:
+            ItemForaDoCatalogo: Se o produto não existir ou estiver inativo.
+            PrecoDivergente: Se o preço informado diferir do catálogo.
+        """
+        chave = (normalizar_produto(sabor), normalizar_produto(tamanho))
+        preco = self._precos.get(chave)
+        if preco is None:
+            raise ItemForaDoCatalogo(sabor, tamanho)
+        if preco_informado is not None and Decimal(str(preco_informado)) != preco:
+            raise PrecoDivergente(sabor, tamanho, preco)
+        return chave[0], chave[1], preco
+
+    def produtos(self):
+        """
+        Returns:
+            list[dict]: Produtos ativos, ordenados por sabor e tamanho.
+        """
+        return [
+            {"sabor": sabor, "tamanho": tamanho, "preco": preco}
+            for (sabor, tamanho), preco in sorted(self._precos.items())
+        ]
+
+    async def verificar_alteracoes(self, fabrica_sessoes):
+        """
+        Recarrega o índice se a maior versão da tabela mudou.
+
+        Args:
+            fabrica_sessoes (async_sessionmaker): Cria a sessão da verificação.
+
+        Returns:
+            bool: True se o índice foi recarregado.
+        """
+        async with fabrica_sessoes() as session:
+            versao = await session.scalar(select(func.coalesce(func.max(ProdutoCatalogo.versao), 0)))
+            if versao == self.versao:
+                return False
+            await self.carregar(session)
+            return True
+
+    async def _recarregar_periodicamente(self, fabrica_sessoes, intervalo):
+        while True:
+            try:
+                await self.verificar_alteracoes(fabrica_sessoes)
+            except Exception:
+                logger.exception("Falha ao verificar alterações do catálogo")
+            await asyncio.sleep(intervalo)
+
+    def iniciar_recarga(self, fabrica_sessoes, intervalo=CATALOGO_RECARGA):
+        """
+        Carrega o índice e inicia a verificação periódica de alterações.
+
+        Args:
+            fabrica_sessoes (async_sessionmaker): Cria as sessões das verificações.
+            intervalo (float, optional): Segundos entre as verificações.
+        """
+        if self._recarga is None:
+            self._recarga = asyncio.create_task(self._recarregar_periodicamente(fabrica_sessoes, intervalo))
+
+    async def parar_recarga(self):
+        if self._recarga is not None:
+            self._recarga.cancel()
+            try:
+                await self._recarga
+            except asyncio.CancelledError:
+                pass
+            self._recarga = None
+
+
+indice_catalogo = IndiceCatalogo()
+
+
+async def proxima_versao(session):
+    """
+    Incrementa o contador de versões do catálogo e retorna a nova versão.
+
+    O UPDATE bloqueia a linha do contador até o commit, então alterações
+    simultâneas do catálogo recebem versões diferentes e a verificação
+    periódica (versão > carregada) não perde nenhuma delas. Deve ser a
+    primeira operação da transação.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        int: Nova versão.
+    """
+    contador = VersaoCatalogo.__table__
+    resultado = await session.execute(
+        update(contador).where(contador.c.id == 1).values(versao=contador.c.versao + 1)
+    )
+    if not resultado.rowcount:
+        # contador ainda inexistente (tabelas criadas sem a migration):
+        # começa após a maior versão do catálogo
+        try:
+            await session.execute(insert(contador).values(
+                id=1,
+                versao=select(func.coalesce(func.max(ProdutoCatalogo.versao), 0) + 1).scalar_subquery()
+            ))
+        except IntegrityError:
+            # criado ao mesmo tempo por outra transação
+            await session.rollback()
+            return await proxima_versao(session)
+    return await session.scalar(select(contador.c.versao).where(contador.c.id == 1))
+
+
+async def salvar_produto(session, sabor, tamanho, preco, ativo=True):
+    """
+    Cria ou atualiza um produto do catálogo e recarrega o índice local.
+
+    A nova versão vem do contador de versões (ver proxima_versao).
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        sabor (str): Sabor do produto.
+        tamanho (str): Tamanho do produto.
+        preco (Decimal | None): Preço unitário (None mantém o atual).
+        ativo (bool, optional): False desativa o produto.
+
+    Returns:
+        ProdutoCatalogo | None: Produto salvo, ou None ao desativar um produto inexistente.
+    """
+    versao = await proxima_versao(session)
+
+    produto = await session.scalar(select(ProdutoCatalogo).where(
+        ProdutoCatalogo.sabor == normalizar_produto(sabor),
+        ProdutoCatalogo.tamanho == normalizar_produto(tamanho)
+    ))
+    if produto is None:
+        if not ativo:
+            return None
+        produto = ProdutoCatalogo(sabor, tamanho, preco, versao)
+        session.add(produto)
+    else:
+        if preco is not None:
+            produto.preco = preco
+        produto.ativo = ativo
+        produto.versao = versao
+    await session.commit()
+    await indice_catalogo.carregar(session)
+    return produto
@@ -0,0 +1,143 @@
+from sqlalchemy import select, update
+from DataBase.models import Pedido
+from datetime import datetime, timezone
+
+PENDENTE = "PENDENTE"
+CANCELADO = "CANCELADO"
+FINALIZADO = "FINALIZADO"
+
+# status atual -> status para os quais o pedido pode ir
+TRANSICOES = {
+    PENDENTE: {CANCELADO, FINALIZADO},
+    CANCELADO: set(),
+    FINALIZADO: set(),
+}
+
+# status em que os itens (e o preço) do pedido ainda podem ser alterados
+STATUS_EDITAVEIS = {PENDENTE}
+
+
+class ErroPedido(Exception):
+    """
+    Erro de regra de negócio em uma operação sobre um pedido.
+    """
+
+
+class PedidoNaoEncontrado(ErroPedido):
+    """
+    O pedido não existe.
+    """
+
+
+class OperacaoNaoPermitida(ErroPedido):
+    """
+    O usuário não é dono do pedido nem administrador.
+    """
+
+
+class TransicaoInvalida(ErroPedido):
+    """
+    O status atual do pedido não permite a operação.
+
+    Attributes:
+        atual (str): Status atual do pedido.
+        destino (str | None): Status pretendido, ou None em alterações de itens.
+    """
+
+    def __init__(self, atual, destino=None):
+        self.atual = atual
+        self.destino = destino
+        if destino is None:
+            mensagem = f"Pedido {atual.lower()} não pode ser alterado"
+        else:
+            mensagem = f"Pedido {atual.lower()} não pode ser {destino.lower()}"
+        super().__init__(mensagem)
+
+
+def origens_permitidas(destino):
+    """
+    Retorna os status a partir dos quais um pedido pode ir para destino.
+
+    Args:
+        destino (str): Status pretendido.
+
+    Returns:
+        list[str]: Status de origem permitidos.
+    """
+    return [origem for origem, destinos in TRANSICOES.items() if destino in destinos]
+
+
+async def diagnosticar_falha(session, id_pedido, usuario, destino=None):
+    """
+    Descobre por que um UPDATE condicional não afetou o pedido.
+
+    Executado apenas no caminho de erro, com uma única consulta.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        id_pedido (int): ID do pedido.
+        usuario (UsuarioAutenticado): Usuário autenticado.
+        destino (str, optional): Status pretendido, quando for uma transição.
+
+    Raises:
+        PedidoNaoEncontrado | OperacaoNaoPermitida | TransicaoInvalida: Motivo da falha.
+    """
+    linha = (await session.execute(
+        select(Pedido.status, Pedido.usuario).where(Pedido.id == id_pedido)
+    )).first()
+    if linha is None:
+        raise PedidoNaoEncontrado()
+    if not usuario.admin and usuario.id != linha.usuario:
+        raise OperacaoNaoPermitida()
+    raise TransicaoInvalida(linha.status, destino)
+
+
+async def transicionar_pedido(session, id_pedido, destino, usuario):
+    """
+    Muda o status de um pedido com um único UPDATE condicional.
+
+    A condição inclui o status atual (apenas origens permitidas para o
+    destino) e, para quem não é administrador, o dono do pedido. Assim a
+    validação e a escrita são atômicas: de duas transições concorrentes,
+    apenas uma é aplicada. Em bancos com RETURNING os dados do pedido vêm
+    do próprio UPDATE; nos demais, de uma consulta após o UPDATE. Na
+    finalização, o momento (UTC) é gravado em finalizado_em.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        id_pedido (int): ID do pedido.
+        destino (str): Novo status.
+        usuario (UsuarioAutenticado): Usuário que solicitou a mudança.
+
+    Returns:
+        Row: id, status, usuario, preco, versao e finalizado_em do pedido atualizado.
+
+    Raises:
+        PedidoNaoEncontrado: Se o pedido não existir.
+        OperacaoNaoPermitida: Se o usuário não puder alterar o pedido.
+        TransicaoInvalida: Se o status atual não permitir a transição.
+    """
+    valores = {"status": destino, "versao": Pedido.versao + 1}
+    if destino == FINALIZADO:
+        valores["finalizado_em"] = datetime.now(timezone.utc).replace(tzinfo=None)
+    comando = (
+        update(Pedido)
+        .where(Pedido.id == id_pedido, Pedido.status.in_(origens_permitidas(destino)))
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
+    if not usuario.admin:
+        comando = comando.where(Pedido.usuario == usuario.id)
+    colunas = (Pedido.id, Pedido.status, Pedido.usuario, Pedido.preco, Pedido.versao, Pedido.finalizado_em)
+
+    if session.get_bind().dialect.update_returning:
+        pedido = (await session.execute(comando.returning(*colunas))).first()
+    else:
+        resultado = await session.execute(comando)
+        pedido = None
+        if resultado.rowcount:
+            pedido = (await session.execute(select(*colunas).where(Pedido.id == id_pedido))).first()
+
+    if pedido is None:
+        await diagnosticar_falha(session, id_pedido, usuario, destino)
+    return pedido
@@ -0,0 +1,172 @@
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import orjson
+import os
+
+# "memoria" (padrão, por processo) ou "redis" (pub/sub entre workers)
+EVENTOS_BACKEND = os.getenv("EVENTOS_BACKEND", "memoria")
+# eventos pendentes por conexão; acima disso os mais antigos são descartados
+EVENTOS_FILA_MAX = int(os.getenv("EVENTOS_FILA_MAX", "100"))
+# intervalo em segundos entre comentários de keep-alive no stream
+EVENTOS_HEARTBEAT = float(os.getenv("EVENTOS_HEARTBEAT", "15"))
+
+logger = logging.getLogger(__name__)
+
+
+def canal_usuario(id_usuario):
+    return f"usuario:{id_usuario}"
+
+
+def evento_pedido(pedido):
+    """
+    Monta o evento de alteração de um pedido.
+
+    Args:
+        pedido (Pedido | Row): Pedido com id, usuario, status, preco e versao.
+
+    Returns:
+        dict: Dados publicados aos assinantes.
+    """
+    return {
+        "id": pedido.id,
+        "usuario": pedido.usuario,
+        "status": pedido.status,
+        "preco": float(pedido.preco),
+        "versao": pedido.versao,
+    }
+
+
+class BrokerMemoria:
+    """
+    Pub/sub em memória: entrega as mensagens às assinaturas do próprio processo.
+
+    Cada assinatura tem uma fila limitada a EVENTOS_FILA_MAX; se o cliente
+    não consumir a tempo, as mensagens mais antigas são descartadas, pois
+    a mais recente de cada pedido já traz o estado atual.
+    """
+
+    def __init__(self, fila_max=EVENTOS_FILA_MAX):
+        self.fila_max = fila_max
+        self._assinantes = {}
+
+    def entregar(self, canal, mensagem):
+        for fila in self._assinantes.get(canal, ()):
+            if fila.full():
+                fila.get_nowait()
+            fila.put_nowait(mensagem)
+
+    async def publicar(self, canal, mensagem):
+        """
+        Args:
+            canal (str): Canal de destino (ex: canal_usuario(3)).
+            mensagem (dict): Mensagem publicada.
+        """
+        self.entregar(canal, mensagem)
+
+    @asynccontextmanager
+    async def assinar(self, canal):
+        """
+        Assina um canal enquanto o contexto estiver aberto.
+
+        Args:
+            canal (str): Canal assinado.
+
+        Yields:
+            asyncio.Queue: Fila com as mensagens recebidas.
+        """
+        fila = asyncio.Queue(maxsize=self.fila_max)
+        self._assinantes.setdefault(canal, set()).add(fila)
+        try:
+            yield fila
+        finally:
+            assinantes = self._assinantes[canal]
+            assinantes.discard(fila)
+            if not assinantes:
+                del self._assinantes[canal]
+
+    def assinaturas(self):
+        return sum(len(filas) for filas in self._assinantes.values())
+
+
+class BrokerRedis(BrokerMemoria):
+    """
+    Pub/sub entre workers via Redis.
+
+    As mensagens são publicadas no Redis e cada worker mantém uma única
+    conexão de escuta (PSUBSCRIBE no prefixo), iniciada na primeira
+    assinatura, que repassa as mensagens às assinaturas locais.
+
+    Attributes:
+        cliente: Cliente assíncrono compatível com redis.asyncio.Redis.
+        prefixo (str): Prefixo dos canais no Redis.
+    """
+
+    def __init__(self, cliente, prefixo="eventos:", fila_max=EVENTOS_FILA_MAX):
+        super().__init__(fila_max)
+        self.cliente = cliente
+        self.prefixo = prefixo
+        self._escuta = None
+
+    async def publicar(self, canal, mensagem):
+        # chamado após o commit: uma falha no Redis não deve falhar a requisição
+        try:
+            await self.cliente.publish(self.prefixo + canal, orjson.dumps(mensagem))
+        except Exception:
+            logger.exception("Falha ao publicar evento no canal %s", canal)
+
+    async def _escutar(self):
+        pubsub = self.cliente.pubsub()
+        await pubsub.psubscribe(self.prefixo + "*")
+        try:
+            async for mensagem in pubsub.listen():
+                if mensagem["type"] != "pmessage":
+                    continue
+                canal = mensagem["channel"]
+                if isinstance(canal, bytes):
+                    canal = canal.decode()
+                self.entregar(canal.removeprefix(self.prefixo), orjson.loads(mensagem["data"]))
+        finally:
+            await pubsub.aclose()
+
+    def _ao_terminar_escuta(self, tarefa):
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            logger.error("Escuta de eventos no Redis interrompida", exc_info=tarefa.exception())
+        # a próxima assinatura inicia uma nova escuta
+        self._escuta = None
+
+    @asynccontextmanager
+    async def assinar(self, canal):
+        if self._escuta is None:
+            self._escuta = asyncio.create_task(self._escutar())
+            self._escuta.add_done_callback(self._ao_terminar_escuta)
+        async with super().assinar(canal) as fila:
+            yield fila
+
+
+def criar_broker(backend=EVENTOS_BACKEND):
+    """
+    Cria o broker de eventos de pedidos configurado.
+
+    Args:
+        backend (str, optional): "memoria" ou "redis" (usa REDIS_URL).
+
+    Returns:
+        BrokerMemoria | BrokerRedis: Broker criado.
+
+    Raises:
+        ValueError: Se o backend for desconhecido.
+        RuntimeError: Se o backend "redis" for escolhido sem o pacote redis instalado.
+    """
+    if backend == "memoria":
+        return BrokerMemoria()
+    if backend == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as erro:
+            raise RuntimeError("EVENTOS_BACKEND=redis requer o pacote 'redis'") from erro
+        return BrokerRedis(Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    raise ValueError(f"EVENTOS_BACKEND inválido: {backend}")
+
+
+broker_eventos = criar_broker()
@@ -0,0 +1,247 @@
+from dataclasses import dataclass
+from Services.cache import CacheTTL
+import hashlib
+import orjson
+import os
+import time
+
+@dataclass(frozen=True)
+class ConfiguracaoIdempotencia:
+    """
+    Configurações do controle de Idempotency-Key.
+
+    Attributes:
+        backend (str): "memoria" (por processo) ou "redis" (compartilhado entre workers).
+        ttl (float): Tempo (s) em que a resposta de uma chave fica disponível para replay.
+        ttl_reserva (float): Tempo máximo (s) que uma chave fica reservada
+            enquanto a requisição é processada.
+        max_itens (int): Limite de chaves no backend "memoria".
+    """
+    backend: str = "memoria"
+    ttl: float = 86400.0
+    ttl_reserva: float = 60.0
+    max_itens: int = 10000
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Monta a configuração a partir das variáveis de ambiente.
+
+        Variáveis: IDEMPOTENCIA_BACKEND, IDEMPOTENCIA_TTL,
+        IDEMPOTENCIA_TTL_RESERVA e IDEMPOTENCIA_MAX_ITENS.
+
+        Returns:
+            ConfiguracaoIdempotencia: Configuração carregada.
+        """
+        return cls(
+            backend=os.getenv("IDEMPOTENCIA_BACKEND", cls.backend),
+            ttl=float(os.getenv("IDEMPOTENCIA_TTL", cls.ttl)),
+            ttl_reserva=float(os.getenv("IDEMPOTENCIA_TTL_RESERVA", cls.ttl_reserva)),
+            max_itens=int(os.getenv("IDEMPOTENCIA_MAX_ITENS", cls.max_itens)),
+        )
+
+
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDA = "concluida"
+
+
+class ArmazenamentoMemoria:
+    """
+    Armazena as chaves de idempotência em memória, no próprio processo (LRU com TTL).
+
+    Adequado para um único worker; com vários workers use ArmazenamentoRedis.
+    """
+
+    def __init__(self, max_itens=ConfiguracaoIdempotencia.max_itens, ttl=ConfiguracaoIdempotencia.ttl):
+        self._cache = CacheTTL(max_itens=max_itens, ttl=ttl)
+
+    async def reservar(self, chave, registro, ttl):
+        """
+        Grava o registro apenas se a chave ainda não existir.
+
+        Args:
+            chave (str): Chave de idempotência.
+            registro (dict): Registro da requisição em andamento.
+            ttl (float): Tempo de vida da reserva, em segundos.
+
+        Returns:
+            bool: True se a chave foi reservada, False se já existia.
+        """
+        if chave in self._cache:
+            return False
+        self._cache.definir(chave, registro, ttl=ttl)
+        return True
+
+    async def obter(self, chave):
+        return self._cache.obter(chave)
+
+    async def definir(self, chave, registro, ttl):
+        self._cache.definir(chave, registro, ttl=ttl)
+
+    async def remover(self, chave):
+        self._cache.remover(chave)
+
+
+class ArmazenamentoRedis:
+    """
+    Armazena as chaves de idempotência em um servidor compatível com Redis.
+
+    Utiliza apenas GET, DEL e SET com NX/EX, disponíveis no cliente
+    redis.asyncio e no RedisFalso.
+
+    Attributes:
+        cliente: Cliente assíncrono compatível com redis.asyncio.Redis.
+        prefixo (str): Prefixo das chaves gravadas.
+    """
+
+    def __init__(self, cliente, prefixo="idempotencia:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    async def reservar(self, chave, registro, ttl):
+        return bool(await self.cliente.set(
+            self.prefixo + chave, orjson.dumps(registro, default=float), nx=True, ex=max(1, int(ttl))
+        ))
+
+    async def obter(self, chave):
+        valor = await self.cliente.get(self.prefixo + chave)
+        return orjson.loads(valor) if valor is not None else None
+
+    async def definir(self, chave, registro, ttl):
+        await self.cliente.set(self.prefixo + chave, orjson.dumps(registro, default=float), ex=max(1, int(ttl)))
+
+    async def remover(self, chave):
+        await self.cliente.delete(self.prefixo + chave)
+
+
+class RedisFalso:
+    """
+    Implementação local do subconjunto de comandos Redis usado por
+    ArmazenamentoRedis, para testes e desenvolvimento sem servidor Redis.
+    """
+
+    def __init__(self):
+        self._dados = {}
+
+    def _valido(self, chave):
+        item = self._dados.get(chave)
+        if item is not None and item[1] is not None and item[1] <= time.monotonic():
+            del self._dados[chave]
+            return None
+        return item
+
+    async def get(self, chave):
+        item = self._valido(chave)
+        return item[0] if item else None
+
+    async def set(self, chave, valor, nx=False, ex=None):
+        if nx and self._valido(chave):
+            return None
+        self._dados[chave] = (valor, time.monotonic() + ex if ex else None)
+        return True
+
+    async def delete(self, *chaves):
+        return sum(self._dados.pop(chave, None) is not None for chave in chaves)
+
+
+def criar_armazenamento(configuracao):
+    """
+    Cria o armazenamento de chaves de idempotência configurado.
+
+    Args:
+        configuracao (ConfiguracaoIdempotencia): Configuração da idempotência.
+            O backend "redis" usa REDIS_URL.
+
+    Returns:
+        ArmazenamentoMemoria | ArmazenamentoRedis: Armazenamento criado.
+
+    Raises:
+        ValueError: Se o backend for desconhecido.
+        RuntimeError: Se o backend "redis" for escolhido sem o pacote redis instalado.
+    """
+    if configuracao.backend == "memoria":
+        return ArmazenamentoMemoria(configuracao.max_itens, configuracao.ttl)
+    if configuracao.backend == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as erro:
+            raise RuntimeError("IDEMPOTENCIA_BACKEND=redis requer o pacote 'redis'") from erro
+        return ArmazenamentoRedis(Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    raise ValueError(f"IDEMPOTENCIA_BACKEND inválido: {configuracao.backend}")
+
+
+def configurar_idempotencia(configuracao):
+    """
+    Define o armazenamento e os tempos usados pelas rotas (chamado por create_app).
+
+    Args:
+        configuracao (ConfiguracaoIdempotencia): Configuração da idempotência.
+    """
+    global configuracao_idempotencia, armazenamento_idempotencia
+    armazenamento_idempotencia = criar_armazenamento(configuracao)
+    configuracao_idempotencia = configuracao
+
+
+# padrões até create_app aplicar a configuração da aplicação; leia-os pelo
+# módulo (idempotencia.armazenamento_idempotencia), pois são substituídos
+configuracao_idempotencia = ConfiguracaoIdempotencia()
+armazenamento_idempotencia = criar_armazenamento(configuracao_idempotencia)
+
+
+def impressao_requisicao(corpo):
+    """
+    Calcula a impressão digital do corpo de uma requisição.
+
+    Args:
+        corpo (bytes): Corpo da requisição.
+
+    Returns:
+        str: Hash SHA-256 do corpo.
+    """
+    return hashlib.sha256(corpo).hexdigest()
+
+
+class RequisicaoIdempotente:
+    """
+    Controle de uma requisição com Idempotency-Key.
+
+    Attributes:
+        chave (str | None): Chave no armazenamento (None quando o header não foi enviado).
+        resposta_salva (dict | None): Resposta a ser repetida, caso a chave já tenha sido concluída.
+        concluida (bool): Indica se a resposta desta requisição já foi salva.
+    """
+
+    def __init__(self, armazenamento, chave=None, impressao=None, resposta_salva=None):
+        self.armazenamento = armazenamento
+        self.chave = chave
+        self.impressao = impressao
+        self.resposta_salva = resposta_salva
+        self.concluida = resposta_salva is not None
+
+    async def concluir(self, resposta, ttl=None):
+        """
+        Salva a resposta da requisição para ser repetida em novas tentativas.
+
+        Args:
+            resposta (dict): Conteúdo retornado pela rota.
+            ttl (float, optional): Tempo de vida da resposta salva
+                (padrão: o ttl de ConfiguracaoIdempotencia).
+
+        Returns:
+            dict: A própria resposta.
+        """
+        if self.chave is not None and not self.concluida:
+            await self.armazenamento.definir(
+                self.chave,
+                {"estado": CONCLUIDA, "impressao": self.impressao, "resposta": resposta},
+                configuracao_idempotencia.ttl if ttl is None else ttl,
+            )
+            self.concluida = True
+        return resposta
+
+    async def liberar(self):
+        """
+        Remove a reserva de uma requisição que falhou, permitindo nova tentativa.
+        """
+        if self.chave is not None and not self.concluida:
+            await self.armazenamento.remover(self.chave)
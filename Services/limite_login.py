@@ -0,0 +1,264 @@
+from dataclasses import dataclass
+from Services.cache import CacheTTL
+import math
+import os
+import time
+
+def validar_limite(nome, capacidade, por_minuto):
+    """
+    Valida a configuração de um balde de tentativas de login.
+
+    Args:
+        nome (str): Prefixo das variáveis de ambiente (ex: "LIMITE_LOGIN_IP").
+        capacidade (float): Tentativas em sequência.
+        por_minuto (float): Tentativas repostas por minuto.
+
+    Returns:
+        tuple[float, float]: (capacidade, por_minuto).
+
+    Raises:
+        ValueError: Se a capacidade for menor que 1 ou a reposição não for positiva.
+    """
+    if not capacidade >= 1:
+        raise ValueError(f"{nome}_CAPACIDADE deve ser no mínimo 1 (recebido: {capacidade})")
+    if not por_minuto > 0:
+        raise ValueError(f"{nome}_POR_MINUTO deve ser maior que zero (recebido: {por_minuto})")
+    return capacidade, por_minuto
+
+
+@dataclass(frozen=True)
+class ConfiguracaoLimiteLogin:
+    """
+    Configurações do limite de tentativas de login.
+
+    Attributes:
+        backend (str): "memoria" (por processo), "redis" (compartilhado entre
+            workers) ou "desligado".
+        ip (tuple[float, float]): Tentativas em sequência (capacidade do balde)
+            e reposição por minuto, por IP.
+        email (tuple[float, float]): O mesmo, por email.
+        max_itens (int): Limite de baldes no backend "memoria".
+
+    Raises:
+        ValueError: Se algum limite for inválido (ver validar_limite).
+    """
+    backend: str = "memoria"
+    ip: tuple = (20.0, 20.0)
+    email: tuple = (5.0, 5.0)
+    max_itens: int = 100000
+
+    def __post_init__(self):
+        validar_limite("LIMITE_LOGIN_IP", *self.ip)
+        validar_limite("LIMITE_LOGIN_EMAIL", *self.email)
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Monta a configuração a partir das variáveis de ambiente.
+
+        Variáveis: LIMITE_LOGIN_BACKEND, LIMITE_LOGIN_IP_CAPACIDADE,
+        LIMITE_LOGIN_IP_POR_MINUTO, LIMITE_LOGIN_EMAIL_CAPACIDADE,
+        LIMITE_LOGIN_EMAIL_POR_MINUTO e LIMITE_LOGIN_MAX_ITENS.
+
+        Returns:
+            ConfiguracaoLimiteLogin: Configuração carregada.
+        """
+        return cls(
+            backend=os.getenv("LIMITE_LOGIN_BACKEND", cls.backend),
+            ip=(
+                float(os.getenv("LIMITE_LOGIN_IP_CAPACIDADE", cls.ip[0])),
+                float(os.getenv("LIMITE_LOGIN_IP_POR_MINUTO", cls.ip[1])),
+            ),
+            email=(
+                float(os.getenv("LIMITE_LOGIN_EMAIL_CAPACIDADE", cls.email[0])),
+                float(os.getenv("LIMITE_LOGIN_EMAIL_POR_MINUTO", cls.email[1])),
+            ),
+            max_itens=int(os.getenv("LIMITE_LOGIN_MAX_ITENS", cls.max_itens)),
+        )
+
+
+class BaldesMemoria:
+    """
+    Baldes de tokens em memória, no próprio processo (LRU com TTL).
+
+    Cada balde guarda (tokens, instante da última atualização) e expira
+    quando estaria cheio de novo, pois um balde cheio equivale a um ausente.
+    """
+
+    def __init__(self, max_itens=ConfiguracaoLimiteLogin.max_itens):
+        self._baldes = CacheTTL(max_itens=max_itens)
+
+    async def consumir(self, chave, capacidade, por_segundo):
+        """
+        Consome um token do balde.
+
+        Não há await entre a leitura e a escrita, então a operação é
+        atômica dentro do event loop.
+
+        Args:
+            chave (str): Identificação do balde.
+            capacidade (float): Quantidade máxima de tokens.
+            por_segundo (float): Tokens repostos por segundo.
+
+        Returns:
+            float: 0 se o token foi consumido, ou os segundos até haver um token.
+        """
+        agora = time.monotonic()
+        tokens, ultimo = self._baldes.obter(chave) or (capacidade, agora)
+        tokens = min(capacidade, tokens + (agora - ultimo) * por_segundo)
+        espera = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            espera = (1 - tokens) / por_segundo
+        self._baldes.definir(chave, (tokens, agora), ttl=(capacidade - tokens) / por_segundo)
+        return espera
+
+
+# mesmo algoritmo de BaldesMemoria, executado atomicamente no servidor
+_SCRIPT_BALDE = """
+local capacidade = tonumber(ARGV[1])
+local por_segundo = tonumber(ARGV[2])
+local relogio = redis.call('TIME')
+local agora = tonumber(relogio[1]) + tonumber(relogio[2]) / 1000000
+local dados = redis.call('HMGET', KEYS[1], 'tokens', 'ultimo')
+local tokens = tonumber(dados[1]) or capacidade
+local ultimo = tonumber(dados[2]) or agora
+tokens = math.min(capacidade, tokens + math.max(0, agora - ultimo) * por_segundo)
+local espera = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    espera = (1 - tokens) / por_segundo
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ultimo', tostring(agora))
+redis.call('EXPIRE', KEYS[1], math.ceil((capacidade - tokens) / por_segundo) + 1)
+return tostring(espera)
+"""
+
+
+class BaldesRedis:
+    """
+    Baldes de tokens em um servidor Redis, compartilhados entre workers.
+
+    O balde é lido e atualizado por um script Lua (EVAL), usando o relógio
+    do servidor para que workers em máquinas diferentes concordem.
+
+    Attributes:
+        cliente: Cliente assíncrono compatível com redis.asyncio.Redis.
+        prefixo (str): Prefixo das chaves gravadas.
+    """
+
+    def __init__(self, cliente, prefixo="limite_login:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    async def consumir(self, chave, capacidade, por_segundo):
+        espera = await self.cliente.eval(_SCRIPT_BALDE, 1, self.prefixo + chave, capacidade, por_segundo)
+        return float(espera)
+
+
+class LimiteExcedido(Exception):
+    """
+    Tentativas de login acima do limite.
+
+    Attributes:
+        espera (int): Segundos até a próxima tentativa ser aceita (Retry-After).
+    """
+
+    def __init__(self, espera):
+        self.espera = max(1, math.ceil(espera))
+        super().__init__(f"Muitas tentativas de login. Tente novamente em {self.espera} segundos")
+
+
+class LimitadorLogin:
+    """
+    Limita as tentativas de login por IP e por email com baldes de tokens.
+
+    Cada balde permite `capacidade` tentativas em sequência e repõe
+    `por_minuto` tentativas por minuto. O balde do email só é consumido
+    se o do IP permitir, então um IP bloqueado não esgota o email.
+
+    Attributes:
+        baldes: Backend (BaldesMemoria, BaldesRedis) ou None para desligar.
+    """
+
+    def __init__(
+        self,
+        baldes,
+        ip=ConfiguracaoLimiteLogin.ip,
+        email=ConfiguracaoLimiteLogin.email
+    ):
+        self.baldes = baldes
+        self.ip = validar_limite("LIMITE_LOGIN_IP", *ip)
+        self.email = validar_limite("LIMITE_LOGIN_EMAIL", *email)
+
+    async def _consumir(self, chave, limite):
+        capacidade, por_minuto = limite
+        espera = await self.baldes.consumir(chave, capacidade, por_minuto / 60)
+        if espera:
+            raise LimiteExcedido(espera)
+
+    async def verificar(self, ip, email):
+        """
+        Consome uma tentativa de login, antes de qualquer hash de senha.
+
+        Args:
+            ip (str | None): IP do cliente.
+            email (str): Email informado no login.
+
+        Raises:
+            LimiteExcedido: Se o IP ou o email excederam o limite.
+        """
+        if self.baldes is None:
+            return
+        if ip:
+            await self._consumir(f"ip:{ip}", self.ip)
+        await self._consumir(f"email:{email.strip().lower()}", self.email)
+
+
+def criar_baldes(configuracao):
+    """
+    Cria o backend de baldes do limitador de tentativas de login.
+
+    Args:
+        configuracao (ConfiguracaoLimiteLogin): Configuração do limite.
+            O backend "redis" usa REDIS_URL.
+
+    Returns:
+        BaldesMemoria | BaldesRedis | None: Backend, ou None para desligar o limite.
+
+    Raises:
+        ValueError: Se o backend for desconhecido.
+        RuntimeError: Se o backend "redis" for escolhido sem o pacote redis instalado.
+    """
+    if configuracao.backend == "memoria":
+        return BaldesMemoria(configuracao.max_itens)
+    if configuracao.backend == "desligado":
+        return None
+    if configuracao.backend == "redis":
+        try:
+            from redis.asyncio import Redis
+        except ImportError as erro:
+            raise RuntimeError("LIMITE_LOGIN_BACKEND=redis requer o pacote 'redis'") from erro
+        return BaldesRedis(Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    raise ValueError(f"LIMITE_LOGIN_BACKEND inválido: {configuracao.backend}")
+
+
+def configurar_limite_login(configuracao):
+    """
+    Aplica a configuração ao limitador_login usado pelas rotas (chamado por create_app).
+
+    O objeto é alterado no lugar, então os módulos que já o importaram
+    passam a usar os novos limites.
+
+    Args:
+        configuracao (ConfiguracaoLimiteLogin): Configuração do limite.
+    """
+    limitador_login.baldes = criar_baldes(configuracao)
+    limitador_login.ip = configuracao.ip
+    limitador_login.email = configuracao.email
+
+
+# criado com os limites padrão; create_app aplica a configuração da aplicação
+limitador_login = LimitadorLogin(BaldesMemoria())
@@ -0,0 +1,296 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# inclui o header Server-Timing nas respostas
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").strip().lower() in ("1", "true", "sim", "yes", "on")
+# comandos SQL mais lentos que este valor (ms) são registrados no log
+SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", "200"))
+
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MedicaoRequisicao:
+    """
+    Tempos coletados durante uma única requisição.
+
+    Attributes:
+        inicio (float): Instante de início (perf_counter).
+        queries (int): Comandos SQL executados.
+        tempo_sql (float): Tempo total gasto nos comandos SQL, em segundos.
+        query_mais_lenta (float): Duração do comando SQL mais lento, em segundos.
+        comando_mais_lento (str | None): Texto do comando SQL mais lento.
+        etapas (dict): Tempo acumulado por etapa nomeada (ex: "auth").
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.queries = 0
+        self.tempo_sql = 0.0
+        self.query_mais_lenta = 0.0
+        self.comando_mais_lento = None
+        self.etapas = defaultdict(float)
+
+    def decorrido(self):
+        """
+        Returns:
+            float: Segundos desde o início da requisição.
+        """
+        return time.perf_counter() - self.inicio
+
+    def registrar_query(self, comando, duracao):
+        self.queries += 1
+        self.tempo_sql += duracao
+        if duracao > self.query_mais_lenta:
+            self.query_mais_lenta = duracao
+            self.comando_mais_lento = comando
+
+    def server_timing(self, total):
+        """
+        Monta o valor do header Server-Timing.
+
+        Args:
+            total (float): Duração da requisição até o momento, em segundos.
+
+        Returns:
+            str: Métricas no formato "nome;dur=ms".
+        """
+        partes = [f"total;dur={total * 1000:.2f}"]
+        partes += [f"{nome};dur={duracao * 1000:.2f}" for nome, duracao in self.etapas.items()]
+        partes.append(f'db;dur={self.tempo_sql * 1000:.2f};desc="{self.queries} queries"')
+        if self.queries:
+            partes.append(f"db-max;dur={self.query_mais_lenta * 1000:.2f}")
+        return ", ".join(partes)
+
+
+_medicao_atual = ContextVar("medicao_requisicao", default=None)
+
+
+@contextmanager
+def medir_etapa(nome):
+    """
+    Acumula o tempo do bloco na etapa informada da requisição atual.
+
+    Fora de uma requisição instrumentada, o bloco é executado normalmente.
+
+    Args:
+        nome (str): Nome da etapa, exibido no header Server-Timing.
+    """
+    medicao = _medicao_atual.get()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if medicao is not None:
+            medicao.etapas[nome] += time.perf_counter() - inicio
+
+
+def _antes_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._inicio_metricas = time.perf_counter()
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_metricas", None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.registrar_query(statement, duracao)
+    if duracao * 1000 >= SQL_LENTA_MS:
+        logger.warning("Comando SQL lento (%.1f ms): %s", duracao * 1000, statement)
+
+
+def instrumentar_tempos_sql(engine):
+    """
+    Registra na engine os eventos que medem a duração de cada comando SQL.
+
+    Pode ser chamado mais de uma vez; os eventos são registrados apenas uma vez.
+
+    Args:
+        engine (Engine | AsyncEngine): Engine a ser instrumentada.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(engine, "before_cursor_execute", _antes_do_comando):
+        event.listen(engine, "before_cursor_execute", _antes_do_comando)
+        event.listen(engine, "after_cursor_execute", _depois_do_comando)
+
+
+def formatar_metrica(nome, tipo, ajuda, amostras):
+    """
+    Formata uma métrica no formato de exposição de texto do Prometheus.
+
+    Args:
+        nome (str): Nome da métrica.
+        tipo (str): "counter", "gauge" ou "histogram".
+        ajuda (str): Descrição da métrica.
+        amostras (list[tuple]): (sufixo, labels, valor) de cada amostra.
+
+    Returns:
+        list[str]: Linhas da métrica.
+    """
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+    for sufixo, labels, valor in amostras:
+        rotulos = ",".join(f'{chave}="{valor_label}"' for chave, valor_label in labels.items())
+        linhas.append(f"{nome}{sufixo}{{{rotulos}}} {valor}" if rotulos else f"{nome}{sufixo} {valor}")
+    return linhas
+
+
+class RegistroMetricas:
+    """
+    Agrega as medições das requisições por rota para exposição no /metrics.
+    """
+
+    def __init__(self, buckets=BUCKETS_DURACAO):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.requisicoes = defaultdict(int)
+        self.duracao = {}
+        self.queries = defaultdict(int)
+        self.tempo_sql = defaultdict(float)
+        self.query_mais_lenta = defaultdict(float)
+
+    def registrar(self, metodo, rota, status, duracao, medicao):
+        """
+        Registra uma requisição finalizada.
+
+        Args:
+            metodo (str): Método HTTP.
+            rota (str): Caminho da rota (template, ex: /order/pedido/{id_pedido}).
+            status (int): Status HTTP da resposta.
+            duracao (float): Duração total da requisição, em segundos.
+            medicao (MedicaoRequisicao): Medições coletadas na requisição.
+        """
+        chave = (metodo, rota)
+        with self._lock:
+            self.requisicoes[(metodo, rota, str(status))] += 1
+            histograma = self.duracao.setdefault(chave, [0] * len(self.buckets) + [0.0, 0])
+            for indice, limite in enumerate(self.buckets):
+                if duracao <= limite:
+                    histograma[indice] += 1
+            histograma[-2] += duracao
+            histograma[-1] += 1
+            self.queries[chave] += medicao.queries
+            self.tempo_sql[chave] += medicao.tempo_sql
+            self.query_mais_lenta[chave] = max(self.query_mais_lenta[chave], medicao.query_mais_lenta)
+
+    def exportar(self):
+        """
+        Returns:
+            list[str]: Linhas no formato de texto do Prometheus.
+        """
+        with self._lock:
+            requisicoes = dict(self.requisicoes)
+            duracao = {chave: list(valores) for chave, valores in self.duracao.items()}
+            queries = dict(self.queries)
+            tempo_sql = dict(self.tempo_sql)
+            query_mais_lenta = dict(self.query_mais_lenta)
+
+        def labels(metodo, rota, **extras):
+            return {"metodo": metodo, "rota": rota, **extras}
+
+        amostras_duracao = []
+        for (metodo, rota), valores in sorted(duracao.items()):
+            for limite, quantidade in zip(self.buckets, valores):
+                amostras_duracao.append(("_bucket", labels(metodo, rota, le=limite), quantidade))
+            amostras_duracao.append(("_bucket", labels(metodo, rota, le="+Inf"), valores[-1]))
+            amostras_duracao.append(("_sum", labels(metodo, rota), round(valores[-2], 6)))
+            amostras_duracao.append(("_count", labels(metodo, rota), valores[-1]))
+
+        return [
+            *formatar_metrica(
+                "http_requisicoes_total", "counter", "Requisicoes HTTP atendidas.",
+                [("", labels(m, r, status=s), v) for (m, r, s), v in sorted(requisicoes.items())],
+            ),
+            *formatar_metrica(
+                "http_requisicao_duracao_segundos", "histogram", "Duracao das requisicoes HTTP.",
+                amostras_duracao,
+            ),
+            *formatar_metrica(
+                "sql_queries_total", "counter", "Comandos SQL executados por rota.",
+                [("", labels(m, r), v) for (m, r), v in sorted(queries.items())],
+            ),
+            *formatar_metrica(
+                "sql_duracao_segundos_total", "counter", "Tempo gasto em comandos SQL por rota.",
+                [("", labels(m, r), round(v, 6)) for (m, r), v in sorted(tempo_sql.items())],
+            ),
+            *formatar_metrica(
+                "sql_query_mais_lenta_segundos", "gauge", "Comando SQL mais lento observado por rota.",
+                [("", labels(m, r), round(v, 6)) for (m, r), v in sorted(query_mais_lenta.items())],
+            ),
+        ]
+
+
+registro_metricas = RegistroMetricas()
+
+# etapa -> duração (s) da inicialização deste worker
+tempos_inicializacao = {}
+
+
+def registrar_inicializacao(etapa, duracao):
+    """
+    Registra a duração de uma etapa da inicialização do worker.
+
+    Etapas registradas pela aplicação: "importacao" (import dos módulos),
+    "criacao_app" (create_app), "lifespan" (aquecimento) e "total" (do
+    início do import até a aplicação ficar pronta).
+
+    Args:
+        etapa (str): Nome da etapa.
+        duracao (float): Duração em segundos.
+
+    Returns:
+        float: A própria duração.
+    """
+    tempos_inicializacao[etapa] = duracao
+    return duracao
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mede cada requisição HTTP.
+
+    Registra a duração total, a quantidade e o tempo dos comandos SQL e o
+    comando mais lento de cada requisição, adiciona o header Server-Timing
+    (quando SERVER_TIMING estiver ativo) e alimenta o registro exposto em /metrics.
+    As engines precisam ter passado por instrumentar_tempos_sql.
+    """
+
+    def __init__(self, app, registro=None, server_timing=None):
+        self.app = app
+        self.registro = registro or registro_metricas
+        self.server_timing = SERVER_TIMING if server_timing is None else server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicao = MedicaoRequisicao()
+        token = _medicao_atual.set(medicao)
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                if self.server_timing:
+                    headers = list(mensagem.get("headers", []))
+                    headers.append((b"server-timing", medicao.server_timing(medicao.decorrido()).encode()))
+                    mensagem = {**mensagem, "headers": headers}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicao_atual.reset(token)
+            rota = getattr(scope.get("route"), "path", None) or "desconhecida"
+            self.registro.registrar(scope["method"], rota, status, medicao.decorrido(), medicao)
@@ -0,0 +1,195 @@
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.orm.attributes import set_committed_value
+from decimal import Decimal
+from DataBase.models import Pedido, ItemPedido
+from Services.estados_pedido import STATUS_EDITAVEIS, TransicaoInvalida
+from config import obter_configuracoes
+
+
+def subtotal_itens():
+    """
+    Retorna a subquery correlacionada com o total dos itens de um pedido.
+
+    Returns:
+        ScalarSelect: SUM(preco_unitario * quantidade) dos itens do pedido.
+    """
+    return (
+        select(func.coalesce(func.sum(ItemPedido.preco_unitario * ItemPedido.quantidade), 0))
+        .where(ItemPedido.pedido == Pedido.id)
+        .scalar_subquery()
+    )
+
+
+async def _executar_atualizacao_preco(session, comando, pedido):
+    # o UPDATE só é aplicado a pedidos editáveis e também incrementa a versão;
+    # o objeto da sessão recebe os novos valores para que um flush posterior
+    # não acuse conflito de versão
+    comando = (
+        comando
+        .where(Pedido.status.in_(STATUS_EDITAVEIS))
+        .values(versao=Pedido.versao + 1)
+    )
+    if session.get_bind().dialect.update_returning:
+        linha = (await session.execute(comando.returning(Pedido.preco, Pedido.versao))).first()
+    else:
+        resultado = await session.execute(comando)
+        linha = None
+        if resultado.rowcount:
+            linha = (await session.execute(
+                select(Pedido.preco, Pedido.versao).where(Pedido.id == pedido.id)
+            )).first()
+    if linha is None:
+        status = await session.scalar(select(Pedido.status).where(Pedido.id == pedido.id))
+        raise TransicaoInvalida(status)
+    preco, versao = linha
+    set_committed_value(pedido, "preco", preco)
+    set_committed_value(pedido, "versao", versao)
+    return preco
+
+
+async def ajustar_preco(session, pedido, delta):
+    """
+    Soma delta ao preço do pedido com um UPDATE atômico no banco.
+
+    O cálculo é feito pelo banco (preco = preco + delta), então ajustes
+    concorrentes no mesmo pedido não sobrescrevem um ao outro. A versão
+    do pedido é incrementada.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        pedido (Pedido): Pedido a ser ajustado.
+        delta (Decimal | float): Valor a ser somado (negativo em remoções).
+
+    Returns:
+        Decimal: Novo preço do pedido.
+    """
+    # str() evita levar o erro de representação do float para o Numeric
+    delta = Decimal(str(delta))
+    comando = (
+        update(Pedido)
+        .where(Pedido.id == pedido.id)
+        .values(preco=Pedido.preco + delta)
+        .execution_options(synchronize_session=False)
+    )
+    return await _executar_atualizacao_preco(session, comando, pedido)
+
+
+async def recalcular_preco(session, pedido):
+    """
+    Recalcula o preço do pedido com uma única consulta agregada no banco,
+    sem carregar os itens na sessão.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        pedido (Pedido): Pedido a ser recalculado.
+
+    Returns:
+        Decimal: Novo preço do pedido.
+    """
+    comando = (
+        update(Pedido)
+        .where(Pedido.id == pedido.id)
+        .values(preco=subtotal_itens())
+        .execution_options(synchronize_session=False)
+    )
+    return await _executar_atualizacao_preco(session, comando, pedido)
+
+
+async def atualizar_preco(session, pedido, delta):
+    """
+    Atualiza o preço do pedido após uma alteração de itens, conforme o
+    modo_preco das configurações: "incremental" ajusta Pedido.preco pela
+    diferença do item adicionado/removido e "recalcular" recalcula o total
+    a partir de todos os itens.
+
+    Os itens alterados devem estar pendentes na sessão; o flush é feito
+    automaticamente antes do UPDATE. O UPDATE só é aplicado se o pedido
+    ainda estiver em um status editável (ex: não foi cancelado em paralelo).
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        pedido (Pedido): Pedido alterado.
+        delta (Decimal | float): Diferença de valor causada pela alteração.
+
+    Returns:
+        Decimal: Novo preço do pedido.
+
+    Raises:
+        TransicaoInvalida: Se o pedido não estiver mais em um status editável.
+    """
+    if obter_configuracoes().modo_preco == "recalcular":
+        return await recalcular_preco(session, pedido)
+    return await ajustar_preco(session, pedido, delta)
+
+
+async def inserir_itens(session, itens):
+    """
+    Insere vários itens de um pedido com um único INSERT de múltiplas linhas.
+
+    Em bancos com suporte a RETURNING os ids são devolvidos pelo próprio
+    INSERT. No MySQL, os ids são relidos na mesma transação a partir do
+    lastrowid (o id da primeira linha inserida), pelo índice (pedido, id):
+    não se supõe que sejam consecutivos, o que não vale com
+    auto_increment_increment maior que 1 (ex: Galera, group replication).
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        itens (list[dict]): Valores das colunas de cada item, todos do mesmo pedido.
+
+    Returns:
+        list[int]: IDs dos itens criados, em ordem crescente.
+    """
+    comando = insert(ItemPedido.__table__).values(itens)
+    if session.get_bind().dialect.insert_returning:
+        linhas = (await session.execute(comando.returning(ItemPedido.id))).all()
+        return sorted(linha.id for linha in linhas)
+
+    resultado = await session.execute(comando)
+    return list((await session.execute(
+        select(ItemPedido.id)
+        .where(ItemPedido.pedido == itens[0]["pedido"], ItemPedido.id >= resultado.lastrowid)
+        .order_by(ItemPedido.id)
+        .limit(len(itens))
+    )).scalars().all())
+
+
+async def reconciliar_precos(session):
+    """
+    Recalcula o preço dos pedidos editáveis cujo valor diverge da soma dos itens.
+
+    Executa um único UPDATE com subquery agregada, sem trazer itens para a
+    aplicação. Deve ser executado periodicamente no modo incremental para
+    corrigir eventuais divergências. Pedidos finalizados e cancelados não
+    são alterados: o preço deles já foi contabilizado nos resumos de vendas
+    (Services/relatorios.py) e não muda mais.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        list[Row]: id, usuario, status, preco e versao dos pedidos corrigidos.
+    """
+    subtotal = subtotal_itens()
+    colunas = (Pedido.id, Pedido.usuario, Pedido.status, Pedido.preco, Pedido.versao)
+    comando = (
+        update(Pedido)
+        .where(Pedido.status.in_(STATUS_EDITAVEIS), Pedido.preco != subtotal)
+        .values(preco=subtotal, versao=Pedido.versao + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if session.get_bind().dialect.update_returning:
+        corrigidos = (await session.execute(comando.returning(*colunas))).all()
+    else:
+        # sem RETURNING: os pedidos divergentes são travados antes do UPDATE,
+        # para que a releitura devolva exatamente os pedidos corrigidos
+        ids = (await session.execute(
+            select(Pedido.id)
+            .where(Pedido.status.in_(STATUS_EDITAVEIS), Pedido.preco != subtotal)
+            .with_for_update()
+        )).scalars().all()
+        corrigidos = []
+        if ids:
+            await session.execute(comando.where(Pedido.id.in_(ids)))
+            corrigidos = (await session.execute(select(*colunas).where(Pedido.id.in_(ids)))).all()
+    await session.commit()
+    return corrigidos
@@ -0,0 +1,258 @@
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from DataBase.models import (
+    Pedido, ItemPedido, ResumoVendasDia, ResumoVendasProduto, ResumoPedidosStatus, ResumoGastosUsuario
+)
+from Services.estados_pedido import PENDENTE, FINALIZADO, TRANSICOES, origens_permitidas
+from datetime import datetime, timedelta, timezone
+
+# dialetos com INSERT ... ON CONFLICT DO UPDATE
+INSERTS_ON_CONFLICT = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+# dialetos em que somar consegue fazer o upsert dos resumos
+DIALETOS_SUPORTADOS = ("mysql", "mariadb", *INSERTS_ON_CONFLICT)
+
+
+def verificar_dialeto(dialeto):
+    """
+    Garante que o banco suporta o upsert usado pelos resumos de vendas.
+
+    Chamado na criação da aplicação: sem essa verificação, um banco não
+    suportado só falharia na primeira criação ou transição de pedido.
+
+    Args:
+        dialeto (str): Nome do dialeto SQLAlchemy (ex: "mysql").
+
+    Raises:
+        ValueError: Se o dialeto não for suportado.
+    """
+    if dialeto not in DIALETOS_SUPORTADOS:
+        raise ValueError(
+            f"Banco '{dialeto}' não suportado pelos resumos de vendas "
+            f"(suportados: {', '.join(DIALETOS_SUPORTADOS)})"
+        )
+
+
+async def somar(session, modelo, chaves, linhas):
+    """
+    Soma valores às linhas de uma tabela de resumo com um único upsert.
+
+    Linhas inexistentes são criadas com os valores recebidos; nas
+    existentes, cada coluna que não é chave recebe coluna + valor. A soma
+    é feita pelo banco, então atualizações concorrentes não se perdem.
+    As linhas são ordenadas pela chave para que transações simultâneas
+    bloqueiem as linhas na mesma ordem.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        modelo (Base): Model da tabela de resumo.
+        chaves (list[str]): Colunas da chave primária.
+        linhas (list[dict]): Valores de cada linha (chaves e incrementos).
+    """
+    if not linhas:
+        return
+    tabela = modelo.__table__
+    linhas = sorted(linhas, key=lambda linha: tuple(linha[chave] for chave in chaves))
+    colunas = [coluna for coluna in linhas[0] if coluna not in chaves]
+
+    dialeto = session.get_bind().dialect.name
+    if dialeto in ("mysql", "mariadb"):
+        comando = mysql.insert(tabela).values(linhas)
+        comando = comando.on_duplicate_key_update(
+            {coluna: tabela.c[coluna] + comando.inserted[coluna] for coluna in colunas}
+        )
+    elif dialeto in INSERTS_ON_CONFLICT:
+        comando = INSERTS_ON_CONFLICT[dialeto](tabela).values(linhas)
+        comando = comando.on_conflict_do_update(
+            index_elements=chaves,
+            set_={coluna: tabela.c[coluna] + comando.excluded[coluna] for coluna in colunas}
+        )
+    else:
+        verificar_dialeto(dialeto)
+    await session.execute(comando)
+
+
+async def registrar_criacao(session, quantidade=1):
+    """
+    Contabiliza pedidos criados (sempre como PENDENTE) no resumo por status.
+
+    Deve ser executado na mesma transação da criação.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        quantidade (int, optional): Pedidos criados.
+    """
+    await somar(session, ResumoPedidosStatus, ["status"], [{"status": PENDENTE, "pedidos": quantidade}])
+
+
+async def registrar_transicao(session, pedido, destino):
+    """
+    Atualiza os resumos após uma mudança de status de um pedido.
+
+    Move o pedido entre os status no resumo por status e, na finalização,
+    soma o pedido às vendas do dia, do usuário e de cada sabor/tamanho.
+    Deve ser executado na mesma transação do UPDATE de status, para que o
+    resumo só mude se a transição for confirmada.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        pedido (Row): Pedido retornado por transicionar_pedido.
+        destino (str): Novo status do pedido.
+    """
+    # todas as transições partem de um único status (PENDENTE)
+    origem, = origens_permitidas(destino)
+    await somar(session, ResumoPedidosStatus, ["status"], [
+        {"status": origem, "pedidos": -1},
+        {"status": destino, "pedidos": 1},
+    ])
+    if destino != FINALIZADO:
+        return
+
+    itens = (await session.execute(
+        select(
+            ItemPedido.sabor, ItemPedido.tamanho,
+            func.sum(ItemPedido.quantidade).label("quantidade"),
+            func.sum(ItemPedido.preco_unitario * ItemPedido.quantidade).label("receita"),
+        )
+        .where(ItemPedido.pedido == pedido.id)
+        .group_by(ItemPedido.sabor, ItemPedido.tamanho)
+    )).all()
+    await somar(session, ResumoVendasProduto, ["sabor", "tamanho"], [
+        {"sabor": item.sabor, "tamanho": item.tamanho, "quantidade": item.quantidade, "receita": item.receita}
+        for item in itens
+    ])
+    await somar(session, ResumoVendasDia, ["dia"], [
+        {"dia": pedido.finalizado_em.date(), "pedidos": 1, "receita": pedido.preco}
+    ])
+    await somar(session, ResumoGastosUsuario, ["usuario"], [
+        {"usuario": pedido.usuario, "pedidos": 1, "total": pedido.preco}
+    ])
+
+
+async def receita_por_dia(session, inicio=None, fim=None):
+    """
+    Busca a receita diária em um intervalo (padrão: últimos 30 dias, em UTC).
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        inicio (date, optional): Primeiro dia (inclusive).
+        fim (date, optional): Último dia (inclusive).
+
+    Returns:
+        list[Row]: dia, pedidos e receita dos dias com vendas, em ordem.
+    """
+    fim = fim or datetime.now(timezone.utc).date()
+    inicio = inicio or fim - timedelta(days=29)
+    return (await session.execute(
+        select(ResumoVendasDia.dia, ResumoVendasDia.pedidos, ResumoVendasDia.receita)
+        .where(ResumoVendasDia.dia.between(inicio, fim))
+        .order_by(ResumoVendasDia.dia)
+    )).all()
+
+
+async def vendas_por_produto(session, limite):
+    """
+    Busca os produtos mais vendidos.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        limite (int): Quantidade máxima de produtos.
+
+    Returns:
+        list[Row]: sabor, tamanho, quantidade e receita, do mais vendido ao menos vendido.
+    """
+    return (await session.execute(
+        select(
+            ResumoVendasProduto.sabor, ResumoVendasProduto.tamanho,
+            ResumoVendasProduto.quantidade, ResumoVendasProduto.receita
+        )
+        .order_by(ResumoVendasProduto.quantidade.desc())
+        .limit(limite)
+    )).all()
+
+
+async def pedidos_por_status(session):
+    """
+    Busca a quantidade de pedidos em cada status.
+
+    Returns:
+        dict: status -> quantidade (0 nos status sem pedidos).
+    """
+    linhas = (await session.execute(
+        select(ResumoPedidosStatus.status, ResumoPedidosStatus.pedidos)
+        .where(ResumoPedidosStatus.status.in_(TRANSICOES))
+    )).all()
+    contagem = dict.fromkeys(TRANSICOES, 0)
+    contagem.update({linha.status: linha.pedidos for linha in linhas})
+    return contagem
+
+
+async def gastos_por_usuario(session, limite):
+    """
+    Busca os usuários que mais gastaram.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        limite (int): Quantidade máxima de usuários.
+
+    Returns:
+        list[Row]: usuario, pedidos e total, do maior gasto ao menor.
+    """
+    return (await session.execute(
+        select(ResumoGastosUsuario.usuario, ResumoGastosUsuario.pedidos, ResumoGastosUsuario.total)
+        .order_by(ResumoGastosUsuario.total.desc())
+        .limit(limite)
+    )).all()
+
+
+async def reconstruir_resumos(session):
+    """
+    Recalcula todas as tabelas de resumo a partir de pedidos e itens.
+
+    Cada resumo é apagado e preenchido por um único INSERT ... SELECT com
+    GROUP BY, executado inteiramente no banco, sem trazer pedidos ou itens
+    para a aplicação. Tudo ocorre em uma transação: as consultas nunca
+    veem os resumos pela metade. Pedidos finalizados antes da coluna
+    finalizado_em existir entram nos resumos por produto e por usuário,
+    mas não na receita por dia.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        dict: Quantidade de linhas gravadas em cada tabela de resumo.
+    """
+    finalizados = Pedido.status == FINALIZADO
+    consultas = {
+        ResumoPedidosStatus: select(Pedido.status, func.count()).group_by(Pedido.status),
+        ResumoVendasDia: (
+            select(func.date(Pedido.finalizado_em), func.count(), func.sum(Pedido.preco))
+            .where(finalizados, Pedido.finalizado_em.is_not(None))
+            .group_by(func.date(Pedido.finalizado_em))
+        ),
+        ResumoVendasProduto: (
+            select(
+                ItemPedido.sabor, ItemPedido.tamanho, func.sum(ItemPedido.quantidade),
+                func.sum(ItemPedido.preco_unitario * ItemPedido.quantidade)
+            )
+            .join(Pedido, Pedido.id == ItemPedido.pedido)
+            .where(finalizados)
+            .group_by(ItemPedido.sabor, ItemPedido.tamanho)
+        ),
+        ResumoGastosUsuario: (
+            select(Pedido.usuario, func.count(), func.sum(Pedido.preco))
+            .where(finalizados)
+            .group_by(Pedido.usuario)
+        ),
+    }
+
+    linhas = {}
+    for modelo, consulta in consultas.items():
+        tabela = modelo.__table__
+        await session.execute(delete(tabela))
+        resultado = await session.execute(insert(tabela).from_select(list(tabela.c.keys()), consulta))
+        linhas[tabela.name] = resultado.rowcount
+    await session.commit()
+    return linhas
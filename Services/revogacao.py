@@ -0,0 +1,253 @@
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from DataBase.models import TokenRevogado
+from config import obter_configuracoes
+from datetime import datetime, timedelta, timezone
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+# intervalo em segundos entre as leituras das revogações feitas por outros workers
+REVOGACAO_SINCRONIA = float(os.getenv("REVOGACAO_SINCRONIA", "5"))
+# intervalo em segundos entre as remoções das revogações expiradas do banco
+REVOGACAO_LIMPEZA = float(os.getenv("REVOGACAO_LIMPEZA", "3600"))
+# cada sincronia relê as revogações desta janela (s) antes da anterior,
+# cobrindo diferenças de relógio entre workers e transações lentas
+MARGEM_SINCRONIA = timedelta(seconds=30)
+# revogações conferidas em memória a cada request. Refresh tokens revogados
+# ficam só no banco: a reutilização é detectada pela chave de tokens_revogados
+TIPOS_EM_MEMORIA = ("access", "familia")
+
+logger = logging.getLogger(__name__)
+
+
+class TokenReutilizado(Exception):
+    """
+    O token já havia sido revogado (ex: refresh token usado duas vezes).
+    """
+
+
+def _agora():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def hash_jti(jti):
+    """
+    Reduz o jti a um inteiro de 64 bits.
+
+    A chance de colisão (um token válido tratado como revogado) é
+    desprezível para a quantidade de tokens revogados em circulação.
+
+    Args:
+        jti (str): Identificador do token.
+
+    Returns:
+        int: Hash do jti.
+    """
+    return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), "big")
+
+
+class ListaRevogacao:
+    """
+    Conjunto em memória dos access tokens e famílias revogados ainda não expirados.
+
+    Guarda apenas o hash de 64 bits do identificador e a expiração, então a
+    verificação no caminho de autenticação é uma busca em dicionário, sem
+    acesso ao banco. Entradas expiradas são descartadas periodicamente
+    (o token já seria recusado pelo "exp"). Revogações feitas por outros
+    workers são lidas da tabela tokens_revogados a cada REVOGACAO_SINCRONIA
+    segundos; as do próprio worker valem na hora.
+    """
+
+    def __init__(self):
+        self._expiracoes = {}
+        self._ultima_sincronia = None
+        self._ultima_limpeza = time.monotonic()
+        self._sincronia = None
+
+    def __len__(self):
+        return len(self._expiracoes)
+
+    def adicionar(self, jti, expira_em):
+        """
+        Marca um token (ou família) como revogado neste worker.
+
+        Args:
+            jti (str): Identificador do token ou da família.
+            expira_em (float): Expiração do token (timestamp Unix).
+        """
+        self._expiracoes[hash_jti(jti)] = expira_em
+
+    def contem(self, jti):
+        """
+        Args:
+            jti (str): Identificador do token ou da família.
+
+        Returns:
+            bool: True se foi revogado.
+        """
+        return hash_jti(jti) in self._expiracoes
+
+    def varrer(self):
+        """
+        Remove as entradas de tokens já expirados.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        agora = time.time()
+        expirados = [chave for chave, expira_em in self._expiracoes.items() if expira_em <= agora]
+        for chave in expirados:
+            del self._expiracoes[chave]
+        return len(expirados)
+
+    async def sincronizar(self, fabrica_sessoes):
+        """
+        Lê as revogações novas da tabela e descarta as expiradas.
+
+        Na primeira chamada carrega todas as revogações não expiradas; nas
+        seguintes, apenas as feitas desde a última leitura (com uma margem).
+
+        Args:
+            fabrica_sessoes (async_sessionmaker): Cria a sessão da leitura.
+
+        Returns:
+            int: Revogações lidas.
+        """
+        inicio = _agora()
+        if self._ultima_sincronia is None:
+            filtro = TokenRevogado.expira_em > inicio
+        else:
+            filtro = TokenRevogado.revogado_em >= self._ultima_sincronia - MARGEM_SINCRONIA
+        async with fabrica_sessoes() as session:
+            linhas = (await session.execute(
+                select(TokenRevogado.jti, TokenRevogado.expira_em)
+                .where(filtro, TokenRevogado.tipo.in_(TIPOS_EM_MEMORIA))
+            )).all()
+        for linha in linhas:
+            self.adicionar(linha.jti, linha.expira_em.replace(tzinfo=timezone.utc).timestamp())
+        self._ultima_sincronia = inicio
+        self.varrer()
+        return len(linhas)
+
+    async def _sincronizar_periodicamente(self, fabrica_sessoes, intervalo):
+        while True:
+            try:
+                await self.sincronizar(fabrica_sessoes)
+                if time.monotonic() - self._ultima_limpeza >= REVOGACAO_LIMPEZA:
+                    self._ultima_limpeza = time.monotonic()
+                    async with fabrica_sessoes() as session:
+                        await limpar_expirados(session)
+            except Exception:
+                logger.exception("Falha ao sincronizar os tokens revogados")
+            await asyncio.sleep(intervalo)
+
+    def iniciar_sincronia(self, fabrica_sessoes, intervalo=REVOGACAO_SINCRONIA):
+        """
+        Inicia a leitura periódica das revogações (a primeira é imediata).
+
+        Args:
+            fabrica_sessoes (async_sessionmaker): Cria as sessões das leituras.
+            intervalo (float, optional): Segundos entre as leituras.
+        """
+        if self._sincronia is None:
+            self._sincronia = asyncio.create_task(self._sincronizar_periodicamente(fabrica_sessoes, intervalo))
+
+    async def parar_sincronia(self):
+        if self._sincronia is not None:
+            self._sincronia.cancel()
+            try:
+                await self._sincronia
+            except asyncio.CancelledError:
+                pass
+            self._sincronia = None
+
+
+lista_revogacao = ListaRevogacao()
+
+
+async def revogar(session, dic_info):
+    """
+    Revoga um token: grava o jti em tokens_revogados e, se for de um tipo
+    de TIPOS_EM_MEMORIA, na lista local.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        dic_info (dict): Claims decodificadas do token (jti, sub, tipo e exp).
+
+    Raises:
+        TokenReutilizado: Se o token já estava revogado.
+    """
+    expira_em = datetime.fromtimestamp(dic_info["exp"], timezone.utc).replace(tzinfo=None)
+    try:
+        await session.execute(insert(TokenRevogado.__table__).values(
+            jti=dic_info["jti"],
+            usuario=int(dic_info["sub"]),
+            tipo=dic_info["tipo"],
+            expira_em=expira_em,
+            revogado_em=_agora(),
+        ))
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise TokenReutilizado()
+    finally:
+        # mesmo se a gravação falhar, este worker deixa de aceitar o token
+        if dic_info["tipo"] in TIPOS_EM_MEMORIA:
+            lista_revogacao.adicionar(dic_info["jti"], dic_info["exp"])
+
+
+async def revogar_familia(session, familia, id_usuario):
+    """
+    Revoga todos os tokens de uma família (claim "familia").
+
+    A família reúne os tokens emitidos a partir de um mesmo login,
+    incluindo as rotações do refresh token. A revogação vale até a maior
+    validade possível de um refresh token da família.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        familia (str): Identificador da família.
+        id_usuario (int): ID do dono dos tokens.
+    """
+    expira_em = datetime.now(timezone.utc) + timedelta(days=obter_configuracoes().dias_refresh)
+    try:
+        await revogar(session, {
+            "jti": familia, "sub": id_usuario, "tipo": "familia", "exp": expira_em.timestamp()
+        })
+    except TokenReutilizado:
+        pass
+
+
+async def familia_revogada(session, familia):
+    """
+    Confere no banco se uma família foi revogada.
+
+    Usado na troca do refresh token, para valer na hora também para
+    revogações feitas por outros workers.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+        familia (str): Identificador da família.
+
+    Returns:
+        bool: True se a família foi revogada.
+    """
+    return await session.scalar(select(TokenRevogado.jti).where(TokenRevogado.jti == familia)) is not None
+
+
+async def limpar_expirados(session):
+    """
+    Apaga da tabela as revogações de tokens já expirados.
+
+    Args:
+        session (AsyncSession): Sessão do banco de dados.
+
+    Returns:
+        int: Linhas apagadas.
+    """
+    resultado = await session.execute(delete(TokenRevogado).where(TokenRevogado.expira_em <= _agora()))
+    await session.commit()
+    return resultado.rowcount
@@ -0,0 +1,196 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from passlib.context import CryptContext
+import asyncio
+import os
+import secrets
+import time
+
+# em modo "process" as funções abaixo rodam nos workers, que importam
+# apenas este módulo (e não a aplicação)
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _gerar_hash(senha):
+    return bcrypt_context.hash(senha)
+
+
+def _verificar_senha(senha, hash_senha):
+    return bcrypt_context.verify_and_update(senha, hash_senha)
+
+
+def _carregar_backend():
+    # o bcrypt_context carrega o backend do bcrypt no primeiro uso
+    bcrypt_context.handler().get_backend()
+
+
+class ServicoSenhas:
+    """
+    Serviço que executa o hash e a verificação de senhas fora do event loop.
+
+    O bcrypt consome de 100 a 300 ms de CPU por operação. As chamadas são
+    enviadas para um pool de threads (o bcrypt libera o GIL) ou de processos,
+    e um semáforo limita quantas operações rodam ao mesmo tempo; as demais
+    aguardam em fila sem bloquear os outros requests.
+
+    Attributes:
+        tipo_executor (str): "thread" ou "process".
+        workers (int): Quantidade de workers do pool.
+        max_concorrencia (int): Operações de hash simultâneas permitidas.
+    """
+
+    def __init__(self, tipo_executor="thread", workers=None, max_concorrencia=None):
+        """
+        Inicializa o serviço de senhas.
+
+        Args:
+            tipo_executor (str, optional): "thread" ou "process".
+            workers (int, optional): Tamanho do pool. Padrão: min(4, CPUs).
+            max_concorrencia (int, optional): Limite de operações simultâneas.
+                Padrão: igual ao número de workers.
+        """
+        if tipo_executor not in ("thread", "process"):
+            raise ValueError(f"Executor de hash inválido: {tipo_executor}")
+        self.tipo_executor = tipo_executor
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_concorrencia = max_concorrencia or self.workers
+        self._executor = None
+        self._hash_ficticio = None
+        self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+        self.aguardando = 0
+        self.em_execucao = 0
+        self.total_operacoes = 0
+        self.tempo_total = 0.0
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Cria o serviço a partir das variáveis de ambiente
+        HASH_EXECUTOR, HASH_WORKERS e HASH_MAX_CONCORRENCIA.
+
+        Returns:
+            ServicoSenhas: Serviço configurado.
+        """
+        return cls(
+            tipo_executor=os.getenv("HASH_EXECUTOR", "thread"),
+            workers=int(os.getenv("HASH_WORKERS", 0)) or None,
+            max_concorrencia=int(os.getenv("HASH_MAX_CONCORRENCIA", 0)) or None,
+        )
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            if self.tipo_executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="hash-senha"
+                )
+        return self._executor
+
+    async def _executar(self, funcao, *args):
+        self.aguardando += 1
+        try:
+            await self._semaforo.acquire()
+        finally:
+            self.aguardando -= 1
+
+        self.em_execucao += 1
+        inicio = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, funcao, *args)
+        finally:
+            self.em_execucao -= 1
+            self.total_operacoes += 1
+            self.tempo_total += time.perf_counter() - inicio
+            self._semaforo.release()
+
+    async def gerar_hash(self, senha):
+        """
+        Gera o hash de uma senha.
+
+        Args:
+            senha (str): Senha em texto plano.
+
+        Returns:
+            str: Hash da senha.
+        """
+        return await self._executar(_gerar_hash, senha)
+
+    async def verificar(self, senha, hash_senha):
+        """
+        Verifica uma senha e indica se o hash precisa ser atualizado.
+
+        Args:
+            senha (str): Senha em texto plano.
+            hash_senha (str): Hash armazenado.
+
+        Returns:
+            tuple: (senha_valida, novo_hash). novo_hash é None quando o hash
+            armazenado já está no esquema e parâmetros atuais.
+        """
+        return await self._executar(_verificar_senha, senha, hash_senha)
+
+    async def verificar_ficticio(self, senha):
+        """
+        Verifica a senha contra um hash descartável, com o mesmo custo de
+        verificar.
+
+        Usado quando o usuário não existe, para que o tempo de resposta não
+        revele quais emails estão cadastrados.
+
+        Args:
+            senha (str): Senha em texto plano.
+
+        Returns:
+            bool: Sempre False.
+        """
+        if self._hash_ficticio is None:
+            self._hash_ficticio = await self.gerar_hash(secrets.token_urlsafe(16))
+        await self.verificar(senha, self._hash_ficticio)
+        return False
+
+    async def aquecer(self):
+        """
+        Inicia os workers do pool e prepara o hash fictício.
+
+        Executado na inicialização da aplicação, para que o primeiro login
+        não pague a criação dos workers (em modo "process", um processo
+        novo cada), o carregamento do backend do bcrypt e o hash fictício
+        de verificar_ficticio.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _carregar_backend) for _ in range(self.workers)
+        ))
+        if self._hash_ficticio is None:
+            self._hash_ficticio = await self.gerar_hash(secrets.token_urlsafe(16))
+
+    def metricas(self):
+        """
+        Retorna as métricas de uso do pool de hash.
+
+        Returns:
+            dict: Operações aguardando, em execução, total e tempo médio.
+        """
+        return {
+            "executor": self.tipo_executor,
+            "workers": self.workers,
+            "max_concorrencia": self.max_concorrencia,
+            "aguardando": self.aguardando,
+            "em_execucao": self.em_execucao,
+            "total_operacoes": self.total_operacoes,
+            "tempo_medio": self.tempo_total / self.total_operacoes if self.total_operacoes else 0.0,
+        }
+
+    def encerrar(self):
+        """
+        Encerra o pool de workers.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+servico_senhas = ServicoSenhas.do_ambiente()
@@ -19,6 +19,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# a URL do banco pode ser sobrescrita pela mesma variável usada pela API
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL").replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 from DataBase.models import Base
@@ -0,0 +1,32 @@
+"""indices para paginacao de pedidos
+
+Revision ID: 3f9c2a7d1e45
+Revises: 745482b8664c
+Create Date: 2026-10-18 10:12:41.218530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1e45'
+down_revision: Union[str, Sequence[str], None] = '745482b8664c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_pedidos_usuario_id', 'pedidos', ['usuario', 'id'], unique=False)
+    op.create_index('ix_pedidos_status_id', 'pedidos', ['status', 'id'], unique=False)
+    op.create_index('ix_pedidos_usuario_status_id', 'pedidos', ['usuario', 'status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pedidos_usuario_status_id', table_name='pedidos')
+    op.drop_index('ix_pedidos_status_id', table_name='pedidos')
+    op.drop_index('ix_pedidos_usuario_id', table_name='pedidos')
@@ -0,0 +1,28 @@
+"""versao dos pedidos para controle otimista de concorrencia
+
+Revision ID: 8d2e61b4c0a9
+Revises: 3f9c2a7d1e45
+Create Date: 2026-10-18 14:03:52.107214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e61b4c0a9'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pedidos', sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pedidos', 'versao')
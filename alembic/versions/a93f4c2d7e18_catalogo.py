@@ -0,0 +1,40 @@
+"""catalogo de produtos
+
+Revision ID: a93f4c2d7e18
+Revises: e5b8d3a61f27
+Create Date: 2026-10-18 17:02:15.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93f4c2d7e18'
+down_revision: Union[str, Sequence[str], None] = 'e5b8d3a61f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('catalogo',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('sabor', sa.String(length=50), nullable=False),
+    sa.Column('tamanho', sa.String(length=50), nullable=False),
+    sa.Column('preco', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('ativo', sa.Boolean(), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_catalogo_sabor_tamanho', 'catalogo', ['sabor', 'tamanho'], unique=True)
+    op.create_index('ix_catalogo_versao', 'catalogo', ['versao'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_catalogo_versao', table_name='catalogo')
+    op.drop_index('ix_catalogo_sabor_tamanho', table_name='catalogo')
+    op.drop_table('catalogo')
@@ -0,0 +1,34 @@
+"""contador de versao do catalogo
+
+Revision ID: b2e7f4a9c310
+Revises: f3a8c61d9e52
+Create Date: 2026-10-18 23:41:08.517263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e7f4a9c310'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c61d9e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('catalogo_versao',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # o contador continua da maior versão já gravada no catálogo
+    op.execute("INSERT INTO catalogo_versao (id, versao) SELECT 1, COALESCE(MAX(versao), 0) FROM catalogo")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalogo_versao')
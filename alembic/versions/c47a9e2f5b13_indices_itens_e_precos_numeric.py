@@ -0,0 +1,44 @@
+"""indice de itens por pedido e precos como numeric
+
+Revision ID: c47a9e2f5b13
+Revises: 8d2e61b4c0a9
+Create Date: 2026-10-18 15:21:07.664308
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e2f5b13'
+down_revision: Union[str, Sequence[str], None] = '8d2e61b4c0a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_itens_pedidos_pedido_id', 'itens_pedidos', ['pedido', 'id'], unique=False)
+    op.alter_column('pedidos', 'preco',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=10, scale=2),
+               existing_nullable=False)
+    op.alter_column('itens_pedidos', 'preco_unitario',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=10, scale=2),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('itens_pedidos', 'preco_unitario',
+               existing_type=sa.Numeric(precision=10, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
+    op.alter_column('pedidos', 'preco',
+               existing_type=sa.Numeric(precision=10, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
+    op.drop_index('ix_itens_pedidos_pedido_id', table_name='itens_pedidos')
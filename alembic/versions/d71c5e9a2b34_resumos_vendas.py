@@ -0,0 +1,61 @@
+"""resumos de vendas
+
+Revision ID: d71c5e9a2b34
+Revises: a93f4c2d7e18
+Create Date: 2026-10-18 18:24:51.317206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71c5e9a2b34'
+down_revision: Union[str, Sequence[str], None] = 'a93f4c2d7e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pedidos', sa.Column('finalizado_em', sa.DateTime(), nullable=True))
+    op.create_table('resumo_vendas_dia',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('pedidos', sa.Integer(), nullable=False),
+    sa.Column('receita', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('dia')
+    )
+    op.create_table('resumo_vendas_produto',
+    sa.Column('sabor', sa.String(length=50), nullable=False),
+    sa.Column('tamanho', sa.String(length=50), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('receita', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('sabor', 'tamanho')
+    )
+    op.create_index('ix_resumo_vendas_produto_quantidade', 'resumo_vendas_produto', ['quantidade'], unique=False)
+    op.create_table('resumo_pedidos_status',
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('pedidos', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    op.create_table('resumo_gastos_usuario',
+    sa.Column('usuario', sa.Integer(), nullable=False),
+    sa.Column('pedidos', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['usuario'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('usuario')
+    )
+    op.create_index('ix_resumo_gastos_usuario_total', 'resumo_gastos_usuario', ['total'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resumo_gastos_usuario_total', table_name='resumo_gastos_usuario')
+    op.drop_table('resumo_gastos_usuario')
+    op.drop_table('resumo_pedidos_status')
+    op.drop_index('ix_resumo_vendas_produto_quantidade', table_name='resumo_vendas_produto')
+    op.drop_table('resumo_vendas_produto')
+    op.drop_table('resumo_vendas_dia')
+    op.drop_column('pedidos', 'finalizado_em')
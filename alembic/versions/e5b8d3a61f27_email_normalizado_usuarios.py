@@ -0,0 +1,66 @@
+"""email normalizado dos usuarios
+
+Revision ID: e5b8d3a61f27
+Revises: c47a9e2f5b13
+Create Date: 2026-10-18 16:12:40.318529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d3a61f27'
+down_revision: Union[str, Sequence[str], None] = 'c47a9e2f5b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def emails_duplicados():
+    """Usuários cujo email normalizado coincide com o de outro usuário."""
+    normalizado = sa.func.lower(sa.func.trim(sa.column('email')))
+    users = sa.table('users', sa.column('id'), sa.column('email'))
+    repetidos = (
+        sa.select(normalizado)
+        .select_from(users)
+        .group_by(normalizado)
+        .having(sa.func.count() > 1)
+    )
+    linhas = op.get_bind().execute(
+        sa.select(normalizado.label('email'), users.c.id)
+        .where(normalizado.in_(repetidos))
+        .order_by(normalizado, users.c.id)
+    ).all()
+    duplicados = {}
+    for email, id_usuario in linhas:
+        duplicados.setdefault(email, []).append(id_usuario)
+    return duplicados
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # o índice único falharia no meio da migration (o MySQL não desfaz o
+    # ADD COLUMN): os duplicados são verificados antes de qualquer alteração
+    if not op.get_context().as_sql:
+        duplicados = emails_duplicados()
+        if duplicados:
+            conflitos = "; ".join(f"{email}: ids {ids}" for email, ids in duplicados.items())
+            raise RuntimeError(
+                "Existem usuários com o mesmo email ignorando maiúsculas/espaços. "
+                f"Unifique ou altere esses cadastros antes de migrar: {conflitos}"
+            )
+    op.add_column('users', sa.Column('email_normalizado', sa.String(length=50), nullable=True))
+    # mesma regra de DataBase.models.normalizar_email
+    op.execute("UPDATE users SET email_normalizado = LOWER(TRIM(email))")
+    op.alter_column('users', 'email_normalizado',
+               existing_type=sa.String(length=50),
+               nullable=False)
+    op.create_index('ix_users_email_normalizado', 'users', ['email_normalizado'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_normalizado', table_name='users')
+    op.drop_column('users', 'email_normalizado')
@@ -0,0 +1,40 @@
+"""tokens revogados
+
+Revision ID: f3a8c61d9e52
+Revises: d71c5e9a2b34
+Create Date: 2026-10-18 21:07:33.904812
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c61d9e52'
+down_revision: Union[str, Sequence[str], None] = 'd71c5e9a2b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tokens_revogados',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('usuario', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=10), nullable=False),
+    sa.Column('expira_em', sa.DateTime(), nullable=False),
+    sa.Column('revogado_em', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_tokens_revogados_expira_em', 'tokens_revogados', ['expira_em'], unique=False)
+    op.create_index('ix_tokens_revogados_revogado_em', 'tokens_revogados', ['revogado_em'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tokens_revogados_revogado_em', table_name='tokens_revogados')
+    op.drop_index('ix_tokens_revogados_expira_em', table_name='tokens_revogados')
+    op.drop_table('tokens_revogados')
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from DataBase.database import ConfiguracaoBanco, env_bool
+from Services.cache_respostas import ConfiguracaoCacheRespostas
+from Services.idempotencia import ConfiguracaoIdempotencia
+from Services.limite_login import ConfiguracaoLimiteLogin
+from typing import Optional
+import os
+
+load_dotenv()
+
+MODOS_PRECO = ("incremental", "recalcular")
+
+
+@dataclass(frozen=True)
+class Configuracoes:
+    """
+    Configurações da aplicação, recebidas por create_app.
+
+    Attributes:
+        secret_key (str): Chave de assinatura dos tokens JWT.
+        algoritmo (str): Algoritmo de assinatura dos tokens JWT.
+        minutos_token (int): Validade (minutos) do access token.
+        dias_refresh (int): Validade (dias) do refresh token.
+        banco (ConfiguracaoBanco): Conexão e pool do banco de dados.
+        token_claims_usuario (bool): Embute "admin" e "ativo" no access token,
+            dispensando o banco na autenticação.
+        aquecer (bool): Aquece pool de conexões, queries e pool de hash na inicialização.
+        conexoes_aquecimento (int | None): Conexões abertas no aquecimento
+            (None: o pool_size do banco).
+        modo_preco (str): "incremental" (ajusta o preço pela diferença do item)
+            ou "recalcular" (soma todos os itens a cada alteração).
+        carregamento_itens (str): Estratégia de carregamento dos itens por
+            endpoint (ex: "ver_pedido=joined,listar_pedidos=selectin").
+        limite_pagina_padrao (int): Pedidos por página quando o cliente não informa o limite.
+        limite_pagina_maximo (int): Maior limite aceito por página.
+        exportacao_lote (int): Linhas lidas do banco (e enviadas) por vez na exportação.
+        cache_respostas (ConfiguracaoCacheRespostas): Cache de respostas das rotas de leitura.
+        limite_login (ConfiguracaoLimiteLogin): Limite de tentativas de login.
+        idempotencia (ConfiguracaoIdempotencia): Controle de Idempotency-Key.
+
+    Raises:
+        ValueError: Se modo_preco for desconhecido ou os limites de página
+            e o lote de exportação forem inválidos.
+    """
+    secret_key: Optional[str] = None
+    algoritmo: str = "HS256"
+    minutos_token: int = 30
+    dias_refresh: int = 7
+    token_claims_usuario: bool = False
+    banco: ConfiguracaoBanco = field(default_factory=ConfiguracaoBanco)
+    aquecer: bool = True
+    conexoes_aquecimento: Optional[int] = None
+    modo_preco: str = "incremental"
+    carregamento_itens: str = ""
+    limite_pagina_padrao: int = 50
+    limite_pagina_maximo: int = 200
+    exportacao_lote: int = 1000
+    cache_respostas: ConfiguracaoCacheRespostas = field(default_factory=ConfiguracaoCacheRespostas)
+    limite_login: ConfiguracaoLimiteLogin = field(default_factory=ConfiguracaoLimiteLogin)
+    idempotencia: ConfiguracaoIdempotencia = field(default_factory=ConfiguracaoIdempotencia)
+
+    def __post_init__(self):
+        if self.modo_preco not in MODOS_PRECO:
+            raise ValueError(f"MODO_PRECO inválido: {self.modo_preco} (válidos: {', '.join(MODOS_PRECO)})")
+        if not 1 <= self.limite_pagina_padrao <= self.limite_pagina_maximo:
+            raise ValueError(
+                "LIMITE_PAGINA_PADRAO deve estar entre 1 e LIMITE_PAGINA_MAXIMO "
+                f"(recebido: {self.limite_pagina_padrao}, máximo {self.limite_pagina_maximo})"
+            )
+        if self.exportacao_lote < 1:
+            raise ValueError(f"EXPORTACAO_LOTE deve ser no mínimo 1 (recebido: {self.exportacao_lote})")
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Monta as configurações a partir das variáveis de ambiente (e do .env).
+
+        Variáveis: SECRET_KEY, ALGORITHM, ACCES_TOKEN_EXPIRES_MINUTES,
+        REFRESH_TOKEN_EXPIRES_DAYS, TOKEN_CLAIMS_USUARIO, APP_AQUECER,
+        APP_CONEXOES_AQUECIMENTO, MODO_PRECO, CARREGAMENTO_ITENS,
+        LIMITE_PAGINA_PADRAO, LIMITE_PAGINA_MAXIMO, EXPORTACAO_LOTE e as do
+        banco, do cache de respostas, do limite de login e da idempotência
+        (ver o do_ambiente de cada configuração).
+
+        Returns:
+            Configuracoes: Configurações carregadas.
+        """
+        conexoes_aquecimento = os.getenv("APP_CONEXOES_AQUECIMENTO")
+        return cls(
+            secret_key=os.getenv("SECRET_KEY"),
+            algoritmo=os.getenv("ALGORITHM", cls.algoritmo),
+            minutos_token=int(os.getenv("ACCES_TOKEN_EXPIRES_MINUTES", cls.minutos_token)),
+            dias_refresh=int(os.getenv("REFRESH_TOKEN_EXPIRES_DAYS", cls.dias_refresh)),
+            token_claims_usuario=env_bool("TOKEN_CLAIMS_USUARIO", cls.token_claims_usuario),
+            banco=ConfiguracaoBanco.do_ambiente(),
+            aquecer=env_bool("APP_AQUECER", cls.aquecer),
+            conexoes_aquecimento=int(conexoes_aquecimento) if conexoes_aquecimento else None,
+            modo_preco=os.getenv("MODO_PRECO", cls.modo_preco),
+            carregamento_itens=os.getenv("CARREGAMENTO_ITENS", cls.carregamento_itens),
+            limite_pagina_padrao=int(os.getenv("LIMITE_PAGINA_PADRAO", cls.limite_pagina_padrao)),
+            limite_pagina_maximo=int(os.getenv("LIMITE_PAGINA_MAXIMO", cls.limite_pagina_maximo)),
+            exportacao_lote=int(os.getenv("EXPORTACAO_LOTE", cls.exportacao_lote)),
+            cache_respostas=ConfiguracaoCacheRespostas.do_ambiente(),
+            limite_login=ConfiguracaoLimiteLogin.do_ambiente(),
+            idempotencia=ConfiguracaoIdempotencia.do_ambiente(),
+        )
+
+
+_configuracoes = None
+
+
+def obter_configuracoes():
+    """
+    Retorna as configurações ativas.
+
+    Fora de uma aplicação criada por create_app (ex: scripts), as
+    configurações são lidas do ambiente no primeiro uso.
+
+    Returns:
+        Configuracoes: Configurações ativas.
+    """
+    global _configuracoes
+    if _configuracoes is None:
+        _configuracoes = Configuracoes.do_ambiente()
+    return _configuracoes
+
+
+def ativar_configuracoes(configuracoes):
+    """
+    Define as configurações usadas pelo processo (chamado por create_app).
+
+    Args:
+        configuracoes (Configuracoes): Configurações da aplicação.
+    """
+    global _configuracoes
+    _configuracoes = configuracoes
@@ -1,24 +1,148 @@
+import time
+
+# início da importação: base da medição do tempo de inicialização do worker
+_inicio_importacao = time.perf_counter()
+
 from fastapi import FastAPI
-from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
-import os
+import logging
 
 load_dotenv()
 
-SECRET_KEY = os.getenv('SECRET_KEY')
-ALGORITHM = os.getenv('ALGORITHM')
-ACCES_TOKEN_EXPIRES_MINUTES = int(os.getenv("ACCES_TOKEN_EXPIRES_MINUTES"))
-app = FastAPI()
+from sqlalchemy import select
+from config import Configuracoes, ativar_configuracoes
+from DataBase import database
+from DataBase.database import AsyncSessionLocal, configurar_banco, aquecer_pool, fechar_banco
+from DataBase.models import User, Pedido
+from Services.metricas import MiddlewareMetricas, instrumentar_tempos_sql, registrar_inicializacao
+from Services.cache_respostas import configurar_cache_respostas
+from Services.idempotencia import configurar_idempotencia
+from Services.limite_login import configurar_limite_login
+from Services.senhas import servico_senhas
+from Services.catalogo import indice_catalogo
+from Services.relatorios import verificar_dialeto
+from Services.revogacao import lista_revogacao
+from Routes.auth_routes import auth_router
+from Routes.order_routes import order_router, carregamento_itens
+from Routes.metricas_routes import metricas_router
+from Routes.catalogo_routes import catalogo_router
+from Routes.relatorios_routes import relatorios_router
+
+logger = logging.getLogger(__name__)
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_schema = OAuth2PasswordBearer(tokenUrl="auth/login-form")
+# consultas mais frequentes das rotas. São executadas na inicialização com
+# valores que não retornam linhas: a configuração dos mappers e a
+# compilação de cada uma ficam prontas (no cache da engine) antes do
+# primeiro request
+CONSULTAS_AQUECIMENTO = (
+    select(User).where(User.id == -1),  # verificar_token
+    select(User).where(User.email_normalizado == ""),  # login
+    select(Pedido).where(Pedido.id == -1),  # adicionar e remover itens
+)
 
 
-from Routes.auth_routes import auth_router
-from Routes.order_routes import order_router
+async def aquecer(configuracoes):
+    """
+    Prepara os recursos usados pelos requests antes do primeiro deles.
+
+    Abre as conexões do pool (primário e réplicas), compila as consultas
+    de CONSULTAS_AQUECIMENTO e inicia o pool de hash de senhas. Falhas são
+    apenas registradas: a aplicação sobe e os recursos são criados sob
+    demanda, como sem o aquecimento.
+
+    Args:
+        configuracoes (Configuracoes): Configurações da aplicação.
+    """
+    conexoes = configuracoes.conexoes_aquecimento or configuracoes.banco.pool_size
+    try:
+        for engine in (database.db_async, *database.db_replicas):
+            await aquecer_pool(engine, conexoes)
+        async with AsyncSessionLocal() as session:
+            for consulta in CONSULTAS_AQUECIMENTO:
+                await session.execute(consulta)
+    except Exception:
+        logger.exception("Falha ao aquecer o pool de conexões")
+    await servico_senhas.aquecer()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Inicializa e encerra os recursos de cada worker.
+
+    Na inicialização aquece o banco e o pool de hash (ver aquecer) e
+    carrega o índice do catálogo e a lista de tokens revogados, mantendo-os
+    atualizados. No encerramento, para as atualizações, o pool de hash e
+    fecha as conexões.
+    """
+    inicio = time.perf_counter()
+    configuracoes = app.state.configuracoes
+    if configuracoes.aquecer:
+        await aquecer(configuracoes)
+    indice_catalogo.iniciar_recarga(AsyncSessionLocal)
+    lista_revogacao.iniciar_sincronia(AsyncSessionLocal)
+    registrar_inicializacao("lifespan", time.perf_counter() - inicio)
+    total = registrar_inicializacao("total", time.perf_counter() - _inicio_importacao)
+    logger.info("Aplicação pronta em %.3f s", total)
+    yield
+    await indice_catalogo.parar_recarga()
+    await lista_revogacao.parar_sincronia()
+    servico_senhas.encerrar()
+    await fechar_banco()
+
+
+def create_app(configuracoes=None):
+    """
+    Cria a aplicação FastAPI.
+
+    Configura o banco (as engines são criadas aqui, e não no import dos
+    módulos), o cache de respostas, o limite de login e a idempotência, e
+    registra o middleware de métricas e as rotas. Bancos sem suporte ao
+    upsert dos resumos de vendas e um CARREGAMENTO_ITENS inválido são
+    recusados aqui, e não no primeiro pedido. Pool de conexões, queries e
+    pool de hash são preparados no lifespan.
+
+    Args:
+        configuracoes (Configuracoes, optional): Configurações da aplicação.
+            Padrão: lidas das variáveis de ambiente.
+
+    Returns:
+        FastAPI: Aplicação configurada.
+
+    Raises:
+        ValueError: Se o banco não for suportado (ver verificar_dialeto) ou
+            carregamento_itens for inválido (ver ler_carregamento_itens).
+    """
+    inicio = time.perf_counter()
+    configuracoes = configuracoes or Configuracoes.do_ambiente()
+    ativar_configuracoes(configuracoes)
+    configurar_banco(configuracoes.banco)
+    verificar_dialeto(database.db_async.dialect.name)
+    carregamento_itens(configuracoes.carregamento_itens)
+    configurar_cache_respostas(configuracoes.cache_respostas)
+    configurar_limite_login(configuracoes.limite_login)
+    configurar_idempotencia(configuracoes.idempotencia)
+
+    app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+    app.state.configuracoes = configuracoes
+    app.add_middleware(MiddlewareMetricas)
+
+    for engine in (database.db, database.db_async, *database.db_replicas):
+        instrumentar_tempos_sql(engine)
+
+    app.include_router(auth_router)
+    app.include_router(order_router)
+    app.include_router(catalogo_router)
+    app.include_router(relatorios_router)
+    app.include_router(metricas_router)
+
+    registrar_inicializacao("criacao_app", time.perf_counter() - inicio)
+    return app
+
 
-app.include_router(auth_router)
-app.include_router(order_router)
+registrar_inicializacao("importacao", time.perf_counter() - _inicio_importacao)
+app = create_app()
 
-# Use para rodar o codigo uvicorn main:app --reload
\ No newline at end of file
+# Use para rodar o codigo uvicorn main:app --reload
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+from datetime import date
 
 
 class UsuarioSchemas(BaseModel):
@@ -37,27 +38,244 @@ class LoginSchema(BaseModel):
         from_attributes = True
 
 
+class LogoutSchema(BaseModel):
+    """
+    Schema para logout (o refresh token é opcional).
+    """
+    refresh_token: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class ItemPedidoSchema(BaseModel):
     """
     Schema para criação de itens de pedido.
+
+    O preço vem do catálogo; preco_unitario é opcional e, quando enviado,
+    precisa ser igual ao preço atual do catálogo.
     """
     quantidade: int
     sabor: str
     tamanho: str
+    preco_unitario: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LoteItensPedidoSchema(BaseModel):
+    """
+    Schema para adição de vários itens em um pedido.
+    """
+    itens: List[ItemPedidoSchema] = Field(min_length=1, max_length=100)
+
+    class Config:
+        from_attributes = True
+
+
+class ProdutoCatalogoSchema(BaseModel):
+    """
+    Schema de um produto do catálogo (sabor x tamanho -> preço).
+    """
+    sabor: str = Field(min_length=1, max_length=50)
+    tamanho: str = Field(min_length=1, max_length=50)
+    preco: float = Field(gt=0)
+
+    class Config:
+        from_attributes = True
+
+
+class ResponseCatalogoSchema(BaseModel):
+    """
+    Schema de resposta com os produtos ativos do catálogo.
+    """
+    versao: int
+    produtos: List[ProdutoCatalogoSchema]
+
+
+class ResponseItemPedidoSchema(ItemPedidoSchema):
+    """
+    Schema de resposta para itens de pedido.
+    """
+    id: int
     preco_unitario: float
 
     class Config:
         from_attributes = True
 
 
-class ResponsePedidoSchema(BaseModel):
+class ResponsePedidoResumoSchema(BaseModel):
     """
-    Schema de resposta para pedidos.
+    Schema de resposta para pedidos, sem os itens.
     """
     id: int
     status: str
+    usuario: int
     preco: float
-    itens: List[ItemPedidoSchema]
 
     class Config:
         from_attributes = True
+
+
+class ResponsePedidoSchema(ResponsePedidoResumoSchema):
+    """
+    Schema de resposta para pedidos.
+    """
+    itens: List[ResponseItemPedidoSchema]
+
+    class Config:
+        from_attributes = True
+
+
+class ResponseListaPedidosSchema(BaseModel):
+    """
+    Schema de resposta para a listagem paginada de pedidos.
+    """
+    pedidos: List[ResponsePedidoSchema]
+    proximo_cursor: Optional[int]
+
+
+class ResponseDetalhePedidoSchema(BaseModel):
+    """
+    Schema de resposta para o detalhe de um pedido.
+    """
+    quantidade_itens: int
+    pedido: ResponsePedidoSchema
+
+
+class ResponsePedidoAlteradoSchema(BaseModel):
+    """
+    Schema de resposta para mudanças de status de um pedido.
+    """
+    mensagem: str
+    pedido: ResponsePedidoResumoSchema
+
+
+class ResponseItemCriadoSchema(BaseModel):
+    """
+    Schema de resposta para a adição de um item.
+    """
+    mensagem: str
+    item_id: int
+    preco_pedido: float
+
+
+class ResponseItensCriadosSchema(BaseModel):
+    """
+    Schema de resposta para a adição de itens em lote.
+    """
+    mensagem: str
+    itens_ids: List[int]
+    preco_pedido: float
+
+
+class ResponseItemRemovidoSchema(BaseModel):
+    """
+    Schema de resposta para a remoção de um item.
+    """
+    mensagem: str
+    quant_itens_pedido: int
+    pedido: ResponsePedidoResumoSchema
+
+
+class ResponseReconciliacaoSchema(BaseModel):
+    """
+    Schema de resposta para a reconciliação de preços.
+    """
+    mensagem: str
+    pedidos_corrigidos: int
+
+
+class ReceitaDiaSchema(BaseModel):
+    """
+    Schema da receita de um dia.
+    """
+    dia: date
+    pedidos: int
+    receita: float
+
+    class Config:
+        from_attributes = True
+
+
+class VendasProdutoSchema(BaseModel):
+    """
+    Schema das vendas de um sabor/tamanho.
+    """
+    sabor: str
+    tamanho: str
+    quantidade: int
+    receita: float
+
+    class Config:
+        from_attributes = True
+
+
+class GastosUsuarioSchema(BaseModel):
+    """
+    Schema dos gastos de um usuário.
+    """
+    usuario: int
+    pedidos: int
+    total: float
+
+    class Config:
+        from_attributes = True
+
+
+class ResponseReceitaDiariaSchema(BaseModel):
+    """
+    Schema de resposta para a receita por dia.
+    """
+    dias: List[ReceitaDiaSchema]
+
+
+class ResponseVendasProdutosSchema(BaseModel):
+    """
+    Schema de resposta para as vendas por sabor/tamanho.
+    """
+    produtos: List[VendasProdutoSchema]
+
+
+class ResponsePedidosStatusSchema(BaseModel):
+    """
+    Schema de resposta para a quantidade de pedidos por status.
+    """
+    status: Dict[str, int]
+
+
+class ResponseGastosUsuariosSchema(BaseModel):
+    """
+    Schema de resposta para os gastos por usuário.
+    """
+    usuarios: List[GastosUsuarioSchema]
+
+
+class ResponseMessageSchema(BaseModel):
+    """
+    Schema de resposta com uma mensagem simples (chave "message").
+    """
+    message: str
+
+
+class ResponseMensagemSchema(BaseModel):
+    """
+    Schema de resposta com uma mensagem simples (chave "mensagem").
+    """
+    mensagem: str
+
+
+class ResponseAccessTokenSchema(BaseModel):
+    """
+    Schema de resposta com um access token.
+    """
+    access_token: str
+    token_type: str
+
+
+class ResponseTokensSchema(ResponseAccessTokenSchema):
+    """
+    Schema de resposta com access token e refresh token.
+    """
+    refresh_token: str